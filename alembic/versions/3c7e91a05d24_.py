@@ -0,0 +1,30 @@
+"""index file directory full path
+
+Revision ID: 3c7e91a05d24
+Revises: 8d41f6b2c3e7
+Create Date: 2026-10-17 15:02:37.641829
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e91a05d24'
+down_revision: Union[str, Sequence[str], None] = '8d41f6b2c3e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('file_directory', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_file_directory_full_path'), ['full_path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('file_directory', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_file_directory_full_path'))
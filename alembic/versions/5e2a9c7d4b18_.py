@@ -0,0 +1,53 @@
+"""add content-addressed file blobs
+
+Revision ID: 5e2a9c7d4b18
+Revises: bb5c3e41c9a7
+Create Date: 2026-10-17 11:03:27.614392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c7d4b18'
+down_revision: Union[str, Sequence[str], None] = 'bb5c3e41c9a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Existing uploads keep working from file_content / file_path; run
+    python -m local_llama.database.utils.dedupe_file_storage to move them
+    onto shared blobs.
+    """
+    op.create_table('file_blob',
+    sa.Column('blob_id', sa.Integer(), nullable=False),
+    sa.Column('checksum', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('storage_location', sa.Enum('DATABASE', 'FILESYSTEM', name='storagelocation'), nullable=False),
+    sa.Column('blob_path', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('content', sa.LargeBinary(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('blob_id'),
+    sa.UniqueConstraint('checksum')
+    )
+    with op.batch_alter_table('file_metadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_file_metadata_blob_id'), ['blob_id'], unique=False)
+        batch_op.create_foreign_key('fk_file_metadata_blob_id_file_blob', 'file_blob', ['blob_id'], ['blob_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('file_metadata', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_file_metadata_blob_id_file_blob', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_file_metadata_blob_id'))
+        batch_op.drop_column('blob_id')
+
+    op.drop_table('file_blob')
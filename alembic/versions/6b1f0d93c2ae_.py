@@ -0,0 +1,78 @@
+"""key daily activity rollup on coalesced ids
+
+Revision ID: 6b1f0d93c2ae
+Revises: 3c7e91a05d24
+Create Date: 2026-10-17 18:41:09.215733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1f0d93c2ae'
+down_revision: Union[str, Sequence[str], None] = '3c7e91a05d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The rollup is derived from useractivity, so it is recreated and backfilled
+# (same statement as ActivityRollup.rebuild) rather than altered in place
+BACKFILL = (
+    "INSERT INTO dailyactivityrollup (activity_day, activity_type, employee_id, project_id, activity_count) "
+    "SELECT CAST(activity_timestamp AS DATE), activity_type, employee_id, related_project_id, COUNT(activity_id) "
+    "FROM useractivity "
+    "GROUP BY CAST(activity_timestamp AS DATE), activity_type, employee_id, related_project_id"
+)
+
+
+def _create_rollup(keyed: bool) -> None:
+    """Create dailyactivityrollup, with the coalesced key columns or the original nullable key."""
+    columns = [
+        sa.Column('rollup_id', sa.Integer(), nullable=False),
+        sa.Column('activity_day', sa.Date(), nullable=False),
+        sa.Column('activity_type', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+    ]
+    if keyed:
+        columns += [
+            sa.Column('employee_key', sa.Integer(), sa.Computed('COALESCE(employee_id, 0)', persisted=True)),
+            sa.Column('project_key', sa.Integer(), sa.Computed('COALESCE(project_id, 0)', persisted=True)),
+        ]
+        unique = sa.UniqueConstraint('activity_day', 'activity_type', 'employee_key', 'project_key',
+                                     name='uq_dailyactivityrollup_key')
+    else:
+        unique = sa.UniqueConstraint('activity_day', 'activity_type', 'employee_id', 'project_id')
+    op.create_table('dailyactivityrollup',
+    *columns,
+    sa.Column('activity_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employee.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['project.project_id'], ),
+    sa.PrimaryKeyConstraint('rollup_id'),
+    unique
+    )
+    with op.batch_alter_table('dailyactivityrollup', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_dailyactivityrollup_activity_day'), ['activity_day'], unique=False)
+
+    op.execute(BACKFILL)
+
+
+def _drop_rollup() -> None:
+    with op.batch_alter_table('dailyactivityrollup', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_dailyactivityrollup_activity_day'))
+
+    op.drop_table('dailyactivityrollup')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_rollup()
+    _create_rollup(keyed=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_rollup()
+    _create_rollup(keyed=False)
@@ -0,0 +1,36 @@
+"""add storage tiering fields to file metadata
+
+Revision ID: 8d41f6b2c3e7
+Revises: 5e2a9c7d4b18
+Create Date: 2026-10-17 13:41:09.257103
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f6b2c3e7'
+down_revision: Union[str, Sequence[str], None] = '5e2a9c7d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('file_metadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('download_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+        batch_op.add_column(sa.Column('recent_downloads', sa.Integer(), nullable=False, server_default=sa.text('0')))
+        batch_op.add_column(sa.Column('storage_migrated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('storage_migration_reason', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('file_metadata', schema=None) as batch_op:
+        batch_op.drop_column('storage_migration_reason')
+        batch_op.drop_column('storage_migrated_at')
+        batch_op.drop_column('recent_downloads', mssql_drop_default=True)
+        batch_op.drop_column('download_count', mssql_drop_default=True)
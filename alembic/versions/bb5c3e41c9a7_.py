@@ -0,0 +1,58 @@
+"""add daily activity rollup
+
+Revision ID: bb5c3e41c9a7
+Revises: d85d687a1046
+Create Date: 2026-10-17 09:12:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb5c3e41c9a7'
+down_revision: Union[str, Sequence[str], None] = 'd85d687a1046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dailyactivityrollup',
+    sa.Column('rollup_id', sa.Integer(), nullable=False),
+    sa.Column('activity_day', sa.Date(), nullable=False),
+    sa.Column('activity_type', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('activity_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employee.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['project.project_id'], ),
+    sa.PrimaryKeyConstraint('rollup_id'),
+    sa.UniqueConstraint('activity_day', 'activity_type', 'employee_id', 'project_id')
+    )
+    with op.batch_alter_table('dailyactivityrollup', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_dailyactivityrollup_activity_day'), ['activity_day'], unique=False)
+
+    with op.batch_alter_table('useractivity', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_useractivity_activity_timestamp'), ['activity_timestamp'], unique=False)
+
+    # Backfill from the existing history (same statement as ActivityRollup.rebuild)
+    op.execute(
+        "INSERT INTO dailyactivityrollup (activity_day, activity_type, employee_id, project_id, activity_count) "
+        "SELECT CAST(activity_timestamp AS DATE), activity_type, employee_id, related_project_id, COUNT(activity_id) "
+        "FROM useractivity "
+        "GROUP BY CAST(activity_timestamp AS DATE), activity_type, employee_id, related_project_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('useractivity', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_useractivity_activity_timestamp'))
+
+    with op.batch_alter_table('dailyactivityrollup', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_dailyactivityrollup_activity_day'))
+
+    op.drop_table('dailyactivityrollup')
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark per-event connection overhead: engine per event vs. shared pool.
+
+Simulates N state events that each open a session and run a trivial query,
+first the old way (create_engine(DATABASE_URL) inside every event) and then
+through local_llama.database.engine.get_engine(). Reports the average time
+per event and how many physical connections (logins) were opened.
+
+Usage:
+    python generation_scripts/benchmark_engine_pool.py [events] [database_url]
+
+The database URL defaults to DATABASE_URL; without one a temporary SQLite
+file is used, which shows the connection counts but hides the MSSQL login cost.
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from sqlmodel import Session, create_engine
+from local_llama.database.engine import get_engine, dispose_engines
+
+
+def run_event(engine) -> None:
+    """One simulated state event: open a session and run a query."""
+    with Session(engine) as session:
+        session.exec(text("SELECT 1")).one()
+
+
+def benchmark_engine_per_event(database_url: str, events: int):
+    """Old pattern: a new engine (and pool) for every event."""
+    connects = 0
+    engines = []
+
+    def count_connect(dbapi_connection, connection_record):
+        nonlocal connects
+        connects += 1
+
+    start = time.perf_counter()
+    for _ in range(events):
+        engine = create_engine(database_url)
+        event.listen(engine, "connect", count_connect)
+        run_event(engine)
+        # The states never disposed these; keep them alive like the app did
+        engines.append(engine)
+    elapsed = time.perf_counter() - start
+
+    for engine in engines:
+        engine.dispose()
+    return elapsed, connects
+
+
+def benchmark_shared_engine(database_url: str, events: int):
+    """New pattern: every event checks a connection out of the shared pool."""
+    connects = 0
+
+    def count_connect(dbapi_connection, connection_record):
+        nonlocal connects
+        connects += 1
+
+    dispose_engines()
+    engine = get_engine(database_url)
+    event.listen(engine, "connect", count_connect)
+
+    start = time.perf_counter()
+    for _ in range(events):
+        run_event(get_engine(database_url))
+    elapsed = time.perf_counter() - start
+
+    dispose_engines()
+    return elapsed, connects
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    database_url = sys.argv[2] if len(sys.argv) > 2 else os.getenv("DATABASE_URL")
+
+    temp_dir = None
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'benchmark.db')}"
+        print("DATABASE_URL not set, using a temporary SQLite file\n")
+
+    results = {
+        "create_engine per event": benchmark_engine_per_event(database_url, events),
+        "shared pooled engine": benchmark_shared_engine(database_url, events),
+    }
+
+    print(f"{events} events against {database_url.split('://')[0]}")
+    print(f"{'pattern':<26}{'ms/event':>10}{'connects':>10}")
+    for name, (elapsed, connects) in results.items():
+        print(f"{name:<26}{elapsed / events * 1000:>10.3f}{connects:>10}")
+
+    before, after = results["create_engine per event"][0], results["shared pooled engine"][0]
+    print(f"\nSpeedup: {before / after:.1f}x")
+
+    if temp_dir:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
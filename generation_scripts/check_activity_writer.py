@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Check that tracked activities are written in batches off the request path.
+
+Points rx.session() at a temporary SQLite database, tracks activities faster
+than the writer flushes, then verifies that track_activity() returns without
+writing, that the activities arrive in a few batched transactions with
+matching DailyActivityRollup counts, that a full backlog drops (and counts)
+new activities, that stop() writes whatever is still queued, that one
+bad activity in a batch fails alone (activities without a user are counted
+once), and that the rollup key dedupes rows without a project.
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# rx.session() uses the Reflex db_url, so set it before Reflex loads its config
+os.environ["REFLEX_DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'activity.db')}"
+
+import reflex as rx
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel, select, func, delete
+from local_llama.models.app_user import AppUser
+from local_llama.models.user_activity import UserActivity
+from local_llama.models.daily_activity_rollup import DailyActivityRollup
+from local_llama.services.activity_tracker import ActivityTracker
+from local_llama.services.activity_writer import ActivityWriter
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def scalar(statement) -> int:
+    with rx.session() as session:
+        return session.exec(statement).one()
+
+
+def activity_count() -> int:
+    return scalar(select(func.count(UserActivity.activity_id)))
+
+
+def check_activity_writer():
+    """Track activities through the writer and inspect what was written."""
+    engine = rx.model.get_engine()
+    SQLModel.metadata.create_all(engine)
+    with rx.session() as session:
+        session.add(AppUser(first_name="Ada", last_name="Admin", email="ada@example.com",
+                            department_id=1, priv_level_id=1))
+        session.commit()
+
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(1))
+
+    ActivityWriter.FLUSH_INTERVAL_MS = 200
+    ActivityWriter.BATCH_SIZE = 40
+
+    started = time.perf_counter()
+    for i in range(100):
+        ActivityTracker.track_vm_creation(vm_id=i, asset_id=1, project_id=1 + i % 2, employee_id=1, vm_type="Windows")
+    elapsed = time.perf_counter() - started
+
+    results = [check(f"100 activities queued in {elapsed * 1000:.1f}ms", activity_count() < 100)]
+
+    time.sleep(1)
+    metrics = ActivityWriter.metrics()
+    results.append(check("all 100 written by the writer thread", activity_count() == 100))
+    results.append(check(f"written in {metrics['batches']} batches ({len(commits)} commits)",
+                         metrics["batches"] <= 5 and len(commits) == metrics["batches"]))
+    results.append(check("rollup counts match the activities",
+                         scalar(select(func.sum(DailyActivityRollup.activity_count))) == 100))
+    with rx.session() as session:
+        user_ids = session.exec(select(UserActivity.user_id).distinct()).all()
+    results.append(check("placeholder user filled in", user_ids == [1]))
+
+    # Stop the writer so the backlog can fill
+    ActivityWriter.stop()
+    ActivityWriter.start = staticmethod(lambda: None)
+    capacity = ActivityWriter._queue.maxsize
+    ActivityWriter._queue.maxsize = 5
+    accepted = [ActivityTracker.track_dat_update(dat_id=i, asset_id=1, project_id=1, employee_id=1, dat_version="1.0")
+                for i in range(8)]
+    metrics = ActivityWriter.metrics()
+    results.append(check("full backlog drops new activities", accepted.count(False) == 3 and metrics["dropped"] == 3))
+    results.append(check("backlog reported", metrics["backlog"] == 5))
+
+    ActivityWriter.stop()
+    ActivityWriter._queue.maxsize = capacity
+    results.append(check("stop() writes the queued activities", activity_count() == 105))
+    results.append(check("metrics add up", ActivityWriter.metrics() == {
+        "queued": 105, "written": 105, "dropped": 3, "failed": 0, "batches": metrics["batches"] + 1, "backlog": 0
+    }))
+
+    # One bad activity in a batch only fails itself
+    batch = [
+        UserActivity(user_id=1, employee_id=1, activity_type="vm_created", activity_description=f"vm {i}")
+        for i in range(9)
+    ]
+    batch.insert(4, UserActivity(user_id=1, employee_id=1, activity_type="vm_created", activity_description=None))
+    ActivityWriter._write(batch)
+    metrics = ActivityWriter.metrics()
+    results.append(check("bad activity fails alone, the rest of its batch is written",
+                         activity_count() == 114 and metrics["failed"] == 1 and metrics["written"] == 114))
+
+    # NULL project ids still share one rollup row per day, type and employee
+    with rx.session() as session:
+        existing = session.exec(select(DailyActivityRollup).where(DailyActivityRollup.project_id.is_(None))).first()
+    try:
+        with rx.session() as session:
+            session.add(DailyActivityRollup(
+                activity_day=existing.activity_day, activity_type=existing.activity_type,
+                employee_id=existing.employee_id, project_id=None, activity_count=1,
+            ))
+            session.commit()
+        duplicate_rejected = False
+    except IntegrityError:
+        duplicate_rejected = True
+    results.append(check("rollup key dedupes rows without a project",
+                         existing is not None and duplicate_rejected))
+
+    # Without a placeholder user, activities lacking one fail once, even when the batch is retried
+    with rx.session() as session:
+        session.exec(delete(AppUser))
+        session.commit()
+    failed = ActivityWriter.metrics()["failed"]
+    ActivityWriter._write([
+        UserActivity(employee_id=1, activity_type="vm_created", activity_description="no user"),
+        UserActivity(user_id=1, employee_id=1, activity_type="vm_created", activity_description=None),
+        UserActivity(user_id=1, employee_id=1, activity_type="vm_created", activity_description="vm 10"),
+    ])
+    results.append(check("activities without a user are counted once",
+                         ActivityWriter.metrics()["failed"] == failed + 2 and activity_count() == 115))
+
+    if all(results):
+        print("\n✓ Activities are written in batches by the background writer")
+    else:
+        print("\n✗ Activity writer check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_activity_writer()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Check that the assets grid loader issues a constant number of queries.
+
+Seeds an in-memory SQLite database with growing numbers of assets and counts
+the statements AssetLoader.load_rows sends to the database for each size.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+from local_llama.models import (
+    Asset, Project, Building, Floor, Room, SysType, OperatingSystem, HardwareManufacturer
+)
+from local_llama.services.asset_loader import AssetLoader
+
+
+def count_load_statements(asset_count: int) -> int:
+    """Seed asset_count assets and return how many statements the grid load runs."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.add_all([
+            Project(project_id=1, project_name="STORM"),
+            Building(building_id=1, building_name="Building 370"),
+            Floor(floor_id=1, floor_name="Floor 1"),
+            Room(room_id=1, room_name="Lab A", floor_id=1, building_id=1),
+            SysType(systype_id=1, systype_name="Server"),
+            OperatingSystem(os_id=1, os_name="Windows 10"),
+            HardwareManufacturer(hwmanu_id=1, hwmanu_name="Dell", weblink="https://dell.com"),
+        ])
+        for i in range(asset_count):
+            # Alternate optional references so both join branches are exercised
+            session.add(Asset(
+                asset_name=f"asset-{i}",
+                project_id=1,
+                building_id=1,
+                floor_id=1,
+                systype_id=1,
+                room_id=1 if i % 2 else None,
+                os_id=1 if i % 3 else None,
+                hwmanu_id=1 if i % 2 else None,
+            ))
+        session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    with Session(engine) as session:
+        rows = AssetLoader.load_rows(
+            session, AssetLoader.apply_sorting(AssetLoader.build_query(), "asset_id")
+        )
+    event.remove(engine, "before_cursor_execute", record_statement)
+
+    assert len(rows) == asset_count, f"expected {asset_count} rows, got {len(rows)}"
+    assert rows[0]["room"] == "N/A" and rows[1]["room"] == "Lab A"
+    assert rows[0]["building"] == "370" and rows[0]["floor"] == "1"
+    return len(statements)
+
+
+def check_asset_loader_queries():
+    """Verify the statement count does not grow with the number of assets."""
+    counts = {size: count_load_statements(size) for size in (10, 100, 1000)}
+    for size, count in counts.items():
+        print(f"{size:>5} assets -> {count} statement(s)")
+
+    if len(set(counts.values())) == 1 and counts[10] == 1:
+        print("\n✓ Asset grid loads in a single statement regardless of asset count")
+    else:
+        print("\n✗ Statement count grows with the number of assets!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_asset_loader_queries()
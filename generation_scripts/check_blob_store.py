@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Check that the content-addressed blob store stores identical uploads once.
+
+Uses an in-memory SQLite database and a temporary uploads directory to
+verify that repeated uploads share one FileBlob, that content is only
+removed when the last reference is released, that legacy uploads are
+deduplicated by BlobStore.adopt(), and that a store() racing a release()
+or rolling back never leaves a blob without its file or a file without
+its blob.
+"""
+
+import os
+import sys
+import hashlib
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from local_llama.models.file_storage import FileMetadata, FileContent, FileBlob, FileType, StorageLocation
+from local_llama.services.blob_store import BlobStore
+from local_llama.services.upload_spool import UploadSpool
+
+
+def spooled(content: bytes) -> str:
+    """Write content to a spool file like an upload would."""
+    temp = UploadSpool._temp_file()
+    with temp:
+        temp.write(content)
+    return temp.name
+
+
+def add_file(session: Session, content: bytes, storage_location: StorageLocation) -> FileMetadata:
+    """Store one upload through the blob store, as FileStorageState does."""
+    checksum = hashlib.sha256(content).hexdigest()
+    upload_path = spooled(content)
+    blob = BlobStore.store(session, checksum, len(content), storage_location, source_path=upload_path)
+    metadata = FileMetadata(
+        filename="report.txt", original_filename="report.txt", file_type=FileType.TEXT,
+        mime_type="text/plain", file_size=len(content), storage_location=blob.storage_location,
+        file_path=blob.blob_path, checksum=checksum, blob_id=blob.blob_id, uploaded_by=1,
+    )
+    session.add(metadata)
+    session.commit()
+    # Duplicate content leaves the spool file behind, as after an upload
+    UploadSpool.discard(upload_path)
+    return metadata
+
+
+def delete_file(session: Session, metadata: FileMetadata):
+    """Delete one upload and its blob reference."""
+    blob_id = metadata.blob_id
+    session.delete(metadata)
+    session.flush()
+    path = BlobStore.release(session, blob_id)
+    session.commit()
+    BlobStore.remove_file(session.get_bind(), path)
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def check_blob_store():
+    """Run the deduplication scenarios."""
+    root = tempfile.mkdtemp()
+    BlobStore.ROOT = os.path.join(root, "blobs")
+    UploadSpool.TEMP_DIR = os.path.join(root, ".incoming")
+
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    results = []
+
+    with Session(engine) as session:
+        content = b"playbook " * 10000
+        files = [add_file(session, content, StorageLocation.FILESYSTEM) for _ in range(3)]
+        blobs = session.exec(select(FileBlob)).all()
+        blob_path = BlobStore.blob_path(hashlib.sha256(content).hexdigest())
+        results.append(check(
+            "3 identical uploads -> 1 blob, ref_count 3, 1 file on disk",
+            len(blobs) == 1 and blobs[0].ref_count == 3 and os.path.exists(blob_path)
+            and not os.listdir(UploadSpool.TEMP_DIR)
+        ))
+
+        delete_file(session, files[0])
+        delete_file(session, files[1])
+        results.append(check("blob kept while a reference remains", os.path.exists(blob_path)))
+        results.append(check("read() returns shared content", BlobStore.read(session, files[2]) == content))
+
+        delete_file(session, files[2])
+        blob_count = session.exec(select(func.count(FileBlob.blob_id))).one()
+        results.append(check("blob removed with its last reference", blob_count == 0 and not os.path.exists(blob_path)))
+
+        small = b"audit report"
+        db_files = [add_file(session, small, StorageLocation.DATABASE) for _ in range(2)]
+        db_blob = session.get(FileBlob, db_files[0].blob_id)
+        results.append(check(
+            "database uploads share one blob",
+            db_files[0].blob_id == db_files[1].blob_id and db_blob.ref_count == 2 and db_blob.content == small
+        ))
+
+        # Legacy rows: two identical filesystem copies and two identical database blobs
+        legacy_dir = os.path.join(root, "legacy")
+        os.makedirs(legacy_dir)
+        legacy = []
+        for i in range(2):
+            path = os.path.join(legacy_dir, f"{i}_notes.md")
+            with open(path, "wb") as f:
+                f.write(b"# notes\n" * 500)
+            legacy.append(FileMetadata(
+                filename=f"{i}_notes.md", original_filename="notes.md", file_type=FileType.MARKDOWN,
+                mime_type="text/markdown", file_size=4000, storage_location=StorageLocation.FILESYSTEM,
+                file_path=path, checksum="", uploaded_by=1,
+            ))
+            legacy.append(FileMetadata(
+                filename=f"{i}_audit.txt", original_filename="audit.txt", file_type=FileType.TEXT,
+                mime_type="text/plain", file_size=len(small), storage_location=StorageLocation.DATABASE,
+                checksum="", uploaded_by=1,
+            ))
+        session.add_all(legacy)
+        session.flush()
+        for metadata in legacy:
+            if metadata.storage_location == StorageLocation.DATABASE:
+                session.add(FileContent(file_id=metadata.file_id, content=small))
+        session.commit()
+
+        for metadata in legacy:
+            legacy_path = BlobStore.adopt(session, metadata)
+            session.commit()
+            BlobStore.remove_file(engine, legacy_path)
+
+        blob_refs = sorted(session.exec(select(FileBlob.ref_count)).all())
+        content_rows = session.exec(select(func.count(FileContent.content_id))).one()
+        results.append(check(
+            "dedupe migration: 4 legacy files -> 2 blobs, legacy copies removed",
+            blob_refs == [2, 4] and content_rows == 0 and not os.listdir(legacy_dir)
+            and all(BlobStore.read(session, m) for m in legacy)
+        ))
+
+        # A store() of the same content lands between a release's commit and its unlink
+        racy = b"shared firmware image"
+        first = add_file(session, racy, StorageLocation.FILESYSTEM)
+        racy_path = first.file_path
+        session.delete(first)
+        session.flush()
+        released_path = BlobStore.release(session, first.blob_id)
+        session.commit()
+        second = add_file(session, racy, StorageLocation.FILESYSTEM)
+        BlobStore.remove_file(engine, released_path)
+        results.append(check("unlink skipped for content stored again meanwhile",
+                             os.path.exists(racy_path) and BlobStore.read(session, second) == racy))
+
+        os.remove(racy_path)
+        add_file(session, racy, StorageLocation.FILESYSTEM)
+        results.append(check("store() restores a blob file that went missing", os.path.exists(racy_path)))
+
+        # Files written by a transaction that never commits are cleaned up
+        rolled_back = b"draft that was never saved"
+        checksum = hashlib.sha256(rolled_back).hexdigest()
+        BlobStore.store(session, checksum, len(rolled_back), StorageLocation.FILESYSTEM, source_path=spooled(rolled_back))
+        written = os.path.exists(BlobStore.blob_path(checksum))
+        session.rollback()
+        results.append(check("rolled-back store() leaves no file",
+                             written and not os.path.exists(BlobStore.blob_path(checksum))))
+
+    abandoned = b"upload from a closed session"
+    checksum = hashlib.sha256(abandoned).hexdigest()
+    with Session(engine) as session:
+        BlobStore.store(session, checksum, len(abandoned), StorageLocation.FILESYSTEM, source_path=spooled(abandoned))
+    results.append(check("uncommitted store() in a closed session leaves no file",
+                         not os.path.exists(BlobStore.blob_path(checksum))))
+
+    if all(results):
+        print("\n✓ Identical content is stored once and reference counted")
+    else:
+        print("\n✗ Blob store deduplication check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_blob_store()
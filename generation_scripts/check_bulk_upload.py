@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Check the multi-file upload pipeline.
+
+Spools 60 files (some with identical content) through a pool of worker
+threads like FileStorageState._upload_many, stores them with
+BulkUpload.store_batch into an in-memory SQLite database and verifies that
+every batch inserts its FileMetadata rows with a single executemany INSERT,
+that duplicate content is stored once and that no spool files are left
+behind. (SQLite's driver then runs that INSERT row by row because it cannot
+order RETURNING rows; MSSQL sends it as batched INSERT ... OUTPUT.)
+"""
+
+import os
+import sys
+import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from local_llama.models.file_storage import FileMetadata, FileBlob, FileType, StorageLocation
+from local_llama.services.blob_store import BlobStore
+from local_llama.services.bulk_upload import BulkUpload
+from local_llama.services.upload_spool import UploadSpool
+
+FILE_COUNT = 60
+DISTINCT = 40
+
+
+def spool(index: int) -> dict:
+    """Spool one generated report in a worker thread."""
+    content = (f"sysaudit report {index % DISTINCT}\n" * 20000).encode()
+    path, size, checksum = UploadSpool.spool_file(BulkUpload.source_of(content))
+    name = BulkUpload.apply_naming_rule(f"report_{index}.txt", "directory_prefix", "sysaudit")
+    return {
+        "path": path, "size": size, "checksum": checksum, "filename": name,
+        "file_type": FileType.TEXT, "storage_location": StorageLocation.FILESYSTEM,
+        "directory_id": None, "uploaded_by": 1,
+    }
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def check_bulk_upload():
+    """Run the pipeline and inspect the database and disk."""
+    root = tempfile.mkdtemp()
+    BlobStore.ROOT = os.path.join(root, "blobs")
+    UploadSpool.TEMP_DIR = os.path.join(root, ".incoming")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+
+    metadata_inserts = []
+
+    def record_statement(conn, clauseelement, multiparams, params, execution_options):
+        if getattr(clauseelement, "table", None) is FileMetadata.__table__ and clauseelement.is_insert:
+            metadata_inserts.append(len(multiparams) if multiparams else 1)
+
+    event.listen(engine, "before_execute", record_statement)
+
+    with ThreadPoolExecutor(max_workers=BulkUpload.WORKERS) as pool:
+        items = list(pool.map(spool, range(FILE_COUNT)))
+
+    stored = []
+    for start in range(0, len(items), BulkUpload.BATCH_SIZE):
+        stored.extend(BulkUpload.store_batch(engine, items[start:start + BulkUpload.BATCH_SIZE]))
+    event.remove(engine, "before_execute", record_statement)
+
+    batches = math.ceil(FILE_COUNT / BulkUpload.BATCH_SIZE)
+    with Session(engine) as session:
+        file_count = session.exec(select(func.count(FileMetadata.file_id))).one()
+        blob_count = session.exec(select(func.count(FileBlob.blob_id))).one()
+        names = session.exec(select(FileMetadata.original_filename)).all()
+
+    blob_files = sum(len(files) for _, _, files in os.walk(BlobStore.ROOT))
+    results = [
+        check(f"{FILE_COUNT} files stored without errors", file_count == FILE_COUNT and all(file_id for file_id, _ in stored)),
+        check(f"{len(metadata_inserts)} metadata INSERT(s) for {batches} batches (rows: {metadata_inserts})",
+              len(metadata_inserts) == batches),
+        check(f"{blob_count} blobs / {blob_files} blob files for {DISTINCT} distinct contents",
+              blob_count == blob_files == DISTINCT),
+        check("no spool files left behind", not os.listdir(UploadSpool.TEMP_DIR)),
+        check("naming rule applied", all(name.startswith("sysaudit_report_") for name in names)),
+    ]
+
+    if all(results):
+        print("\n✓ Bulk uploads are hashed in parallel and inserted in batches")
+    else:
+        print("\n✗ Bulk upload check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_bulk_upload()
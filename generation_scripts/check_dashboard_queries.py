@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Check that the dashboard aggregations issue a constant number of queries.
+
+Seeds an in-memory SQLite database with growing numbers of employees and
+activities (maintaining the daily rollup as ActivityTracker does) and counts
+the statements DashboardMetrics sends for a full dashboard load at each size.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+from local_llama.models import Employee, Project, Asset, UserActivity
+from local_llama.services.activity_rollup import ActivityRollup
+from local_llama.services.dashboard_metrics import DashboardMetrics
+
+ACTIVITY_TYPES = ["vm_created", "image_captured", "log_added", "dat_updated", "asset_updated"]
+
+
+def load_dashboard(session: Session, now: datetime) -> dict:
+    """Run every aggregation the dashboard page needs."""
+    return {
+        "summary": DashboardMetrics.activity_summary(session, now),
+        "employees": DashboardMetrics.employee_activity_counts(session),
+        "projects": DashboardMetrics.project_activity_counts(session, limit=5),
+        "stats": DashboardMetrics.asset_statistics(session),
+        "recent": DashboardMetrics.recent_activities(session, limit=10),
+        "timeline": DashboardMetrics.activity_timeline(session, now, days=7),
+    }
+
+
+def count_dashboard_statements(employee_count: int) -> int:
+    """Seed employee_count employees and return how many statements the dashboard runs."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+
+    with Session(engine) as session:
+        session.add_all([Project(project_id=p, project_name=f"Project {p}") for p in range(1, 8)])
+        session.add(Asset(asset_name="asset-1", project_id=1, building_id=1, floor_id=1, systype_id=1, os_id=1))
+        for emp_id in range(1, employee_count + 1):
+            session.add(Employee(
+                id=emp_id,
+                first_name="Employee",
+                last_name=str(emp_id),
+                email=f"employee{emp_id}@example.com",
+                department_id=1,
+            ))
+            for i, activity_type in enumerate(ACTIVITY_TYPES):
+                activity = UserActivity(
+                    user_id=1,
+                    employee_id=emp_id,
+                    activity_type=activity_type,
+                    activity_description=f"{activity_type} by {emp_id}",
+                    related_project_id=(emp_id + i) % 7 + 1,
+                    activity_timestamp=now - timedelta(days=i * 10),
+                )
+                session.add(activity)
+                # Same incremental rollup update ActivityTracker performs
+                ActivityRollup.record(
+                    session,
+                    activity_type=activity_type,
+                    activity_day=activity.activity_timestamp.date(),
+                    employee_id=emp_id,
+                    project_id=activity.related_project_id,
+                )
+        session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    with Session(engine) as session:
+        data = load_dashboard(session, now)
+    event.remove(engine, "before_cursor_execute", record_statement)
+
+    expected_total = employee_count * len(ACTIVITY_TYPES)
+    assert data["summary"]["total_activities"] == expected_total
+    assert data["summary"]["vm_creations"] == employee_count
+    assert data["summary"]["activities_today"] == employee_count
+    assert len(data["employees"]) == employee_count
+    assert all(e["total"] == len(ACTIVITY_TYPES) and e["vm"] == 1 for e in data["employees"])
+    assert sum(p["count"] for p in data["projects"]) <= expected_total
+    assert data["stats"] == {"total_assets": 1, "total_projects": 7, "total_operating_systems": 1}
+    assert len(data["recent"]) == min(10, expected_total)
+    assert len(data["timeline"]) == 7
+    assert data["timeline"][-1]["vm"] == employee_count
+    return len(statements)
+
+
+def check_dashboard_queries():
+    """Verify the statement count does not grow with the number of employees."""
+    counts = {size: count_dashboard_statements(size) for size in (5, 50, 500)}
+    for size, count in counts.items():
+        print(f"{size:>4} employees -> {count} statement(s)")
+
+    if len(set(counts.values())) == 1:
+        print(f"\n✓ Dashboard loads in {counts[5]} statements regardless of employee count")
+    else:
+        print("\n✗ Statement count grows with the number of employees!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_dashboard_queries()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Check that directory ancestry is answered with a fixed number of queries.
+
+Seeds a temporary SQLite database with a deep directory chain, a sibling
+whose name differs only where a LIKE wildcard would match, and a directory
+that reuses a path in another branch, then verifies
+DirectoryTree.ancestors()/descendants(), breadcrumbs and the directory
+access check against the expected rows and query counts.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ancestry.db')}"
+
+import reflex as rx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileDirectory
+from local_llama.services.directory_tree import DirectoryTree
+from local_llama.states.directory_state import DirectoryState
+from local_llama.states.file_storage_state import FileStorageState
+
+DEPTH = 40
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def seed(engine):
+    """Chain /d_1/d_2/.../d_DEPTH, plus /dx1 (matches "d_1" as a LIKE pattern) and a stray copy of /d_1/d_2."""
+    with Session(engine) as session:
+        path = ""
+        for directory_id in range(1, DEPTH + 1):
+            path = f"{path}/d_{directory_id}"
+            session.add(FileDirectory(
+                directory_id=directory_id, name=f"d_{directory_id}", parent_id=directory_id - 1 or None,
+                full_path=path, owner_id=1,
+            ))
+        session.add(FileDirectory(directory_id=1001, name="dx1", full_path="/dx1"))
+        session.add(FileDirectory(directory_id=1002, name="d_2", parent_id=1001, full_path="/dx1/d_2"))
+        session.add(FileDirectory(directory_id=1003, name="d_2", parent_id=1001, full_path="/d_1/d_2"))
+        session.add(FileDirectory(directory_id=1004, name="d_3", parent_id=1003, full_path="/d_1/d_2/d_3"))
+        session.commit()
+
+
+async def check_directory_ancestry():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    seed(engine)
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    with Session(engine) as session:
+        deepest = session.get(FileDirectory, DEPTH)
+        queries.clear()
+        ancestors = DirectoryTree.ancestors(session, deepest)
+        ancestor_queries = len(queries)
+
+        stray = session.get(FileDirectory, 1004)
+        stray_ancestors = [d.directory_id for d in DirectoryTree.ancestors(session, stray)]
+
+        root = session.get(FileDirectory, 1)
+        queries.clear()
+        descendants = DirectoryTree.descendants(session, root)
+        descendant_queries = len(queries)
+
+    results = [
+        check(f"{DEPTH - 1} ancestors with {ancestor_queries} query", ancestor_queries == 1
+              and [d.directory_id for d in ancestors] == list(range(1, DEPTH))),
+        check("ancestors follow parent_id past a reused path", stray_ancestors == [1001, 1003]),
+        check(f"descendants with {descendant_queries} query", descendant_queries == 1),
+        check("descendant prefix is not a LIKE pattern",
+              sorted(d.directory_id for d in descendants) == list(range(2, DEPTH + 1)) + [1003, 1004]),
+    ]
+
+    state_root = rx.State(_reflex_internal_init=True)
+    directory_state = await state_root.get_state(DirectoryState)
+    file_state = await state_root.get_state(FileStorageState)
+
+    counts = []
+    for directory_id in (3, DEPTH - 1):
+        queries.clear()
+        directory_state.navigate_to_directory(directory_id)
+        counts.append(len(queries))
+    directory_state.navigate_to_directory(DEPTH)
+    results += [
+        check(f"navigation costs the same at depth 3 and {DEPTH - 1} ({counts} queries)", counts[0] == counts[1]),
+        check("breadcrumbs run root to current", [b["directory_id"] for b in directory_state.breadcrumbs]
+              == list(range(1, DEPTH + 1))),
+    ]
+
+    queries.clear()
+    directory_state.navigate_to_parent()
+    results.append(check("parent taken from the breadcrumbs", directory_state.current_directory_id == DEPTH - 1))
+
+    file_state.current_user_id = 2
+    queries.clear()
+    access = file_state._check_directory_access(DEPTH)
+    results.append(check(f"access check at depth {DEPTH} with {len(queries)} query", access == (False, False)
+                         and len(queries) == 1))
+
+    if all(results):
+        print("\n✓ Directory ancestry is answered with a fixed number of queries")
+    else:
+        print("\n✗ Directory ancestry check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_directory_ancestry())
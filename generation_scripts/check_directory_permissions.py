@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Check that directory permissions are computed once and invalidated on change.
+
+Seeds a temporary SQLite database with owned, public and private
+directories, then verifies that FileStorageState's access checks are served
+from one cached permission map, that new directories and ownership changes
+are picked up, and that the directory tree marks locked directories.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'permissions.db')}"
+
+import reflex as rx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileDirectory
+from local_llama.states.directory_state import DirectoryState
+from local_llama.states.file_storage_state import FileStorageState
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+async def check_directory_permissions():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            FileDirectory(directory_id=1, name="mine", full_path="/mine", owner_id=1),
+            FileDirectory(directory_id=2, name="shared", full_path="/mine/shared", parent_id=1, owner_id=2, is_public=True),
+            FileDirectory(directory_id=3, name="team_public", full_path="/mine/team_public", parent_id=1, owner_id=2),
+            FileDirectory(directory_id=4, name="theirs", full_path="/theirs", owner_id=2),
+        ])
+        session.commit()
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    root = rx.State(_reflex_internal_init=True)
+    file_state = await root.get_state(FileStorageState)
+    directory_state = await root.get_state(DirectoryState)
+    file_state.current_user_id = 1
+
+    access = [file_state._check_directory_access(directory_id) for directory_id in (1, 2, 3, 4, None)]
+    for _ in range(20):
+        file_state._check_directory_access(4)
+    results = [
+        check("owner, public flag, public name, private, root", access == [
+            (True, True), (True, True), (True, True), (False, False), (True, False)
+        ]),
+        check(f"25 checks with {len(queries)} query", len(queries) == 1),
+    ]
+
+    file_state.current_user_id = None
+    results.append(check("signed out: view public folders, upload nowhere", [
+        file_state._check_directory_access(directory_id) for directory_id in (1, 2, 4)
+    ] == [(False, False), (True, False), (False, False)]))
+    file_state.current_user_id = 1
+
+    with Session(engine) as session:
+        session.add(FileDirectory(directory_id=5, name="new", full_path="/mine/new", parent_id=1, owner_id=1))
+        session.commit()
+    queries.clear()
+    new_access = file_state._check_directory_access(5)
+    file_state._check_directory_access(5)
+    results.append(check(f"new directory resolved with {len(queries)} query", new_access == (True, True) and len(queries) == 1))
+
+    with Session(engine) as session:
+        theirs = session.get(FileDirectory, 4)
+        theirs.owner_id = 1
+        session.add(theirs)
+        session.commit()
+    results.append(check("ownership change invalidates the map", file_state._check_directory_access(4) == (True, True)))
+
+    with Session(engine) as session:
+        theirs = session.get(FileDirectory, 4)
+        theirs.owner_id = 2
+        session.add(theirs)
+        session.commit()
+    directory_state.current_user_id = 1
+    directory_state.load_directory_tree()
+    locked = {d["directory_id"] for d in directory_state.directories if d["locked"]}
+    results += [
+        check("tree marks the directories the user cannot open", locked == {4}),
+        check("tree css greys out the locked path", '[data-uri="/theirs"]' in directory_state.locked_tree_css
+              and "/mine" not in directory_state.locked_tree_css),
+    ]
+
+    if all(results):
+        print("\n✓ Directory permissions are cached and invalidated on change")
+    else:
+        print("\n✗ Directory permission check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_directory_permissions())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Check that the directory tree loads lazily, one level at a time.
+
+Seeds a temporary SQLite database with a few thousand nested directories
+and files, then verifies that DirectoryState.load_directory_tree() fetches
+only the roots and the level below them with a fixed number of queries,
+that expanding a directory fetches one more level, and that once every
+level is expanded directory_tree, directories, react_file_tree and
+total_file_count agree with counts computed directly.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tree.db')}"
+
+import reflex as rx
+from collections import Counter
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileDirectory, FileMetadata, FileType, StorageLocation
+from local_llama.states.directory_state import DirectoryState
+
+DIRECTORIES = 3000
+FILES = 5000
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def seed(engine) -> tuple:
+    """Create two roots with random nesting and files spread across directories."""
+    random.seed(7)
+    parents = {}
+    with Session(engine) as session:
+        directories = []
+        for directory_id in range(1, DIRECTORIES + 1):
+            parent_id = None if directory_id <= 2 else random.randint(1, directory_id - 1)
+            parents[directory_id] = parent_id
+            parent_path = directories[parent_id - 1].full_path if parent_id else ""
+            directories.append(FileDirectory(
+                directory_id=directory_id, name=f"dir{directory_id}",
+                parent_id=parent_id, full_path=f"{parent_path}/dir{directory_id}",
+                is_public=directory_id == 1,
+            ))
+        session.add_all(directories)
+        file_directories = [random.randint(1, DIRECTORIES) for _ in range(FILES)]
+        session.add_all([
+            FileMetadata(
+                filename=f"f{i}.txt", original_filename=f"f{i}.txt", file_type=FileType.TEXT,
+                mime_type="text/plain", file_size=1, storage_location=StorageLocation.DATABASE,
+                checksum="0" * 64, uploaded_by=1, directory_id=directory_id,
+            )
+            for i, directory_id in enumerate(file_directories)
+        ])
+        session.commit()
+    return parents, Counter(file_directories)
+
+
+def walk(nodes, key="children"):
+    for node in nodes:
+        yield node
+        yield from walk(node.get(key, []), key)
+
+
+async def check_directory_tree():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    parents, expected_counts = seed(engine)
+    child_counts = Counter(parent for parent in parents.values() if parent)
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    root = rx.State(_reflex_internal_init=True)
+    state = await root.get_state(DirectoryState)
+    started = time.perf_counter()
+    state.load_directory_tree()
+    elapsed = time.perf_counter() - started
+
+    roots = [d for d, parent in parents.items() if parent is None]
+    first_level = [d for d, parent in parents.items() if parent in roots]
+    second_level = [d for d, parent in parents.items() if parent in first_level]
+    results = [
+        # Total count, roots and first level; locks come from the fetched rows, not a permission scan
+        check(f"initial load took {len(queries)} queries in {elapsed:.2f}s", len(queries) == 3),
+        check("private directories are locked for a signed-out user",
+              [n["locked"] for n in state.directory_tree] == [False, True]),
+        check(f"initial load holds the roots and one level ({len(state.directories)} of {DIRECTORIES})",
+              sorted(d["directory_id"] for d in state.directories) == sorted(roots + first_level)),
+    ]
+
+    queries.clear()
+    state.toggle_directory_expanded(roots[0])
+    state.toggle_directory_expanded(roots[1])
+    results += [
+        check(f"expanding both roots took {len(queries)} queries", len(queries) == 2),
+        check("next level prefetched", sorted(d["directory_id"] for d in state.directories)
+              == sorted(roots + first_level + second_level)),
+    ]
+
+    queries.clear()
+    state.toggle_directory_expanded(roots[0])
+    state.toggle_directory_expanded(roots[0])
+    results.append(check("loaded levels are not fetched again", not queries))
+
+    queries.clear()
+    state.expand_all_directories()
+    tree_nodes = list(walk(state.directory_tree))
+    react_nodes = list(walk([state.react_file_tree]))[1:]  # Skip the virtual root
+    results += [
+        check(f"expand all fetched every level with {len(queries)} queries", len(queries) < 50),
+        check("tree holds every directory once", sorted(n["directory_id"] for n in tree_nodes) == list(range(1, DIRECTORIES + 1))),
+        check("tree nodes sit under their parents", all(
+            parents[child["directory_id"]] == node["directory_id"] for node in tree_nodes for child in node["children"]
+        )),
+        check("tree file counts", all(n["file_count"] == expected_counts[n["directory_id"]] for n in tree_nodes)),
+        check("flat list counts and has_children", len(state.directories) == DIRECTORIES and all(
+            d["file_count"] == expected_counts[d["directory_id"]]
+            and d["has_children"] == (child_counts[d["directory_id"]] > 0)
+            for d in state.directories
+        )),
+        check("react tree has two roots under /", state.react_file_tree["uri"] == "/"
+              and len(state.react_file_tree["children"]) == 2),
+        check("react tree matches the tree", sorted(n["directory_id"] for n in react_nodes) == list(range(1, DIRECTORIES + 1))),
+        check("react children sorted by path", all(
+            [c["uri"].lower() for c in n.get("children", [])] == sorted(c["uri"].lower() for c in n.get("children", []))
+            for n in react_nodes
+        )),
+        check("total file count", state.total_file_count == FILES),
+        check("html built for the first root", state.directories_html.count("data-dir-id") >= 1),
+    ]
+
+    if all(results):
+        print("\n✓ Directory tree loads one level at a time")
+    else:
+        print("\n✗ Directory tree check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_directory_tree())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Check that directory tree edits are applied in place.
+
+Loads a small tree into DirectoryState, then adds a directory, changes file
+counts and toggles expansion, verifying that none of these query the database and that the
+resulting tree has the same shape as a fresh load.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tree_deltas.db')}"
+
+import reflex as rx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileDirectory
+from local_llama.states.directory_state import DirectoryState
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def shape(state) -> tuple:
+    """Directory ids of the flat list and paths of the react tree, in order."""
+    def uris(node):
+        return [node["uri"], [uris(child) for child in node.get("children", [])]]
+    return [d["directory_id"] for d in state.directories], uris(state.react_file_tree)
+
+
+async def check_directory_tree_deltas():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            FileDirectory(directory_id=1, name="docs", full_path="/docs"),
+            FileDirectory(directory_id=2, name="tools", full_path="/tools"),
+            FileDirectory(directory_id=3, name="alpha", parent_id=1, full_path="/docs/alpha"),
+            FileDirectory(directory_id=4, name="zulu", parent_id=1, full_path="/docs/zulu"),
+        ])
+        session.commit()
+
+    root = rx.State(_reflex_internal_init=True)
+    state = await root.get_state(DirectoryState)
+    state.load_directory_tree()
+    state.expand_all_directories()  # Fetch every level up front so only the edits are counted
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    with Session(engine) as session:
+        new_dir = FileDirectory(directory_id=5, name="mike", parent_id=1, full_path="/docs/mike")
+        session.add(new_dir)
+        session.commit()
+        session.refresh(new_dir)
+        queries.clear()
+        state._insert_directory(new_dir)
+    inserted = queries[:]
+
+    state.adjust_file_count(5, 3)
+    state.adjust_file_count(2, 1)
+    state.adjust_file_count(5, -1)
+    state.toggle_directory_expanded(1)
+    state.expand_all_directories()
+    state.collapse_all_directories()
+    state.toggle_directory_expanded(1)
+    edits = queries[:]
+
+    docs = state.directory_tree[0]
+    react_docs = state.react_file_tree["children"][0]
+    results = [
+        check(f"new directory inserted with {len(inserted)} queries", not inserted),
+        check(f"counts and expansion updated with {len(edits)} queries", not edits),
+        check("tree children in path order", [n["name"] for n in docs["children"]] == ["alpha", "mike", "zulu"]),
+        check("react children in path order", [n["name"] for n in react_docs["children"]] == ["alpha", "mike", "zulu"]),
+        check("flat list in path order", [d["full_path"] for d in state.directories] == [
+            "/docs", "/docs/alpha", "/docs/mike", "/docs/zulu", "/tools"
+        ]),
+        check("counts adjusted", docs["children"][1]["file_count"] == 2 and state.total_file_count == 3),
+        check("expanded flag follows the toggle", react_docs["expanded"] and 1 in state.expanded_directories),
+        check("new directory in the html", 'data-dir-id="5"' in state.directories_html),
+    ]
+
+    # The adjusted counts have no files behind them, so compare only the shape with a fresh load
+    inserted_shape = shape(state)
+    state.load_directory_tree()
+    results.append(check("tree shape matches a fresh load", inserted_shape == shape(state)))
+
+    if all(results):
+        print("\n✓ Directory tree edits are applied without reloading")
+    else:
+        print("\n✗ Directory tree delta check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_directory_tree_deltas())
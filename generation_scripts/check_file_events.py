@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Check that file list changes are pushed to watching sessions.
+
+Subscribes sessions to directories through FileEvents and verifies that
+published changes reach only the sessions watching that directory (also when
+published from another thread), that a backlog collapses into one reload
+(or, when unsubscribing, one stop), that a second FileStorageState applies
+another session's upload and delete to its list without querying the
+database, that the list's download and delete buttons return their events,
+and that a session shown a directory it may not view neither lists nor
+receives its files.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'events.db')}"
+
+import reflex as rx
+from reflex.event import EventSpec, fix_events
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileDirectory, FileMetadata, FileType, StorageLocation
+from local_llama.services.file_events import FileEvents
+from local_llama.states.file_storage_state import FileStorageState
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def drain(subscription) -> list:
+    changes = []
+    while not subscription.queue.empty():
+        changes.append(subscription.queue.get_nowait())
+    return changes
+
+
+async def check_pub_sub() -> list:
+    """Route changes between subscriptions by directory."""
+    a = FileEvents.subscribe("tab-a", 1)
+    b = FileEvents.subscribe("tab-b", 2)
+    FileEvents.publish(1, ("delete", 10))
+    FileEvents.publish(1, ("delete", 11), origin="tab-a")
+    thread = threading.Thread(target=FileEvents.publish, args=(2, ("delete", 12)))
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0)
+    results = [
+        check("change reaches the session watching its directory", drain(a) == [("delete", 10)]),
+        check("change from another thread delivered", drain(b) == [("delete", 12)]),
+    ]
+
+    FileEvents.follow("tab-b", 1)
+    FileEvents.publish(1, ("delete", 13))
+    await asyncio.sleep(0)
+    results.append(check("subscription follows the shown directory", drain(b) == [("delete", 13)] and drain(a)))
+
+    for file_id in range(FileEvents.MAX_QUEUED + 5):
+        FileEvents.publish(1, ("delete", file_id), origin="tab-b")
+    await asyncio.sleep(0)
+    results.append(check("backlog collapses into one reload", drain(a)[0] == ("reload", None)))
+
+    # A stop arriving on a full queue still reaches the reader
+    for file_id in range(FileEvents.MAX_QUEUED):
+        FileEvents.publish(1, ("delete", file_id), origin="tab-b")
+    FileEvents.unsubscribe("tab-a")
+    await asyncio.sleep(0)
+    results.append(check("stop delivered on a full queue", drain(a) == [("stop", None)]))
+    a = FileEvents.subscribe("tab-a", 1)
+
+    FileEvents.unsubscribe("tab-a", b)
+    FileEvents.unsubscribe("tab-b")
+    await asyncio.sleep(0)
+    results += [
+        check("stale unsubscribe ignored", "tab-a" in FileEvents._subscriptions),
+        check("unsubscribe wakes the reader", drain(b) == [("stop", None)]),
+    ]
+    FileEvents.unsubscribe("tab-a")
+    return results
+
+
+async def check_sessions(engine) -> list:
+    """One session uploads and deletes; another applies the published rows."""
+    uploader = await rx.State(_reflex_internal_init=True).get_state(FileStorageState)
+    watcher = await rx.State(_reflex_internal_init=True).get_state(FileStorageState)
+    for state in (uploader, watcher):
+        state.current_directory_id = 1
+        state.load_files()
+    subscription = FileEvents.subscribe("tab-watcher", 1)
+
+    with Session(engine) as session:
+        session.add(FileMetadata(
+            filename="new.txt", original_filename="new.txt", file_type=FileType.TEXT, mime_type="text/plain",
+            file_size=1, storage_location=StorageLocation.DATABASE, checksum="0" * 64, uploaded_by=1, directory_id=1,
+        ))
+        session.commit()
+    uploader._load_and_publish_files()
+    await asyncio.sleep(0)
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+    watcher._apply_file_changes(drain(subscription))
+    results = [
+        check(f"published row applied with {len(queries)} queries", not queries
+              and [f["original_filename"] for f in watcher.files] == ["new.txt", "old.txt"]),
+    ]
+
+    # The list's Download button gets the signed-URL download event, not a coroutine
+    download = await uploader.set_file_to_download(watcher.files[0]["file_id"])
+    results.append(check("download button returns the download event",
+                         isinstance(download, EventSpec)
+                         and "/api/files/" in str(fix_events([download], "tab")[0].payload["url"])))
+
+    # The list's delete button hands back the tree's file count update
+    adjust = uploader.set_file_to_delete(watcher.files[0]["file_id"])
+    await asyncio.sleep(0)
+    results.append(check("delete button returns the tree count update",
+                         isinstance(adjust, EventSpec) and "adjust_file_count" in adjust.handler.fn.__name__))
+    queries.clear()
+    watcher._apply_file_changes(drain(subscription))
+    results.append(check(f"delete applied with {len(queries)} queries", not queries
+                         and [f["original_filename"] for f in watcher.files] == ["old.txt"]))
+    FileEvents.unsubscribe("tab-watcher")
+    return results
+
+
+async def check_denied(engine) -> list:
+    """A session shown a private directory neither lists nor receives its files."""
+    watcher = await rx.State(_reflex_internal_init=True).get_state(FileStorageState)
+    token = watcher.router.session.client_token
+    watcher.set_current_directory_from_tree(1, "/public")
+    subscription = FileEvents.subscribe(token, 1)
+
+    watcher.set_current_directory_from_tree(2, "/private")
+    results = [check("denied directory lists nothing", watcher.access_denied and watcher.files == [])]
+
+    FileEvents.publish(2, ("upsert", {"file_id": 99, "directory_id": 2}))
+    FileEvents.publish_all(("reload", None))
+    await asyncio.sleep(0)
+    results.append(check("paused subscription receives nothing", drain(subscription) == []))
+
+    watcher._apply_file_changes([("reload", None), ("upsert", {"file_id": 99, "directory_id": 2})])
+    results.append(check("reload while denied lists nothing", watcher.access_denied and watcher.files == []))
+
+    watcher.set_current_directory_from_tree(1, "/public")
+    FileEvents.publish(1, ("delete", 5))
+    await asyncio.sleep(0)
+    results.append(check("opening a visible directory resumes updates", not watcher.access_denied
+                         and [f["original_filename"] for f in watcher.files] == ["old.txt"]
+                         and drain(subscription) == [("delete", 5)]))
+    FileEvents.unsubscribe(token)
+    return results
+
+
+async def check_file_events():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            FileDirectory(directory_id=1, name="public", full_path="/public", is_public=True),
+            FileDirectory(directory_id=2, name="private", full_path="/private", owner_id=42),
+        ])
+        session.add(FileMetadata(
+            filename="secret.txt", original_filename="secret.txt", file_type=FileType.TEXT, mime_type="text/plain",
+            file_size=1, storage_location=StorageLocation.DATABASE, checksum="2" * 64, uploaded_by=42, directory_id=2,
+        ))
+        session.add(FileMetadata(
+            filename="old.txt", original_filename="old.txt", file_type=FileType.TEXT, mime_type="text/plain",
+            file_size=1, storage_location=StorageLocation.DATABASE, checksum="1" * 64, uploaded_by=1, directory_id=1,
+        ))
+        session.commit()
+
+    results = await check_pub_sub() + await check_sessions(engine) + await check_denied(engine)
+    if all(results):
+        print("\n✓ File list changes are pushed to watching sessions")
+    else:
+        print("\n✗ File events check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_file_events())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Check the in-memory search index behind the catalog and asset search boxes.
+
+Verifies ranked prefix, infix and fuzzy matching on a few known names,
+compares the matches for many random queries with a brute-force scan of a
+large synthetic catalog, times typeahead lookups, and checks that adding,
+renaming and deleting catalog entries, vendors and assets through the ORM
+updates the shared indexes on commit (and not on rollback) without
+rebuilding them, while outside edits arrive once the index expires.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import update
+from sqlmodel import SQLModel, Session, create_engine
+from local_llama.models import SoftwareCatalog, SWManufacturer, Asset, Project, Building, Floor, SysType
+from local_llama.services.search_index import SearchIndex, CatalogSearch
+
+WORDS = ["lab", "labview", "view", "office", "visual", "studio", "reader", "acrobat", "matlab", "python",
+         "driver", "runtime", "toolkit", "server", "client", "vision", "daq", "max", "net", "sql"]
+DOCUMENTS = 20000
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def brute_force(documents, query):
+    """Documents whose tokens match every query token exactly, by prefix or (3+ characters) as a substring."""
+    query_tokens = SearchIndex.tokenize(query)
+    matches = set()
+    for key, text in documents.items():
+        tokens = SearchIndex.tokenize(text)
+        if all(any(t.startswith(q) or (len(q) >= 3 and q in t) for t in tokens) for q in query_tokens):
+            matches.add(key)
+    return matches
+
+
+def check_ranking():
+    index = SearchIndex({"name": 1.0, "vendor": 0.6})
+    for key, name, vendor in [
+        (1, "NI LabVIEW 7.1", "National Instruments"),
+        (2, "NI LabVIEW 2019", "National Instruments"),
+        (3, "LabWindows CVI 7", "National Instruments"),
+        (4, "Adobe Acrobat Reader", "Adobe"),
+        (5, "Vision Builder", "NI"),
+        (6, "LabVIEWRT Module", "National Instruments"),
+    ]:
+        index.add(key, {"name": name, "vendor": vendor})
+    return [
+        check("'labview 7' ranks NI LabVIEW 7.1 first", index.search("labview 7") == [1]),
+        check("prefix 'labv' finds every LabVIEW name", set(index.search("labv")) == {1, 2, 6}),
+        check("exact token outranks prefix", index.search("labview")[-1] == 6 and len(index.search("labview")) == 3),
+        check("infix 'view' finds LabVIEW", set(index.search("view")) == {1, 2, 6}),
+        check("typo 'labvew 7' still finds LabVIEW 7.1", index.search("labvew 7") == [1]),
+        check("name match outranks vendor match", set(index.search("ni")[:2]) == {1, 2} and index.search("ni")[2:] == [5]),
+        check("blank query returns nothing", index.search("  ") == []),
+        check("limit", len(index.search("ni", limit=2)) == 2),
+    ]
+
+
+def check_against_brute_force():
+    random.seed(3)
+    documents = {
+        key: " ".join(random.sample(WORDS, 3)) + f" {random.randint(1, 20)}.{random.randint(0, 9)} k{random.randint(0, 9999)}"
+        for key in range(DOCUMENTS)
+    }
+    index = SearchIndex({"name": 1.0})
+    started = time.perf_counter()
+    for key, text in documents.items():
+        index.add(key, {"name": text})
+    build = time.perf_counter() - started
+    indexed = len(index)
+
+    queries = [
+        random.choice(WORDS)[:random.randint(1, 6)] + random.choice(["", " 1", " 12", " stu", " k12", " k4711"])
+        for _ in range(200)
+    ]
+    mismatched = [q for q in queries if set(index.search(q)) != brute_force(documents, q)]
+
+    typeahead = ["l", "la", "lab", "labv", "labvi", "labvie", "labview", "labview 1", "labview 12", "labview 12.3"]
+    started = time.perf_counter()
+    for _ in range(20):
+        for query in typeahead:
+            index.ranked(query, limit=10)
+    per_query = (time.perf_counter() - started) / (20 * len(typeahead)) * 1e6
+
+    selective = ["labview k4711", "k1234 acrobat", "daq k99 vision"]
+    started = time.perf_counter()
+    for _ in range(100):
+        for query in selective:
+            index.ranked(query, limit=10)
+    per_selective = (time.perf_counter() - started) / (100 * len(selective)) * 1e6
+
+    for key in range(0, DOCUMENTS, 2):
+        index.remove(key)
+    remaining = {key: text for key, text in documents.items() if key % 2}
+    return [
+        check(f"indexed {DOCUMENTS} documents in {build:.2f}s", indexed == DOCUMENTS),
+        check(f"{len(queries)} random queries match a brute-force scan", not mismatched),
+        check(f"selective lookups take {per_selective:.0f}µs", per_selective < 1000),
+        check(f"typeahead sequence averages {per_query:.0f}µs per keystroke over {DOCUMENTS} names", per_query < 50000),
+        check("removing documents keeps matches exact", all(
+            set(index.search(q)) == brute_force(remaining, q) for q in queries[:50]
+        )),
+    ]
+
+
+def check_orm_updates():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}")
+    SQLModel.metadata.create_all(engine)
+    CatalogSearch.invalidate()
+    with Session(engine) as session:
+        session.add_all([
+            Project(project_id=1, project_name="STORM"),
+            Building(building_id=1, building_name="Building 370"),
+            Floor(floor_id=1, floor_name="Floor 1"),
+            SysType(systype_id=1, systype_name="Server"),
+            SWManufacturer(swmanu_id=1, swmanu_name="National Instruments", weblink="https://ni.com"),
+            SoftwareCatalog(software_catalog_id=1, sw_name="NI LabVIEW 7.1", sw_vendor=1),
+            Asset(asset_id=1, asset_name="storm-ws-01", project_id=1, building_id=1, floor_id=1, systype_id=1),
+        ])
+        session.commit()
+
+        results = [
+            check("software index built from the database", CatalogSearch.software_ids(session, "labview") == [1]),
+            check("asset index built from the database", CatalogSearch.asset_names(session, "ws 01") == ["storm-ws-01"]),
+            check("vendor searchable", CatalogSearch.software_ids(session, "national") == [1]),
+        ]
+        index = CatalogSearch.software_index(session)
+
+        session.add(SoftwareCatalog(software_catalog_id=2, sw_name="Vision Builder AI", sw_vendor=1, sw_category="Vision"))
+        session.add(Asset(asset_id=2, asset_name="storm-srv-02", project_id=1, building_id=1, floor_id=1, systype_id=1))
+        session.commit()
+        results += [
+            check("added software is searchable", CatalogSearch.software_ids(session, "vision build") == [2]),
+            check("added asset is searchable", CatalogSearch.asset_names(session, "srv") == ["storm-srv-02"]),
+        ]
+
+        software = session.get(SoftwareCatalog, 1)
+        software.sw_name = "NI LabVIEW 2020"
+        vendor = session.get(SWManufacturer, 1)
+        vendor.swmanu_name = "Emerson NI"
+        asset = session.get(Asset, 1)
+        asset.asset_name = "storm-ws-11"
+        session.commit()
+        results += [
+            check("renamed software found by its new name only",
+                  CatalogSearch.software_ids(session, "labview 2020") == [1]
+                  and CatalogSearch.software_ids(session, "labview 7") == []),
+            check("renamed vendor re-indexes its software",
+                  set(CatalogSearch.software_ids(session, "emerson")) == {1, 2}
+                  and CatalogSearch.software_ids(session, "national") == []),
+            check("renamed asset found by its new name only",
+                  CatalogSearch.asset_names(session, "ws 11") == ["storm-ws-11"]
+                  and CatalogSearch.asset_names(session, "ws 01") == []),
+        ]
+
+        session.delete(session.get(SoftwareCatalog, 2))
+        session.delete(session.get(Asset, 2))
+        session.commit()
+        results += [
+            check("deleted software no longer found", CatalogSearch.software_ids(session, "vision") == []),
+            check("deleted asset no longer found", CatalogSearch.asset_names(session, "srv") == []),
+            check("edits updated the index in place", CatalogSearch.software_index(session) is index),
+        ]
+
+        # Flushed but rolled-back edits never reach the index
+        software = session.get(SoftwareCatalog, 1)
+        software.sw_name = "Draft Name"
+        session.add(Asset(asset_id=3, asset_name="storm-tmp-03", project_id=1, building_id=1, floor_id=1, systype_id=1))
+        session.flush()
+        session.rollback()
+        results.append(check("rolled-back edits are not indexed",
+                             CatalogSearch.software_ids(session, "draft") == []
+                             and CatalogSearch.software_ids(session, "labview 2020") == [1]
+                             and CatalogSearch.asset_names(session, "tmp") == []))
+
+        # Edits the listeners never see (another worker, a bulk statement) arrive with the TTL
+        session.exec(update(SoftwareCatalog).where(SoftwareCatalog.software_catalog_id == 1).values(sw_name="TestStand 2021"))
+        session.commit()
+        stale = CatalogSearch.software_ids(session, "teststand") == []
+        ttl = CatalogSearch.TTL_SECONDS
+        CatalogSearch.TTL_SECONDS = 0
+        refreshed = CatalogSearch.software_ids(session, "teststand") == [1]
+        CatalogSearch.TTL_SECONDS = ttl
+        results.append(check("expired index is rebuilt with outside edits", stale and refreshed))
+    return results
+
+
+if __name__ == "__main__":
+    results = check_ranking() + check_against_brute_force() + check_orm_updates()
+    if all(results):
+        print("\n✓ Search index matches, ranks and stays current")
+    else:
+        print("\n✗ Search index check failed!")
+        sys.exit(1)
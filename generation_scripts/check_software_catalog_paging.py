@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Check that the software catalog is filtered, sorted and paged in SQL.
+
+Seeds a temporary SQLite database with a catalog, vendors, projects, assets
+and installs, then drives ConfigurationManagementState through the catalog,
+project and asset views and compares each page with the same rows filtered,
+sorted and sliced in Python. Every page, sort and filter change must cost a
+fixed number of queries (one count, one page) whatever the catalog size.
+"""
+
+import os
+import sys
+import random
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'catalog.db')}"
+
+import reflex as rx
+from collections import Counter
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models import SoftwareCatalog, SWManufacturer, AssetSoftware, Asset, Project, Building, Floor, SysType
+from local_llama.services.search_index import CatalogSearch
+from local_llama.services.software_catalog_loader import SoftwareCatalogLoader
+from local_llama.states.configuration_management_state import ConfigurationManagementState
+
+SOFTWARE = 2500
+ASSETS = 60
+CATEGORIES = ["OS", "Security", "Productivity", "Development", None]
+STATUSES = ["CMB Approved", "POAM Available", "POTENTIAL HAZARD", None]
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def seed(engine) -> tuple:
+    """Create the catalog and random installs; return the catalog rows and installs."""
+    random.seed(11)
+    with Session(engine) as session:
+        session.add_all([
+            Project(project_id=1, project_name="STORM"),
+            Project(project_id=2, project_name="GEARBOX"),
+            Building(building_id=1, building_name="Building 370"),
+            Floor(floor_id=1, floor_name="Floor 1"),
+            SysType(systype_id=1, systype_name="Server"),
+        ])
+        session.add_all([
+            SWManufacturer(swmanu_id=v, swmanu_name=f"Vendor {v % 7}_{v}", weblink="https://example.com")
+            for v in range(1, 21)
+        ])
+        catalog = []
+        for i in range(1, SOFTWARE + 1):
+            catalog.append(SoftwareCatalog(
+                software_catalog_id=i, sw_name=f"App {random.randint(0, 999):03d} #{i}",
+                sw_vendor=random.choice([None] + list(range(1, 21))),
+                sw_category=random.choice(CATEGORIES), latest_version=f"{i % 9}.{i % 4}",
+                dod_compliant=i % 3 == 0, army_gold_master=i % 5 == 0,
+                compliance_status=random.choice(STATUSES),
+            ))
+        session.add_all(catalog)
+        session.add_all([
+            Asset(asset_id=a, asset_name=f"asset-{a}", project_id=1 if a % 2 else 2,
+                  building_id=1, floor_id=1, systype_id=1)
+            for a in range(1, ASSETS + 1)
+        ])
+        installs = {
+            (random.randint(1, ASSETS), random.randint(1, SOFTWARE)) for _ in range(4000)
+        }
+        session.add_all([
+            AssetSoftware(asset_id=a, software_catalog_id=s, installed_version="9.9")
+            for a, s in installs
+        ])
+        session.commit()
+        rows = {
+            sw.software_catalog_id: {
+                "name": sw.sw_name,
+                "vendor": f"Vendor {sw.sw_vendor % 7}_{sw.sw_vendor}" if sw.sw_vendor else "Unknown",
+                "category": sw.sw_category or "Uncategorized",
+                "compliance_status": sw.compliance_status,
+                "dod_compliant": sw.dod_compliant,
+            }
+            for sw in catalog
+        }
+    return rows, installs
+
+
+def expected_page(rows, counts, state, matched=None, category=None, vendor=None, compliance=None):
+    """Filter, sort and page the reference rows the way the table should."""
+    matches = []
+    for software_id, row in rows.items():
+        if software_id not in counts:
+            continue
+        if matched is not None and software_id not in matched:
+            continue
+        if category and row["category"] != category:
+            continue
+        if vendor and row["vendor"] != vendor:
+            continue
+        if compliance == "DoD Compliant" and not row["dod_compliant"]:
+            continue
+        if compliance == "POAM Available" and row["compliance_status"] != compliance:
+            continue
+        matches.append((software_id, row))
+
+    key = {"name": lambda m: m[1]["name"], "installations": lambda m: counts[m[0]]}[state.sort_column]
+    matches.sort(key=lambda m: m[0])
+    matches.sort(key=key, reverse=not state.sort_ascending)
+    start = (state.current_page - 1) * state.items_per_page
+    return len(matches), [(m[1]["name"], counts[m[0]]) for m in matches[start:start + state.items_per_page]]
+
+
+def shown(state):
+    return [(sw["name"], sw["installations"]) for sw in state.paginated_software]
+
+
+async def check_software_catalog():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    rows, installs = seed(engine)
+    catalog_counts = {software_id: 0 for software_id in rows}
+    catalog_counts.update(Counter(s for _, s in installs))
+    project_counts = Counter(s for a, s in installs if a % 2)
+    asset_counts = {s: 1 for a, s in installs if a == 3}
+
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    root = rx.State(_reflex_internal_init=True)
+    state = await root.get_state(ConfigurationManagementState)
+    state.load_software_catalog()
+    results = [
+        check("catalog total", state.total_software == SOFTWARE),
+        check("first page", (state.filtered_software_count, shown(state))
+              == expected_page(rows, catalog_counts, state)),
+        check("page holds only one page of rows", len(state.filtered_software) == state.items_per_page),
+        check("category options", state.available_categories == sorted(c for c in CATEGORIES if c)),
+    ]
+
+    for label, action in [
+        ("next page", lambda: state.next_page()),
+        ("jump to page", lambda: state.set_page(40)),
+        ("sort by installations", lambda: state.sort_by_column("installations")),
+        ("sort descending", lambda: state.sort_by_column("installations")),
+        ("page while sorted", lambda: state.set_page(3)),
+        ("sort by name", lambda: state.sort_by_column("name")),
+    ]:
+        queries.clear()
+        action()
+        results += [
+            check(f"{label} took {len(queries)} queries", len(queries) == 2),
+            check(f"{label} page", (state.filtered_software_count, shown(state))
+                  == expected_page(rows, catalog_counts, state)),
+        ]
+
+    # The search box is answered by the in-memory index (built by the first load)
+    with Session(engine) as session:
+        matched = set(CatalogSearch.software_ids(session, "app 12"))
+        unknown = set(CatalogSearch.software_ids(session, "unknown"))
+    queries.clear()
+    state.set_software_search("app 12")
+    results += [
+        check(f"search took {len(queries)} queries", len(queries) == 2),
+        check("search page", 0 < state.filtered_software_count < SOFTWARE and (state.filtered_software_count, shown(state))
+              == expected_page(rows, catalog_counts, state, matched=matched)),
+    ]
+    state.set_software_search("unknown")
+    results.append(check("search matches the Unknown vendor placeholder",
+                         unknown == {s for s, row in rows.items() if row["vendor"] == "Unknown"}
+                         and (state.filtered_software_count, shown(state))
+                         == expected_page(rows, catalog_counts, state, matched=unknown)))
+
+    # A broad search matches too many ids to send, so its words are matched in SQL
+    with Session(engine) as session:
+        broad = CatalogSearch.software_ids(session, "ap")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    queries.clear()
+    state.set_software_search("ap")
+    words = {s for s, row in rows.items() if "ap" in f"{row['name']}|{row['vendor']}|{row['category']}".lower()}
+    results += [
+        check(f"broad search ({len(broad)} matches) took {len(queries)} queries",
+              len(broad) > SoftwareCatalogLoader.MAX_SEARCH_IDS and len(queries) == 2),
+        check("broad search does not inline ids", all(len(statement) < 4000 for statement in statements)),
+        check("broad search page", (state.filtered_software_count, shown(state))
+              == expected_page(rows, catalog_counts, state, matched=words)),
+    ]
+    state.set_software_search("zzzz")
+    results.append(check("search without matches", state.filtered_software_count == 0))
+
+    state.set_software_search("")
+    state.set_selected_category("Security")
+    state.set_selected_vendor("Vendor 3_10")
+    state.set_selected_compliance("DoD Compliant")
+    results.append(check("dropdown filters", (state.filtered_software_count, shown(state)) == expected_page(
+        rows, catalog_counts, state, category="Security", vendor="Vendor 3_10", compliance="DoD Compliant"
+    )))
+    state.clear_all_filters()
+
+    state.set_selected_compliance("POAM Available")
+    state.set_page(2)
+    export = state.export_all_data("json")
+    results.append(check("export all runs the unpaged query",
+                         export is not None and state.filtered_software_count > state.items_per_page))
+    state.clear_all_filters()
+
+    state.set_view_mode("asset")
+    state.set_selected_project("STORM")
+    results += [
+        check("project scope", (state.filtered_software_count, shown(state))
+              == expected_page(rows, project_counts, state)),
+        check("project vendors", state.available_vendors == sorted(
+            {rows[s]["vendor"] for s in project_counts} - {"Unknown"}
+        )),
+    ]
+    state.sort_by_column("installations")
+    results.append(check("project scope sorted by installs", (state.filtered_software_count, shown(state))
+                         == expected_page(rows, project_counts, state)))
+
+    state.set_selected_asset("asset-3")
+    results.append(check("asset scope", (state.filtered_software_count, shown(state))
+                         == expected_page(rows, asset_counts, state)))
+
+    state.set_selected_project("All Projects")
+    results.append(check("all projects shows nothing", state.filtered_software_count == 0 and not state.has_software))
+
+    if all(results):
+        print("\n✓ Software catalog is sorted, filtered and paged in SQL")
+    else:
+        print("\n✗ Software catalog check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_software_catalog())
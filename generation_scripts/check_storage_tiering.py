@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Check the storage tier policy moves blobs the right way.
+
+Seeds an in-memory SQLite database with a hot small filesystem blob, a cold
+large database blob, an oversized database blob and a quiet small one, then
+verifies that StorageTiering.run() promotes nothing until both tiers' read
+latency is measured, then promotes and demotes exactly the expected blobs,
+keeps their content readable, records each migration on FileMetadata, keeps
+a promoted blob's file through the unlink grace period and decays recent
+download counts.
+"""
+
+import os
+import sys
+import hashlib
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from sqlmodel import SQLModel, Session, create_engine, select
+from local_llama.models.file_storage import FileMetadata, FileBlob, FileType, StorageLocation
+from local_llama.services.blob_store import BlobStore
+from local_llama.services.storage_tiering import StorageTiering
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def add_file(session: Session, content: bytes, location: StorageLocation, recent_downloads: int, last_used: datetime) -> int:
+    """Store one file with the given usage and return its id."""
+    checksum = hashlib.sha256(content).hexdigest()
+    blob = BlobStore.store(session, checksum, len(content), location, content=content)
+    metadata = FileMetadata(
+        filename="report.txt", original_filename="report.txt", file_type=FileType.TEXT,
+        mime_type="text/plain", file_size=len(content), storage_location=blob.storage_location,
+        file_path=blob.blob_path, checksum=checksum, blob_id=blob.blob_id, uploaded_by=1,
+        uploaded_at=last_used, last_accessed=last_used, recent_downloads=recent_downloads,
+    )
+    session.add(metadata)
+    session.commit()
+    return metadata.file_id
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def check_storage_tiering():
+    """Run the policy once and inspect the result."""
+    BlobStore.ROOT = os.path.join(tempfile.mkdtemp(), "blobs")
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+
+    recent = NOW - timedelta(days=1)
+    stale = NOW - timedelta(days=90)
+    contents = {
+        "hot": b"hot checklist " * 1000,                  # 14KB on disk, downloaded a lot
+        "cold": b"old audit log " * 40000,                # 560KB in the database, untouched
+        "oversized": b"x" * (11 * 1024 * 1024),           # over the database size limit
+        "quiet": b"small note",                           # small, cold, stays put
+    }
+    with Session(engine) as session:
+        ids = {
+            "hot": add_file(session, contents["hot"], StorageLocation.FILESYSTEM, 8, recent),
+            "cold": add_file(session, contents["cold"], StorageLocation.DATABASE, 0, stale),
+            "oversized": add_file(session, contents["oversized"], StorageLocation.DATABASE, 3, recent),
+            "quiet": add_file(session, contents["quiet"], StorageLocation.DATABASE, 0, stale),
+        }
+        hot_path = session.get(FileMetadata, ids["hot"]).file_path
+
+        # Without latency samples for both tiers only demotions happen
+        StorageTiering.record_read(StorageLocation.DATABASE, 0.001)
+        planned = StorageTiering.run(session, now=NOW, dry_run=True)
+        results = [check("nothing promoted before both tiers are measured",
+                         [target for _, target, _ in planned] == [StorageLocation.FILESYSTEM] * 2)]
+        for _ in range(StorageTiering.policy()["min_latency_samples"]):
+            StorageTiering.record_read(StorageLocation.DATABASE, 0.001)
+            StorageTiering.record_read(StorageLocation.FILESYSTEM, 0.004)
+
+        applied = StorageTiering.run(session, now=NOW)
+
+        expected = {
+            "hot": StorageLocation.DATABASE,
+            "cold": StorageLocation.FILESYSTEM,
+            "oversized": StorageLocation.FILESYSTEM,
+            "quiet": StorageLocation.DATABASE,
+        }
+        results.append(check(f"{len(applied)} migrations applied", len(applied) == 3))
+        for name, file_id in ids.items():
+            session.expire_all()
+            metadata = session.get(FileMetadata, file_id)
+            blob = BlobStore.get_blob(session, metadata.blob_id)
+            moved = name != "quiet"
+            results.append(check(
+                f"{name}: now {metadata.storage_location.value}"
+                f"{' (' + metadata.storage_migration_reason + ')' if metadata.storage_migration_reason else ''}",
+                metadata.storage_location == blob.storage_location == expected[name]
+                and (metadata.storage_migrated_at is not None) == moved
+                and BlobStore.read(session, metadata) == contents[name]
+            ))
+
+        db_paths = session.exec(select(FileBlob.blob_path).where(FileBlob.storage_location == StorageLocation.DATABASE)).all()
+        results.append(check("promoted blob's file kept for running downloads, database blobs have no path",
+                             os.path.exists(hot_path) and not any(db_paths)))
+        results.append(check("recent downloads halved",
+                             session.get(FileMetadata, ids["hot"]).recent_downloads == 4))
+        results.append(check("second run is a no-op", StorageTiering.run(session, now=NOW) == []))
+
+        # Nothing is held in memory: any later run (here with no grace left) removes the file
+        os.environ["STORAGE_TIER_UNLINK_GRACE_SECONDS"] = "0"
+        StorageTiering.run(session, now=NOW)
+        results.append(check("promoted blob's file removed after the grace period", not os.path.exists(hot_path)))
+        results.append(check("demoted blobs' files are kept", all(
+            os.path.exists(BlobStore.blob_path(hashlib.sha256(contents[name]).hexdigest()))
+            for name in ("cold", "oversized")
+        )))
+        del os.environ["STORAGE_TIER_UNLINK_GRACE_SECONDS"]
+
+    if all(results):
+        print("\n✓ Storage tier policy promotes hot and demotes cold blobs")
+    else:
+        print("\n✗ Storage tier policy check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_storage_tiering()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Check the set-based unresolved failure query against the per-row logic.
+
+Seeds an in-memory SQLite database with random Failed/Success/Partial
+records for the log, DAT and image tables, then verifies for each table that
+UnresolvedFailures returns exactly the ids the old per-failure "was there a
+success after this?" loop flagged, in a single statement.
+"""
+
+import os
+import sys
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+from local_llama.models import LogCollection, DatUpdate, ImageCollection
+from local_llama.services.unresolved_failures import UnresolvedFailures
+
+RESULTS = ["Failed", "Success", "Partial"]
+
+
+def make_record(table: str, asset_id: int, record_date: datetime, result: str):
+    """Build one record for a table key with the required fields filled in."""
+    common = {"employee_id": 1, "asset_id": asset_id, "project_id": 1}
+    if table == "log":
+        return LogCollection(logcollection_date=record_date, logtype_id=1, logcollection_result=result, **common)
+    if table == "dat":
+        return DatUpdate(date_of_update=record_date, datversion_id=1, datfile_name="dat.zip", update_result=result, **common)
+    return ImageCollection(imgcollection_date=record_date, imgmethod_id=1, imaging_result=result, **common)
+
+
+def per_row_unresolved(session: Session, table: str) -> set:
+    """The previous implementation: one success lookup per failed record."""
+    model, id_field, date_field, result_field = UnresolvedFailures.TABLES[table]
+    id_col, date_col, result_col = getattr(model, id_field), getattr(model, date_field), getattr(model, result_field)
+
+    failed_without_success = set()
+    failed_records = session.exec(
+        select(model.asset_id, date_col, id_col).where(result_col == "Failed")
+    ).all()
+    for asset_id, failed_date, failed_id in failed_records:
+        success_after = session.exec(
+            select(id_col)
+            .where(model.asset_id == asset_id, result_col == "Success", date_col > failed_date)
+            .limit(1)
+        ).first()
+        if not success_after:
+            failed_without_success.add(failed_id)
+    return failed_without_success
+
+
+def check_table(table: str, record_count: int = 500) -> bool:
+    """Compare both implementations on random data for one table."""
+    rng = random.Random(table)
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+
+    with Session(engine) as session:
+        for _ in range(record_count):
+            session.add(make_record(
+                table,
+                asset_id=rng.randint(1, 25),
+                # Coarse timestamps so some records share a date (strictly-after must hold)
+                record_date=start + timedelta(hours=rng.randint(0, 200)),
+                result=rng.choice(RESULTS),
+            ))
+        session.commit()
+
+    with Session(engine) as session:
+        expected = per_row_unresolved(session, table)
+
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        actual = UnresolvedFailures.get_ids(session, table)
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+        # Restricting to a "page" of ids must give the same flags for those ids
+        model, id_field, _, _ = UnresolvedFailures.TABLES[table]
+        page_ids = session.exec(select(getattr(model, id_field)).limit(20)).all()
+        page_actual = UnresolvedFailures.get_ids(session, table, page_ids)
+
+    ok = actual == expected and page_actual == expected & set(page_ids) and len(statements) == 1
+    mark = "✓" if ok else "✗"
+    print(f"{mark} {table:<6} {len(expected):>3} unresolved per-row, {len(actual):>3} set-based, "
+          f"{len(statements)} statement(s)")
+    return ok
+
+
+def check_unresolved_failures():
+    """Verify every collection table matches the per-row logic."""
+    results = [check_table(table) for table in UnresolvedFailures.TABLES]
+    if all(results):
+        print("\n✓ Set-based unresolved failures match the per-row logic for all tables")
+    else:
+        print("\n✗ Unresolved failure flags differ from the per-row logic!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_unresolved_failures()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Check that the signed-in user's identity is resolved once per session.
+
+Seeds a temporary SQLite database with employees and app users, then
+verifies UserIdentity.lookup() for employee and AppUser emails, and that
+get_identity() queries the database only when the Clerk email changes.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'identity.db')}"
+
+import reflex as rx
+import reflex_clerk_api as clerk
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from local_llama.database.engine import get_engine
+from local_llama.models.app_user import AppUser
+from local_llama.models.employee import Employee
+from local_llama.services.user_identity import UserIdentity
+from local_llama.states.auth_state import get_identity
+from local_llama.states.file_storage_state import FileStorageState
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+async def check_session_cache(engine) -> list:
+    """Resolve identities through a fresh state tree, counting queries."""
+    queries = []
+    event.listen(engine, "before_execute", lambda *args: queries.append(1))
+
+    root = rx.State(_reflex_internal_init=True)
+    clerk_user = await root.get_state(clerk.ClerkUser)
+    file_state = await root.get_state(FileStorageState)
+
+    clerk_user.email_address = "ann.analyst@example.mil"
+    await file_state.sync_user_from_auth()
+    for _ in range(10):
+        auth_state = await get_identity(file_state)
+    results = [
+        check("file state uses the signed-in employee", file_state.current_user_id == 2),
+        check("AppUser id cached for activities", auth_state.current_user_id == 12),
+        check(f"one lookup for 11 uses ({len(queries)} queries)", len(queries) == 1),
+    ]
+
+    clerk_user.email_address = "sam.sysadmin@example.mil"
+    auth_state = await get_identity(file_state)
+    results.append(check("new sign-in resolved again", auth_state.current_employee_id == 1 and len(queries) == 2))
+
+    clerk_user.email_address = ""
+    auth_state = await get_identity(file_state)
+    results.append(check("sign-out clears the identity", auth_state.current_employee_id is None and len(queries) == 2))
+    return results
+
+
+def check_user_identity():
+    engine = get_engine(os.environ["DATABASE_URL"])
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Employee(id=1, first_name="Sam", last_name="Sysadmin", email="sam.sysadmin@example.mil", department_id=5))
+        session.add(Employee(id=2, first_name="Ann", last_name="Analyst", email="ann.analyst@example.mil", department_id=2))
+        session.add(AppUser(id=11, first_name="Sam", last_name="Sysadmin", email="sam@login.example.mil",
+                            employee_id=1, department_id=5, priv_level_id=1))
+        session.add(AppUser(id=12, first_name="Ann", last_name="Analyst", email="ann@login.example.mil",
+                            employee_id=2, department_id=2, priv_level_id=1))
+        session.commit()
+
+        results = [
+            check("employee email", UserIdentity.lookup(session, "sam.sysadmin@example.mil") == (11, 1, 5, "Sam Sysadmin")),
+            check("AppUser email", UserIdentity.lookup(session, "ann@login.example.mil") == (12, 2, 2, "Ann Analyst")),
+            check("unknown email", UserIdentity.lookup(session, "nobody@example.mil") is None),
+            check("cybersecurity department", UserIdentity.is_cybersecurity_team("ann.analyst@example.mil", 2)),
+            check("other department", not UserIdentity.is_cybersecurity_team("sam.sysadmin@example.mil", 5)),
+        ]
+
+    results += asyncio.run(check_session_cache(engine))
+
+    if all(results):
+        print("\n✓ User identity is resolved once per session")
+    else:
+        print("\n✗ User identity check failed!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_user_identity()
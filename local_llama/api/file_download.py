@@ -0,0 +1,248 @@
+import os
+import re
+import hmac
+import time
+import hashlib
+import secrets
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from reflex.config import get_config
+from sqlmodel import Session, select, func
+from ..database.engine import get_engine
+from ..models.file_storage import FileMetadata, FileBlob, FileContent, StorageLocation
+from ..services.blob_store import BlobStore
+from ..services.file_preview import FilePreview
+from ..services.storage_tiering import StorageTiering
+
+
+class FileDownload:
+    """Streaming HTTP downloads for stored files.
+
+    Content is sent in CHUNK_SIZE pieces straight from the blob file or, for
+    database storage, from SUBSTRING reads of the blob column, so memory per
+    download stays bounded and the websocket is never involved. Single
+    Range requests and ETag / If-None-Match (the SHA-256 checksum) are
+    supported. URLs are signed by the app after its own access check and
+    expire after one to two URL_TTL_SECONDS.
+    """
+
+    CHUNK_SIZE = 1024 * 1024  # 1MB
+    URL_TTL_SECONDS = 3600
+
+    # Used when FILE_URL_SECRET is not set, so URLs then only work on this worker
+    _fallback_secret = secrets.token_hex(32)
+
+    @staticmethod
+    def _signature(file_id: int, expires: int, route: str) -> str:
+        """Sign a route, file id and expiry time."""
+        secret = (os.getenv("FILE_URL_SECRET") or FileDownload._fallback_secret).encode()
+        message = f"{route}:{file_id}:{expires}".encode()
+        return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def url(file_id: int, preview: bool = False) -> str:
+        """Build a signed, absolute backend URL for downloading or previewing a file.
+
+        Expiry is rounded to URL_TTL_SECONDS windows, so the URL (and the
+        browser's cached copy) stays the same across list refreshes.
+        """
+        route = "preview" if preview else "download"
+        expires = (int(time.time()) // FileDownload.URL_TTL_SECONDS + 2) * FileDownload.URL_TTL_SECONDS
+        signature = FileDownload._signature(file_id, expires, route)
+        suffix = "/preview" if preview else ""
+        return f"{get_config().api_url}/api/files/{file_id}{suffix}?expires={expires}&signature={signature}"
+
+    @staticmethod
+    def verify(file_id: int, expires: int, signature: str, preview: bool = False) -> bool:
+        """Check a download or preview URL's signature and expiry."""
+        if expires < time.time():
+            return False
+        route = "preview" if preview else "download"
+        return hmac.compare_digest(FileDownload._signature(file_id, expires, route), signature)
+
+    @staticmethod
+    def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+        """Parse a single "bytes=" Range header.
+
+        Returns:
+            (start, end) inclusive, None to send the whole file, or (-1, -1)
+            if the range cannot be satisfied
+        """
+        match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header or "")
+        if not match or match.group(1) == match.group(2) == "":
+            # Absent, malformed or multi-range: the full file is a valid answer
+            return None
+
+        first, last = match.groups()
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0 or size == 0:
+                return -1, -1
+            return max(0, size - length), size - 1
+
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return -1, -1
+        return start, end
+
+    @staticmethod
+    def _file_chunks(path: str, start: int, length: int) -> Iterator[bytes]:
+        """Read part of a file in chunks (raises if it ends early)."""
+        with open(path, "rb") as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(FileDownload.CHUNK_SIZE, length))
+                if not chunk:
+                    raise IOError(f"{path} ended {length} bytes early")
+                length -= len(chunk)
+                yield chunk
+
+    @staticmethod
+    def _db_chunks(engine, column, where, start: int, length: int) -> Iterator[bytes]:
+        """Read part of a database blob in chunks with SUBSTRING (1-based).
+
+        Content-Length has already been sent, so a chunk that comes back
+        short or NULL (the blob was demoted or deleted mid-download) raises,
+        aborting the response instead of ending it early.
+        """
+        with Session(engine) as session:
+            while length > 0:
+                size = min(FileDownload.CHUNK_SIZE, length)
+                chunk = session.exec(select(func.substring(column, start + 1, size)).where(where)).first()
+                if not chunk or len(chunk) < size:
+                    raise IOError(f"Blob content changed during download at byte {start}")
+                start += len(chunk)
+                length -= len(chunk)
+                yield chunk
+
+    @staticmethod
+    def _timed(chunks: Iterator[bytes], tier: StorageLocation) -> Iterator[bytes]:
+        """Pass chunks through, reporting the time to the first one as the tier's read latency."""
+        started = time.perf_counter()
+        first = next(chunks, None)
+        if first is None:
+            return
+        StorageTiering.record_read(tier, time.perf_counter() - started)
+        yield first
+        yield from chunks
+
+    @staticmethod
+    def response(engine, file_id: int, request: Request) -> Response:
+        """Build the streaming (or 304/404/416) response for a file."""
+        with Session(engine) as session:
+            metadata = session.get(FileMetadata, file_id)
+            if not metadata:
+                return Response(status_code=404)
+            blob = BlobStore.get_blob(session, metadata.blob_id) if metadata.blob_id else None
+
+        etag = f'"{metadata.checksum}"'
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=0, must-revalidate",
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        # Work out where the bytes are
+        if blob and blob.storage_location == StorageLocation.DATABASE:
+            size = blob.file_size
+            source = (FileBlob.content, FileBlob.blob_id == blob.blob_id)
+        elif not blob and metadata.storage_location == StorageLocation.DATABASE:
+            size = metadata.file_size
+            source = (FileContent.content, FileContent.file_id == file_id)
+        else:
+            path = blob.blob_path if blob else metadata.file_path
+            if not path or not os.path.exists(path):
+                return Response(status_code=404)
+            size = os.path.getsize(path)
+            source = path
+
+        # If-Range: only honour the range when the client's copy is still current
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range == etag:
+            byte_range = FileDownload.parse_range(request.headers.get("range"), size)
+
+        status = 200
+        start, end = 0, size - 1
+        if byte_range == (-1, -1):
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range:
+            status = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        length = end - start + 1
+        headers["Content-Length"] = str(length)
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(metadata.original_filename)}"
+
+        if isinstance(source, str):
+            tier = StorageLocation.FILESYSTEM
+            chunks = FileDownload._file_chunks(source, start, length)
+        else:
+            tier = StorageLocation.DATABASE
+            chunks = FileDownload._db_chunks(engine, source[0], source[1], start, length)
+
+        # Count downloads (not every range of a resumed one) for the storage tier policy
+        if start == 0:
+            with Session(engine) as session:
+                StorageTiering.record_download(session, file_id)
+                session.commit()
+
+        # Sync iterators are run in a threadpool, keeping file/DB reads off the event loop
+        return StreamingResponse(
+            FileDownload._timed(chunks, tier), status_code=status, headers=headers, media_type=metadata.mime_type
+        )
+
+
+files_api = FastAPI()
+
+
+@files_api.get("/api/files/{file_id}")
+def download_file(file_id: int, request: Request, expires: int = 0, signature: str = ""):
+    """Stream a stored file to a holder of a signed URL."""
+    if not FileDownload.verify(file_id, expires, signature):
+        return Response(status_code=403)
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        return Response(status_code=503)
+
+    return FileDownload.response(get_engine(database_url), file_id, request)
+
+
+@files_api.get("/api/files/{file_id}/preview")
+def preview_file(file_id: int, request: Request, expires: int = 0, signature: str = ""):
+    """Serve a file's cached preview to a holder of a signed URL."""
+    if not FileDownload.verify(file_id, expires, signature, preview=True):
+        return Response(status_code=403)
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        return Response(status_code=503)
+
+    with Session(get_engine(database_url)) as session:
+        metadata = session.get(FileMetadata, file_id)
+        preview = FilePreview.get(session, metadata) if metadata else None
+    if not preview:
+        return Response(status_code=404)
+
+    path, media_type = preview
+    headers = {
+        "ETag": f'"{metadata.checksum}-preview"',
+        "Cache-Control": "private, max-age=86400",
+        "X-Content-Type-Options": "nosniff",
+        # Uploaded SVGs must never run scripts, even when opened directly
+        "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+    }
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -1,6 +1,7 @@
 import reflex as rx
 from typing import List, Dict
 from ..states.file_storage_state import FileStorageState
+from ..services.bulk_upload import BulkUpload
 from .upload_animation import creative_upload_animation, file_appear_animation
 from .shared_styles import BUTTON_STYLE, BUTTON_SOFT_STYLE
 
@@ -98,7 +99,7 @@ def file_upload_zone() -> rx.Component:
                 }
             },
             on_drop=FileStorageState.handle_upload,
-            multiple=False,  # Change to single file to ensure clean state
+            multiple=True,  # One file opens the rename dialog; several use the naming rule
             accept={
                 "text/markdown": [".md"],
                 "text/plain": [".txt"],
@@ -140,6 +141,37 @@ def file_upload_zone() -> rx.Component:
                 align="center",
             ),
         ),
+        rx.hstack(
+            rx.text(
+                "Naming for multiple files",
+                size="2",
+                style={"color": "rgba(156, 163, 175, 0.8)"},
+            ),
+            rx.select.root(
+                rx.select.trigger(),
+                rx.select.content(
+                    *[
+                        rx.select.item(label, value=rule)
+                        for rule, label in BulkUpload.NAMING_RULES.items()
+                    ]
+                ),
+                value=FileStorageState.bulk_naming_rule,
+                on_change=FileStorageState.set_bulk_naming_rule,
+                size="1",
+            ),
+            spacing="3",
+            align="center",
+        ),
+        rx.cond(
+            FileStorageState.bulk_uploads.length() > 0,
+            rx.vstack(
+                rx.foreach(FileStorageState.bulk_uploads, bulk_upload_row),
+                spacing="2",
+                width="100%",
+                max_height="240px",
+                overflow_y="auto",
+            ),
+        ),
         rx.cond(
             FileStorageState.error_message != "",
             rx.text(
@@ -153,6 +185,32 @@ def file_upload_zone() -> rx.Component:
     )
 
 
+def bulk_upload_row(item: Dict) -> rx.Component:
+    """Progress for one file of a multi-file upload."""
+    return rx.vstack(
+        rx.hstack(
+            rx.text(
+                item["name"],
+                size="1",
+                weight="medium",
+                style={"color": "rgba(255, 255, 255, 0.9)"},
+            ),
+            rx.spacer(),
+            rx.text(
+                item["size"],
+                " · ",
+                item["status"],
+                size="1",
+                style={"color": "rgba(156, 163, 175, 0.8)"},
+            ),
+            width="100%",
+        ),
+        rx.progress(value=item["progress"], size="1", width="100%"),
+        spacing="1",
+        width="100%",
+    )
+
+
 def file_type_icon(file_type: str) -> rx.Component:
     """Return appropriate icon for file type with modern colors."""
     icon_config = {
@@ -178,10 +236,54 @@ def file_type_icon(file_type: str) -> rx.Component:
     )
 
 
+def preview_thumbnail(preview_url: str) -> rx.Component:
+    """Small thumbnail loaded from the backend preview route."""
+    return rx.image(
+        src=preview_url,
+        loading="lazy",
+        width="2.5rem",
+        height="2.5rem",
+        style={
+            "object_fit": "cover",
+            "border_radius": "0.5rem",
+            "border": "1px solid rgba(255, 255, 255, 0.08)",
+        }
+    )
+
+
+def file_preview(file_data: Dict) -> rx.Component:
+    """Thumbnail for images, hover text preview for text files, otherwise the type icon."""
+    return rx.match(
+        file_data["preview_kind"],
+        ("image", preview_thumbnail(file_data["preview_url"])),
+        ("svg", preview_thumbnail(file_data["preview_url"])),
+        ("text", rx.hover_card.root(
+            rx.hover_card.trigger(
+                rx.box(file_type_icon(file_data["file_type"]))
+            ),
+            rx.hover_card.content(
+                # Only fetched when the card opens; the preview is the first few KB
+                rx.el.iframe(
+                    src=file_data["preview_url"],
+                    style={
+                        "width": "24rem",
+                        "height": "16rem",
+                        "border": "none",
+                        "background": "white",
+                        "border_radius": "0.5rem",
+                    }
+                ),
+                side="right",
+            ),
+        )),
+        file_type_icon(file_data["file_type"]),
+    )
+
+
 def file_list_item(file_data: Dict, index: int) -> rx.Component:
     """Display a single file in the list with modern styling."""
     return rx.hstack(
-        file_type_icon(file_data["file_type"]),
+        file_preview(file_data),
         rx.vstack(
             rx.text(
                 file_data["original_filename"],
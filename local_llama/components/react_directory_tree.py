@@ -157,6 +157,9 @@ def react_directory_tree() -> rx.Component:
             margin_bottom="1rem",
         ),
         
+        # Grey out directories the user cannot open
+        rx.html(DirectoryState.locked_tree_css),
+        
         # React File Tree component - simplified container
         rx.cond(
             DirectoryState.loading_directories,
@@ -0,0 +1,76 @@
+"""Shared database engine with a tuned connection pool.
+
+States, API handlers and seeds get their engine from get_engine() instead of
+calling create_engine() per event, so connections (and the MSSQL/pyodbc
+login handshake) are reused across requests. Pool settings can be adjusted
+through environment variables:
+
+    DB_POOL_SIZE      connections kept open (default 10)
+    DB_MAX_OVERFLOW   extra connections allowed under load (default 20)
+    DB_POOL_TIMEOUT   seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE   seconds before a connection is replaced (default 1800)
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_engines: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+def get_engine_args(database_url: str) -> dict:
+    """Get the create_engine() pool arguments for a database URL."""
+    if database_url.startswith("sqlite"):
+        # SQLite uses its own single-file pools, which take no sizing arguments
+        return {"connect_args": {"check_same_thread": False}}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Recycle before MSSQL/firewalls drop idle connections
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        # Test connections on checkout so a dropped connection is replaced, not raised
+        "pool_pre_ping": True,
+    }
+
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """Get the shared engine for a database URL, creating it on first use.
+
+    Args:
+        database_url: Database URL; defaults to the DATABASE_URL environment variable
+
+    Returns:
+        The process-wide engine for that URL
+
+    Raises:
+        ValueError: If no database URL is given or configured
+    """
+    database_url = database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    engine = _engines.get(database_url)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        # Another thread may have created it while we waited
+        if database_url not in _engines:
+            _engines[database_url] = create_engine(database_url, **get_engine_args(database_url))
+        return _engines[database_url]
+
+
+def dispose_engines():
+    """Close every pooled connection (e.g. on shutdown or after forking)."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.building import Building
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_buildings():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Building data to insert
     buildings_data = [
@@ -40,6 +42,7 @@ def seed_buildings():
         if buildings_to_add:
             session.add_all(buildings_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("building")
             print(f"Added {len(buildings_to_add)} buildings to the database.")
         else:
             print("All buildings already exist in the database.")
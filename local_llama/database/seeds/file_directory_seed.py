@@ -3,7 +3,8 @@ import sys
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from datetime import datetime
 from local_llama.models.file_storage import FileDirectory, DirectoryType
 from dotenv import load_dotenv
@@ -17,7 +18,7 @@ if not database_url:
     print("DATABASE_URL environment variable not set")
     exit(1)
 
-engine = create_engine(database_url)
+engine = get_engine(database_url)
 
 # Predefined directory structure
 SYSTEM_DIRECTORIES = [
@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.floor import Floor
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_floors():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Floor data to insert (generic floor levels)
     floors_data = [
@@ -35,6 +37,7 @@ def seed_floors():
         if floors_to_add:
             session.add_all(floors_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("floor")
             print(f"Added {len(floors_to_add)} floors to the database.")
         else:
             print("All floors already exist in the database.")
@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.hardware_manufacturer import HardwareManufacturer
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_hardware_manufacturers():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Hardware manufacturer data to insert (name, weblink, phone_number)
     hardware_manufacturers_data = [
@@ -121,6 +123,7 @@ def seed_hardware_manufacturers():
         if manufacturers_to_add:
             session.add_all(manufacturers_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("hardware_manufacturer")
             print(f"Added {len(manufacturers_to_add)} hardware manufacturers to the database.")
         else:
             print("All hardware manufacturers already exist in the database.")
@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.imaging_method import ImagingMethod
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_imagingmethods():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # ImagingMethod data to insert
     imagingmethods_data = [
@@ -45,6 +47,7 @@ def seed_imagingmethods():
         if methods_to_add:
             session.add_all(methods_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("imaging_method")
             print(f"Added {len(methods_to_add)} imaging methods to the database.")
         else:
             print("All imaging methods already exist in the database.")
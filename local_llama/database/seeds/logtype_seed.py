@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.log_type import LogType
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_logtypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # LogType data to insert
     logtypes_data = [
@@ -78,6 +80,7 @@ def seed_logtypes():
         if logtypes_to_add:
             session.add_all(logtypes_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("logtype")
             print(f"Added {len(logtypes_to_add)} log types to the database.")
         else:
             print("All log types already exist in the database.")
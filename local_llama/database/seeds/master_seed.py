@@ -4,7 +4,8 @@ This file must be updated after each seed data file addition to ensure all seed
 can be executed in one script without errors.
 """
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.building import Building
 from local_llama.models.floor import Floor
 from local_llama.models.sys_type import SysType
@@ -31,6 +32,7 @@ from local_llama.models.virt_source import VirtualizationSource
 from local_llama.models.vm_status import VMStatus
 from local_llama.models.asset import Asset
 from local_llama.models.software_catalog import SoftwareCatalog
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -44,7 +46,7 @@ def seed_buildings():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Building data to insert
     buildings_data = [
@@ -83,7 +85,7 @@ def seed_floors():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Floor data to insert
     floors_data = [
@@ -117,7 +119,7 @@ def seed_systypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # SysType data to insert
     systypes_data = [
@@ -159,7 +161,7 @@ def seed_hardware_manufacturers():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Hardware manufacturer data to insert (name, weblink)
     hardware_manufacturers_data = [
@@ -279,7 +281,7 @@ def seed_sw_manufacturers():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Software manufacturer data to insert (name, weblink, contact)
     sw_manufacturers_data = [
@@ -361,7 +363,7 @@ def seed_projects():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Project data to insert
     projects_data = [
@@ -398,7 +400,7 @@ def seed_operating_systems():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Operating system data to insert
     operating_systems_data = [
@@ -525,7 +527,7 @@ def seed_oseditions():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # OS Edition data to insert (edition_name)
     oseditions_data = [
@@ -604,7 +606,7 @@ def seed_osversions():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Get all existing OSEditions to create a mapping
     with Session(engine) as session:
@@ -678,7 +680,7 @@ def seed_logtypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # LogType data to insert
     logtypes_data = [
@@ -755,7 +757,7 @@ def seed_imagingmethods():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # ImagingMethod data to insert
     imagingmethods_data = [
@@ -799,7 +801,7 @@ def seed_sysarchitectures():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # SysArchitecture data to insert
     sysarchitectures_data = [
@@ -876,7 +878,7 @@ def seed_cputypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # CPUType data to insert (abbreviated list for master seed file)
     cputypes_data = [
@@ -913,7 +915,7 @@ def seed_gputypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # GPUType data to insert (abbreviated list for master seed file)
     gputypes_data = [
@@ -950,7 +952,7 @@ def seed_privilegelevels():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # PrivilegeLevel data to insert
     privilegelevels_data = [
@@ -984,7 +986,7 @@ def seed_departments():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Department data to insert
     departments_data = [
@@ -1022,7 +1024,7 @@ def seed_avversions():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # AVVersion data to insert
     avversions_data = [
@@ -1055,7 +1057,7 @@ def seed_datversions():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # DatVersion data to insert
     datversions_data = [
@@ -1088,7 +1090,7 @@ def seed_employees():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Employee data to insert (id will be auto-generated)
     employees_data = [
@@ -1128,7 +1130,7 @@ def seed_appusers():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # AppUser data to insert (id will be auto-generated)
     appusers_data = [
@@ -1168,7 +1170,7 @@ def seed_rooms():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Room data to insert (building_id, floor_id, room_name)
     rooms_data = [
@@ -1224,7 +1226,7 @@ def seed_vmtypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VMType data to insert
     vmtypes_data = [
@@ -1257,7 +1259,7 @@ def seed_virtualization_sources():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VirtualizationSource data to insert
     virtualization_sources_data = [
@@ -1290,7 +1292,7 @@ def seed_vm_statuses():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VMStatus data to insert
     vm_statuses_data = [
@@ -1328,7 +1330,7 @@ def seed_assets():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Asset data to insert
     # Format: (asset_name, project_id, building_id, floor_id, room_id, systype_id)
@@ -1508,7 +1510,7 @@ def seed_software_catalog():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Software catalog data
     # Note: sw_vendor IDs correspond to SWManufacturer seed data
@@ -1829,6 +1831,9 @@ def run_all_seeds():
     seed_assets()
     seed_software_catalog()
     
+    # Lookup tables changed, so drop any cached copies
+    ReferenceDataCache.invalidate()
+    
     print("Database seeding process completed.")
 
 if __name__ == "__main__":
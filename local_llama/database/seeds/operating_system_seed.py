@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.operating_system import OperatingSystem
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_operating_systems():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Operating system data to insert
     operating_systems_data = [
@@ -128,6 +130,7 @@ def seed_operating_systems():
         if operating_systems_to_add:
             session.add_all(operating_systems_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("operating_system")
             print(f"Added {len(operating_systems_to_add)} operating systems to the database.")
         else:
             print("All operating systems already exist in the database.")
@@ -1,4 +1,5 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.os_version import OSVersion
 from local_llama.models.os_edition import OSEdition
 import os
@@ -14,7 +15,7 @@ def seed_osversions():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Get all existing OSEditions to create a mapping
     with Session(engine) as session:
@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.project import Project
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_projects():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Project data to insert
     projects_data = [
@@ -38,6 +40,7 @@ def seed_projects():
         if projects_to_add:
             session.add_all(projects_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("project")
             print(f"Added {len(projects_to_add)} projects to the database.")
         else:
             print("All projects already exist in the database.")
@@ -1,4 +1,5 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.room import Room
 import os
 from dotenv import load_dotenv
@@ -13,7 +14,7 @@ def seed_rooms():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # Room data to insert (building_id, floor_id, room_name)
     rooms_data = [
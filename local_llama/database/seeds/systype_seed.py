@@ -1,5 +1,7 @@
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.sys_type import SysType
+from local_llama.services.reference_cache import ReferenceDataCache
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +15,7 @@ def seed_systypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # SysType data to insert
     systypes_data = [
@@ -43,6 +45,7 @@ def seed_systypes():
         if systypes_to_add:
             session.add_all(systypes_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("systype")
             print(f"Added {len(systypes_to_add)} system types to the database.")
         else:
             print("All system types already exist in the database.")
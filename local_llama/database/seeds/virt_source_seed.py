@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.virt_source import VirtualizationSource
+from local_llama.services.reference_cache import ReferenceDataCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,7 +18,7 @@ def seed_virtualization_sources():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VirtualizationSource data to insert
     virtualization_sources_data = [
@@ -37,6 +39,7 @@ def seed_virtualization_sources():
         if sources_to_add:
             session.add_all(sources_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("virt_source")
             print(f"Added {len(sources_to_add)} virtualization sources to the database.")
         else:
             print("All virtualization sources already exist in the database.")
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.vm_status import VMStatus
+from local_llama.services.reference_cache import ReferenceDataCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,7 +18,7 @@ def seed_vm_statuses():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VMStatus data to insert
     vm_statuses_data = [
@@ -42,6 +44,7 @@ def seed_vm_statuses():
         if statuses_to_add:
             session.add_all(statuses_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("vm_status")
             print(f"Added {len(statuses_to_add)} VM statuses to the database.")
         else:
             print("All VM statuses already exist in the database.")
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from local_llama.database.engine import get_engine
 from local_llama.models.vm_type import VMType
+from local_llama.services.reference_cache import ReferenceDataCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,7 +18,7 @@ def seed_vmtypes():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is not set")
     
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     
     # VMType data to insert
     vmtypes_data = [
@@ -37,6 +39,7 @@ def seed_vmtypes():
         if vmtypes_to_add:
             session.add_all(vmtypes_to_add)
             session.commit()
+            ReferenceDataCache.invalidate("vm_type")
             print(f"Added {len(vmtypes_to_add)} VM types to the database.")
         else:
             print("All VM types already exist in the database.")
@@ -0,0 +1,69 @@
+"""
+Move files uploaded before deduplication onto the content-addressed blob store.
+
+Each legacy FileContent row or ./uploads file is re-hashed and linked to the
+shared FileBlob for its checksum, so identical uploads end up stored once.
+Files are committed one at a time, and a legacy file is only deleted after
+its metadata points at the blob:
+
+    python -m local_llama.database.utils.dedupe_file_storage [--dry-run]
+"""
+
+import sys
+from sqlmodel import Session, select, func
+from local_llama.database.engine import get_engine
+from local_llama.models.file_storage import FileMetadata, FileBlob
+from local_llama.services.blob_store import BlobStore
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def dedupe_file_storage(dry_run: bool = False):
+    """Link every FileMetadata row without a blob to a shared FileBlob."""
+
+    # Create database engine
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    engine = get_engine(database_url)
+
+    with Session(engine) as session:
+        file_ids = session.exec(
+            select(FileMetadata.file_id)
+            .where(FileMetadata.blob_id == None)
+            .order_by(FileMetadata.file_id)
+        ).all()
+
+    print(f"Found {len(file_ids)} files stored before deduplication.")
+    if dry_run:
+        return
+
+    migrated = 0
+    failed = 0
+    for file_id in file_ids:
+        with Session(engine) as session:
+            metadata = session.get(FileMetadata, file_id)
+            try:
+                legacy_path = BlobStore.adopt(session, metadata)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                failed += 1
+                print(f"  Skipped file {file_id} ({metadata.original_filename}): {e}")
+                continue
+
+        if legacy_path:
+            BlobStore.remove_file(engine, legacy_path)
+        migrated += 1
+
+    with Session(engine) as session:
+        blob_count = session.exec(select(func.count(FileBlob.blob_id))).one()
+
+    print(f"Migrated {migrated} files ({failed} skipped); {blob_count} distinct blobs stored.")
+
+
+if __name__ == "__main__":
+    dedupe_file_storage(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,36 @@
+"""
+Rebuild the DailyActivityRollup table from the full UserActivity history.
+
+ActivityTracker keeps the rollup current as activities are written; run this
+after bulk imports, manual edits to UserActivity or if the counts drift:
+
+    python -m local_llama.database.utils.rebuild_activity_rollup
+"""
+
+from sqlmodel import Session
+from local_llama.database.engine import get_engine
+from local_llama.services.activity_rollup import ActivityRollup
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def rebuild_activity_rollup():
+    """Recompute every DailyActivityRollup row from UserActivity."""
+
+    # Create database engine
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    engine = get_engine(database_url)
+
+    with Session(engine) as session:
+        row_count = ActivityRollup.rebuild(session)
+
+    print(f"Rebuilt activity rollup: {row_count} daily rows.")
+
+
+if __name__ == "__main__":
+    rebuild_activity_rollup()
@@ -0,0 +1,42 @@
+"""
+Apply the storage tier policy once, outside the app's background job.
+
+Promotes hot small blobs into the database, demotes cold or oversized
+database blobs to the filesystem and removes files left behind by earlier
+promotions (see local_llama.services.storage_tiering for the STORAGE_TIER_*
+settings). Promotion needs the read latency the running app measures, so a
+standalone run never promotes. Use --dry-run to only list the moves:
+
+    python -m local_llama.database.utils.run_storage_tiering [--dry-run]
+"""
+
+import sys
+from sqlmodel import Session
+from local_llama.database.engine import get_engine
+from local_llama.services.storage_tiering import StorageTiering
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def run_storage_tiering(dry_run: bool = False):
+    """Migrate every blob the policy says is on the wrong tier."""
+
+    # Create database engine
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    engine = get_engine(database_url)
+
+    with Session(engine) as session:
+        moves = StorageTiering.run(session, dry_run=dry_run)
+
+    for blob_id, target, reason in moves:
+        print(f"  blob {blob_id} -> {target.value} ({reason})")
+    print(f"{'Planned' if dry_run else 'Applied'} {len(moves)} storage tier migrations.")
+
+
+if __name__ == "__main__":
+    run_storage_tiering(dry_run="--dry-run" in sys.argv)
@@ -12,6 +12,9 @@ from .pages import Dashboard, Dats, Images, Logs, Tickets, Assets, Playbook, Pla
 from .models import Employee, AppUser, Project, HardwareManufacturer, SWManufacturer, LogType, ImagingMethod, SysArchitecture, CPUType, GPUType
 from .components import advanced_smoke_system, page_wrapper, universal_background, radial_speed_dial
 from .components.access_denied import neon_access_denied
+from .api.file_download import files_api
+from .services.storage_tiering import StorageTiering
+from .services.activity_writer import ActivityWriter
 
 load_dotenv()
 
@@ -673,7 +676,9 @@ def protected_page(page_component):
         )
     return wrapped_page
 
-app = rx.App()
+app = rx.App(api_transformer=files_api)
+app.register_lifespan_task(StorageTiering.background_job)
+app.register_lifespan_task(ActivityWriter.lifespan)
 app.add_page(index, route="/")
 
 # Add protected pages
@@ -27,6 +27,7 @@ from .virt_source import VirtualizationSource
 from .vm_status import VMStatus
 from .virtual_machine import VirtualMachine
 from .user_activity import UserActivity
+from .daily_activity_rollup import DailyActivityRollup
 from .tem_ticket import TEMTicket
 from .image_collection import ImageCollection
 from .configuration_change import ConfigurationChange
@@ -44,4 +45,4 @@ from .ci_relationship import CIRelationship
 from .software_catalog import SoftwareCatalog
 from .asset_software import AssetSoftware
 from .software_version import SoftwareVersion
-from .file_storage import FileMetadata, FileContent, FileVersion, DocumentLink, FileType, StorageLocation, FileDirectory, DirectoryType
\ No newline at end of file
+from .file_storage import FileMetadata, FileContent, FileBlob, FileVersion, DocumentLink, FileType, StorageLocation, FileDirectory, DirectoryType
\ No newline at end of file
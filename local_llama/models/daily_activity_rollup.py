@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy import Column, Computed, Integer
+from sqlmodel import SQLModel, Field, UniqueConstraint
+from datetime import date
+
+
+class DailyActivityRollup(SQLModel, table=True):
+    """Daily UserActivity counts, maintained by ActivityTracker for the dashboard."""
+    __table_args__ = (
+        UniqueConstraint("activity_day", "activity_type", "employee_key", "project_key", name="uq_dailyactivityrollup_key"),
+    )
+
+    rollup_id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Rollup key
+    activity_day: date = Field(index=True)
+    activity_type: str = Field(max_length=50)
+    employee_id: Optional[int] = Field(foreign_key="employee.id", default=None)
+    project_id: Optional[int] = Field(foreign_key="project.project_id", default=None)
+
+    # employee_id / project_id with NULL as 0, so the unique key also dedupes
+    # rows without an employee or project (SQLite and PostgreSQL treat NULLs
+    # in a unique constraint as distinct, SQL Server does not)
+    employee_key: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, Computed("COALESCE(employee_id, 0)", persisted=True))
+    )
+    project_key: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, Computed("COALESCE(project_id, 0)", persisted=True))
+    )
+
+    # Number of UserActivity rows with this key
+    activity_count: int = Field(default=0)
@@ -32,7 +32,7 @@ class FileDirectory(SQLModel, table=True):
     directory_id: int = Field(primary_key=True)
     name: str = Field(max_length=255)
     parent_id: Optional[int] = Field(default=None, foreign_key="file_directory.directory_id")
-    full_path: str = Field(max_length=1000)  # /playbook/playbook_personal/pbper_drafts
+    full_path: str = Field(max_length=1000, index=True)  # /playbook/playbook_personal/pbper_drafts
     
     # Directory type and ownership
     directory_type: DirectoryType = Field(default=DirectoryType.USER)
@@ -59,6 +59,20 @@ class FileDirectory(SQLModel, table=True):
     modified_at: datetime = Field(default_factory=datetime.now)
 
 
+class FileBlob(SQLModel, table=True):
+    """Content-addressed storage shared by all files with the same checksum."""
+    __tablename__ = "file_blob"
+    
+    blob_id: int = Field(primary_key=True)
+    checksum: str = Field(max_length=64, unique=True)  # SHA-256 hash
+    file_size: int  # Size in bytes
+    storage_location: StorageLocation
+    blob_path: Optional[str] = Field(default=None, max_length=500)  # For filesystem storage
+    content: Optional[bytes] = Field(default=None)  # For database storage
+    ref_count: int = Field(default=1)  # Number of FileMetadata rows using this blob
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
 class FileMetadata(SQLModel, table=True):
     """Metadata for all stored files in IAMS."""
     __tablename__ = "file_metadata"
@@ -72,6 +86,7 @@ class FileMetadata(SQLModel, table=True):
     storage_location: StorageLocation
     file_path: Optional[str] = Field(default=None, max_length=500)  # For filesystem storage
     checksum: str = Field(max_length=64)  # SHA-256 hash
+    blob_id: Optional[int] = Field(default=None, foreign_key="file_blob.blob_id", index=True)  # Shared content
     
     # Directory structure
     directory_id: Optional[int] = Field(default=None, foreign_key="file_directory.directory_id")
@@ -90,6 +105,12 @@ class FileMetadata(SQLModel, table=True):
     uploaded_at: datetime = Field(default_factory=datetime.now)
     last_accessed: Optional[datetime] = Field(default=None)
     
+    # Storage tiering
+    download_count: int = Field(default=0)
+    recent_downloads: int = Field(default=0)  # Halved by every tiering run
+    storage_migrated_at: Optional[datetime] = Field(default=None)
+    storage_migration_reason: Optional[str] = Field(default=None, max_length=255)
+    
 
 class FileContent(SQLModel, table=True):
     """Storage for small files directly in database."""
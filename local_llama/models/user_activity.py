@@ -23,7 +23,7 @@ class UserActivity(SQLModel, table=True):
     related_dat_id: Optional[int] = Field(foreign_key="datupdate.datupdate_id", default=None)
     
     # Metadata
-    activity_timestamp: datetime = Field(default_factory=datetime.now)
+    activity_timestamp: datetime = Field(default_factory=datetime.now, index=True)
     ip_address: Optional[str] = Field(max_length=45, default=None)  # Support IPv6
     user_agent: Optional[str] = Field(max_length=500, default=None)
     
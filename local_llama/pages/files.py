@@ -129,6 +129,7 @@ def initialize_user_data():
         FileStorageState.sync_user_from_auth,
         DirectoryState.load_directory_tree,
         FileStorageState.load_files,
+        FileStorageState.watch_files,
     ]
 
 
@@ -0,0 +1,109 @@
+"""Daily activity rollup maintenance service."""
+from datetime import date
+from typing import Optional
+from sqlalchemy import cast, delete, insert, update, Date
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func, and_
+from ..models.user_activity import UserActivity
+from ..models.daily_activity_rollup import DailyActivityRollup
+
+
+class ActivityRollup:
+    """Keeps DailyActivityRollup in step with UserActivity.
+
+    ActivityWriter calls record() in the same transaction as each batch of
+    activity inserts; rebuild() recomputes the whole table from UserActivity.
+    """
+
+    @staticmethod
+    def _key(activity_day: date, activity_type: str, employee_id: Optional[int], project_id: Optional[int]):
+        """Build the WHERE clause matching one rollup row (None matches NULL)."""
+        return and_(
+            DailyActivityRollup.activity_day == activity_day,
+            DailyActivityRollup.activity_type == activity_type,
+            DailyActivityRollup.employee_id == employee_id,
+            DailyActivityRollup.project_id == project_id,
+        )
+
+    @staticmethod
+    def record(
+        session: Session,
+        activity_type: str,
+        activity_day: date,
+        employee_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+        count: int = 1
+    ):
+        """Add count activities to the rollup row for this key.
+
+        Does not commit, so the caller's activity insert and the rollup update
+        succeed or fail together.
+
+        Args:
+            session: Open session holding the activity insert
+            activity_type: UserActivity.activity_type
+            activity_day: Calendar day of the activity timestamp
+            employee_id: UserActivity.employee_id
+            project_id: UserActivity.related_project_id
+            count: Number of activities to add
+        """
+        # Write pending objects (the activity) first so the savepoint below only covers the rollup row
+        session.flush()
+
+        key = ActivityRollup._key(activity_day, activity_type, employee_id, project_id)
+        increment = (
+            update(DailyActivityRollup)
+            .where(key)
+            .values(activity_count=DailyActivityRollup.activity_count + count)
+        )
+
+        if session.exec(increment).rowcount:
+            return
+
+        try:
+            # Savepoint so losing an insert race to another writer keeps the activity insert
+            with session.begin_nested():
+                session.add(DailyActivityRollup(
+                    activity_day=activity_day,
+                    activity_type=activity_type,
+                    employee_id=employee_id,
+                    project_id=project_id,
+                    activity_count=count,
+                ))
+        except IntegrityError:
+            session.exec(increment)
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """Recompute the whole rollup from UserActivity with one INSERT ... SELECT.
+
+        Returns:
+            Number of rollup rows written
+        """
+        activity_day = cast(UserActivity.activity_timestamp, Date)
+        grouped = (
+            select(
+                activity_day,
+                UserActivity.activity_type,
+                UserActivity.employee_id,
+                UserActivity.related_project_id,
+                func.count(UserActivity.activity_id),
+            )
+            .group_by(
+                activity_day,
+                UserActivity.activity_type,
+                UserActivity.employee_id,
+                UserActivity.related_project_id,
+            )
+        )
+
+        session.exec(delete(DailyActivityRollup))
+        session.exec(
+            insert(DailyActivityRollup).from_select(
+                ["activity_day", "activity_type", "employee_id", "project_id", "activity_count"],
+                grouped,
+            )
+        )
+        session.commit()
+
+        return session.exec(select(func.count(DailyActivityRollup.rollup_id))).one()
@@ -0,0 +1,235 @@
+"""Background writer that batches UserActivity inserts off the request path.
+
+ActivityTracker.track_activity() only queues an activity; a writer thread
+inserts queued activities (and their DailyActivityRollup counts) in one
+transaction per batch. Batching is configured through environment variables:
+
+    ACTIVITY_FLUSH_INTERVAL_MS  longest an activity waits before being written (default 500)
+    ACTIVITY_BATCH_SIZE         activities that trigger an immediate write (default 100)
+    ACTIVITY_MAX_BACKLOG        queued activities kept before new ones are dropped (default 10000)
+"""
+import asyncio
+import contextlib
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+import reflex as rx
+from sqlmodel import select
+from ..models.user_activity import UserActivity
+from ..models.app_user import AppUser
+from .activity_rollup import ActivityRollup
+
+
+class ActivityWriter:
+    """Queues UserActivity rows and writes them in batches from one thread.
+
+    The backlog is bounded: when it is full new activities are dropped and
+    counted rather than blocking the event handler that tracked them.
+    stop() (run when the app shuts down) writes whatever is still queued.
+    """
+
+    FLUSH_INTERVAL_MS = int(os.getenv("ACTIVITY_FLUSH_INTERVAL_MS", "500"))
+    BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", "100"))
+    MAX_BACKLOG = int(os.getenv("ACTIVITY_MAX_BACKLOG", "10000"))
+
+    _queue: "queue.Queue[Optional[UserActivity]]" = queue.Queue(maxsize=MAX_BACKLOG)
+    _thread: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+    _metrics: Counter = Counter()
+
+    @staticmethod
+    def enqueue(activity: UserActivity) -> bool:
+        """Queue an activity for the next batch, starting the writer if needed.
+
+        Returns:
+            False if the backlog is full and the activity was dropped
+        """
+        ActivityWriter.start()
+        try:
+            ActivityWriter._queue.put_nowait(activity)
+        except queue.Full:
+            ActivityWriter._count("dropped")
+            print(f"Warning: activity backlog full, dropped {activity.activity_type}")
+            return False
+        ActivityWriter._count("queued")
+        return True
+
+    @staticmethod
+    def start():
+        """Start the writer thread if it is not already running."""
+        with ActivityWriter._lock:
+            if ActivityWriter._thread is not None and ActivityWriter._thread.is_alive():
+                return
+            ActivityWriter._thread = threading.Thread(
+                target=ActivityWriter._run, name="activity-writer", daemon=True
+            )
+            ActivityWriter._thread.start()
+
+    @staticmethod
+    def stop(timeout: float = 10.0):
+        """Write everything still queued and stop the writer thread."""
+        with ActivityWriter._lock:
+            thread = ActivityWriter._thread
+            ActivityWriter._thread = None
+        if thread is None or not thread.is_alive():
+            # Nothing running, but queued activities are still written
+            ActivityWriter._drain()
+            return
+        # The sentinel skips the bound so shutdown is never refused
+        with ActivityWriter._queue.mutex:
+            ActivityWriter._queue.queue.append(None)
+            ActivityWriter._queue.not_empty.notify()
+        thread.join(timeout)
+
+    @staticmethod
+    def metrics() -> Dict[str, int]:
+        """Get writer counters: queued, written, dropped, failed, batches and current backlog."""
+        with ActivityWriter._lock:
+            metrics = {name: ActivityWriter._metrics[name] for name in ("queued", "written", "dropped", "failed", "batches")}
+        metrics["backlog"] = ActivityWriter._queue.qsize()
+        return metrics
+
+    @staticmethod
+    def _count(name: str, amount: int = 1):
+        """Add to a metrics counter."""
+        with ActivityWriter._lock:
+            ActivityWriter._metrics[name] += amount
+
+    @staticmethod
+    def _run():
+        """Writer loop: collect a batch until it is full or the flush interval passes, then write it."""
+        interval = ActivityWriter.FLUSH_INTERVAL_MS / 1000
+        stopping = False
+        while not stopping:
+            first = ActivityWriter._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + interval
+            while len(batch) < ActivityWriter.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    activity = ActivityWriter._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if activity is None:
+                    stopping = True
+                    break
+                batch.append(activity)
+
+            ActivityWriter._write(batch)
+
+        # Anything queued after the sentinel is written before the thread exits
+        ActivityWriter._drain()
+
+    @staticmethod
+    def _drain():
+        """Write every queued activity in BATCH_SIZE batches."""
+        batch = []
+        while True:
+            try:
+                activity = ActivityWriter._queue.get_nowait()
+            except queue.Empty:
+                break
+            if activity is not None:
+                batch.append(activity)
+            if len(batch) >= ActivityWriter.BATCH_SIZE:
+                ActivityWriter._write(batch)
+                batch = []
+        if batch:
+            ActivityWriter._write(batch)
+
+    @staticmethod
+    def _write(batch: List[UserActivity]):
+        """Insert a batch of activities in one transaction, or one by one if that fails.
+
+        A single bad activity (e.g. a stale related id) would otherwise fail
+        the whole batch, so on error each activity is retried in its own
+        transaction and only the ones that fail again are counted as failed.
+        """
+        batch = ActivityWriter._with_users(batch)
+        if not batch:
+            return
+
+        try:
+            ActivityWriter._insert(batch)
+            ActivityWriter._count("batches")
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                ActivityWriter._count("failed")
+                print(f"Error writing activity {batch[0].activity_type}: {e}")
+                return
+            print(f"Error writing {len(batch)} activities, retrying one at a time: {e}")
+
+        for activity in batch:
+            # The rolled-back flush may have assigned an id
+            activity.activity_id = None
+            try:
+                ActivityWriter._insert([activity])
+            except Exception as e:
+                ActivityWriter._count("failed")
+                print(f"Error writing activity {activity.activity_type}: {e}")
+
+    @staticmethod
+    def _with_users(batch: List[UserActivity]) -> List[UserActivity]:
+        """Fill in the placeholder user, once per batch, and drop (and count) activities without one."""
+        if all(activity.user_id is not None for activity in batch):
+            return batch
+
+        try:
+            with rx.session() as session:
+                user = session.exec(select(AppUser).limit(1)).first()
+        except Exception as e:
+            print(f"Error looking up the placeholder user: {e}")
+            user = None
+        for activity in batch:
+            if activity.user_id is None:
+                activity.user_id = user.id if user else None
+
+        missing = [activity for activity in batch if activity.user_id is None]
+        if missing:
+            print(f"Warning: No user ID available for {len(missing)} activities")
+            ActivityWriter._count("failed", len(missing))
+        return [activity for activity in batch if activity.user_id is not None]
+
+    @staticmethod
+    def _insert(batch: List[UserActivity]):
+        """Insert activities and their rollup counts in one transaction (raises on failure)."""
+        with rx.session() as session:
+            session.add_all(batch)
+
+            # One rollup increment per key instead of one per activity
+            counts = Counter(
+                (activity.activity_type, activity.activity_timestamp.date(), activity.employee_id, activity.related_project_id)
+                for activity in batch
+            )
+            for (activity_type, activity_day, employee_id, project_id), count in counts.items():
+                ActivityRollup.record(
+                    session,
+                    activity_type=activity_type,
+                    activity_day=activity_day,
+                    employee_id=employee_id,
+                    project_id=project_id,
+                    count=count
+                )
+            session.commit()
+
+        ActivityWriter._count("written", len(batch))
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def lifespan():
+        """Run the writer for the app's lifetime (registered as an app lifespan task)."""
+        ActivityWriter.start()
+        try:
+            yield
+        finally:
+            # Joining the thread blocks, so keep it off the event loop
+            await asyncio.to_thread(ActivityWriter.stop)
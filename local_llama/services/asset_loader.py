@@ -0,0 +1,203 @@
+"""Asset grid loading service."""
+from typing import List, Dict, Any, Optional
+from sqlmodel import Session, select, func, or_
+from ..models.asset import Asset
+from ..models.project import Project
+from ..models.building import Building
+from ..models.floor import Floor
+from ..models.room import Room
+from ..models.sys_type import SysType
+from ..models.operating_system import OperatingSystem
+from ..models.hardware_manufacturer import HardwareManufacturer
+from .paging import Paging
+
+
+class AssetLoader:
+    """Service for loading the assets grid with its lookup names in one statement."""
+
+    # Grid column -> SQL expression used for ORDER BY
+    SORT_COLUMNS = {
+        "asset_id": Asset.asset_id,
+        "asset_name": Asset.asset_name,
+        "project": Project.project_name,
+        "building": Building.building_name,
+        "floor": Floor.floor_name,
+        "systype": SysType.systype_name,
+        "os": OperatingSystem.os_name,
+        "serial_no": Asset.serial_no,
+        "barcode": Asset.letterkenny_barcode,
+    }
+
+    # Grid column -> lookup name used for the analytics breakdowns
+    GROUP_COLUMNS = {
+        "project": Project.project_name,
+        "building": Building.building_name,
+        "systype": SysType.systype_name,
+        "os": OperatingSystem.os_name,
+    }
+
+    @staticmethod
+    def build_query(*columns):
+        """Build the asset grid query with every lookup table outer-joined.
+
+        Outer joins keep assets whose optional references (room, OS, hardware
+        manufacturer) are empty, matching the "N/A" rows of the grid.
+
+        Args:
+            columns: Columns to select instead of the grid row (e.g. for counts)
+        """
+        if not columns:
+            columns = (
+                Asset,
+                Project.project_name,
+                Building.building_name,
+                Floor.floor_name,
+                Room.room_name,
+                SysType.systype_name,
+                OperatingSystem.os_name,
+                HardwareManufacturer.hwmanu_name,
+            )
+        return (
+            select(*columns)
+            .select_from(Asset)
+            .outerjoin(Project, Asset.project_id == Project.project_id)
+            .outerjoin(Building, Asset.building_id == Building.building_id)
+            .outerjoin(Floor, Asset.floor_id == Floor.floor_id)
+            .outerjoin(Room, Asset.room_id == Room.room_id)
+            .outerjoin(SysType, Asset.systype_id == SysType.systype_id)
+            .outerjoin(OperatingSystem, Asset.os_id == OperatingSystem.os_id)
+            .outerjoin(HardwareManufacturer, Asset.hwmanu_id == HardwareManufacturer.hwmanu_id)
+        )
+
+    @staticmethod
+    def apply_filters(
+        query,
+        project_id: Optional[int] = None,
+        building_id: Optional[int] = None,
+        systype_id: Optional[int] = None,
+        os_id: Optional[int] = None
+    ):
+        """Apply the dropdown filters of the assets page to a grid query."""
+        if project_id is not None:
+            query = query.where(Asset.project_id == project_id)
+        if building_id is not None:
+            query = query.where(Asset.building_id == building_id)
+        if systype_id is not None:
+            query = query.where(Asset.systype_id == systype_id)
+        if os_id is not None:
+            query = query.where(Asset.os_id == os_id)
+        return query
+
+    @staticmethod
+    def apply_search(query, search_query: str):
+        """Restrict a grid query to assets matching the search box.
+
+        Matches the same fields as the table search: asset name, serial number,
+        barcode and project name (case-insensitive substring).
+        """
+        search = (search_query or "").strip().lower()
+        if not search:
+            return query
+        return query.where(or_(
+            func.lower(Asset.asset_name).contains(search, autoescape=True),
+            func.lower(Asset.serial_no).contains(search, autoescape=True),
+            func.lower(Asset.letterkenny_barcode).contains(search, autoescape=True),
+            func.lower(Project.project_name).contains(search, autoescape=True),
+        ))
+
+    @staticmethod
+    def apply_sorting(query, sort_column: str, sort_direction: str = "asc"):
+        """Order a grid query by a table column.
+
+        asset_id is always added as a tie-breaker so OFFSET/FETCH pages are stable.
+        """
+        order_col = AssetLoader.SORT_COLUMNS.get(sort_column)
+        if order_col is None and hasattr(Asset, sort_column):
+            order_col = getattr(Asset, sort_column)
+        if order_col is None:
+            order_col = Asset.asset_id
+
+        query = query.order_by(order_col.desc() if sort_direction == "desc" else order_col)
+        if order_col is not Asset.asset_id:
+            query = query.order_by(Asset.asset_id)
+        return query
+
+    @staticmethod
+    def count(session: Session, query) -> int:
+        """Count the assets matched by a grid query."""
+        return Paging.count(session, query)
+
+    @staticmethod
+    def count_by(session: Session, column: str, **filters) -> Dict[Optional[str], int]:
+        """Count filtered assets grouped by a lookup name (see GROUP_COLUMNS)."""
+        name_col = AssetLoader.GROUP_COLUMNS[column]
+        query = AssetLoader.apply_filters(
+            AssetLoader.build_query(name_col, func.count(Asset.asset_id)), **filters
+        ).group_by(name_col)
+        return {name: count for name, count in session.exec(query).all()}
+
+    @staticmethod
+    def format_row(
+        asset: Asset,
+        project_name: Optional[str],
+        building_name: Optional[str],
+        floor_name: Optional[str],
+        room_name: Optional[str],
+        systype_name: Optional[str],
+        os_name: Optional[str],
+        hwmanu_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build the row dict displayed in the assets table."""
+        # Process building name to extract just the number
+        building_display = building_name or "Unknown"
+        if building_display.startswith("Building "):
+            building_display = building_display.replace("Building ", "")
+
+        # Process floor name to extract just the level
+        floor_display = floor_name or "Unknown"
+        if floor_display.startswith("Floor "):
+            floor_display = floor_display.replace("Floor ", "")
+
+        return {
+            "asset_id": str(asset.asset_id),
+            "asset_name": asset.asset_name or "Unknown",
+            "project": project_name or "Unknown",
+            "project_id": asset.project_id,
+            "building": building_display,
+            "building_id": asset.building_id,
+            "floor": floor_display,
+            "floor_id": asset.floor_id,
+            "room": room_name or "N/A",
+            "room_id": asset.room_id,
+            "systype": systype_name or "Unknown",
+            "systype_id": asset.systype_id,
+            "os": os_name or "N/A",
+            "os_id": asset.os_id,
+            "hw_manufacturer": hwmanu_name or "N/A",
+            "serial_no": asset.serial_no if asset.serial_no else "N/A",
+            "barcode": asset.letterkenny_barcode if asset.letterkenny_barcode else "N/A",
+            "cpu_id": asset.cpu_id,
+            "gpu_id": asset.gpu_id
+        }
+
+    @staticmethod
+    def load_rows(session: Session, query=None) -> List[Dict[str, Any]]:
+        """Execute a grid query and build the row dicts in a single pass.
+
+        Args:
+            session: Open database session
+            query: Query from build_query (with any filters/sorting applied);
+                defaults to the unfiltered grid
+
+        Returns:
+            List of asset row dicts for the assets table
+        """
+        if query is None:
+            query = AssetLoader.build_query()
+        return [AssetLoader.format_row(*row) for row in session.exec(query).all()]
+
+    @staticmethod
+    def load_page(session: Session, query, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """Load one page of a sorted grid query (rendered as OFFSET/FETCH on MSSQL)."""
+        offset = (max(1, page) - 1) * page_size
+        return AssetLoader.load_rows(session, query.offset(offset).limit(page_size))
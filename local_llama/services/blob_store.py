@@ -0,0 +1,334 @@
+"""Content-addressed, reference-counted file storage."""
+import hashlib
+import os
+import shutil
+import threading
+from typing import Optional
+from sqlalchemy import delete, event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as OrmSession, defer
+from sqlmodel import Session, select, func
+from ..models.file_storage import FileBlob, FileContent, FileMetadata, StorageLocation
+from .upload_spool import UploadSpool
+
+
+class BlobStore:
+    """Stores each distinct file content once, keyed by its SHA-256 checksum.
+
+    Filesystem blobs live under ROOT in directories sharded by hash prefix
+    (blobs/ab/cd/abcd...); database blobs keep their bytes in FileBlob.content.
+    Every FileMetadata row holds one reference, and a blob's bytes are only
+    removed when release() drops its last reference.
+
+    A blob file is only written once its row has been inserted or
+    referenced, and only unlinked after re-checking that no row uses it;
+    both happen under the checksum's lock, so a store() racing a release()
+    of the same content cannot lose the file. Files written by a
+    transaction that does not commit are removed when it ends.
+    """
+
+    ROOT = os.path.join("./uploads", "blobs")
+
+    # Striped per-checksum locks serialising blob file writes and unlinks in this process
+    _locks = [threading.Lock() for _ in range(64)]
+
+    # Session.info key listing blob files written in the session's transaction
+    WRITTEN_KEY = "blob_store_written"
+
+    @staticmethod
+    def blob_path(checksum: str) -> str:
+        """Get the sharded filesystem path for a checksum."""
+        return os.path.join(BlobStore.ROOT, checksum[:2], checksum[2:4], checksum)
+
+    @staticmethod
+    def _lock(checksum: str) -> threading.Lock:
+        """Get the lock guarding a checksum's blob file."""
+        return BlobStore._locks[hash(checksum) % len(BlobStore._locks)]
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """Compute the SHA-256 checksum of a file in CHUNK_SIZE reads."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(UploadSpool.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def store(
+        session: Session,
+        checksum: str,
+        file_size: int,
+        storage_location: StorageLocation,
+        source_path: Optional[str] = None,
+        content: Optional[bytes] = None,
+        keep_source: bool = False
+    ) -> FileBlob:
+        """Add a reference to the blob for this checksum, creating it if new.
+
+        Existing content is never written again: the reference count goes up
+        and the source is left for the caller to discard. Does not commit.
+
+        Args:
+            session: Open session the FileMetadata row will be added in
+            checksum: SHA-256 of the content
+            file_size: Size in bytes
+            storage_location: Where to keep the content if the blob is new
+            source_path: File holding the content (moved into place unless keep_source)
+            content: The content itself, when it is already in memory
+            keep_source: Copy rather than move source_path into the blob store
+
+        Returns:
+            The FileBlob (its storage_location wins over the one requested)
+        """
+        increment = (
+            update(FileBlob)
+            .where(FileBlob.checksum == checksum)
+            .values(ref_count=FileBlob.ref_count + 1)
+        )
+        if session.exec(increment).rowcount:
+            blob = BlobStore._get(session, checksum)
+        else:
+            blob = FileBlob(checksum=checksum, file_size=file_size, storage_location=storage_location)
+            if storage_location == StorageLocation.DATABASE:
+                blob.content = content if content is not None else UploadSpool.read_bytes(source_path)
+            else:
+                blob.blob_path = BlobStore.blob_path(checksum)
+
+            try:
+                # Savepoint so losing an insert race to another upload keeps the caller's work
+                with session.begin_nested():
+                    session.add(blob)
+            except IntegrityError:
+                session.exec(increment)
+                blob = BlobStore._get(session, checksum)
+
+        # Written only now the row is ours, and again if a racing release() removed it
+        if blob.storage_location == StorageLocation.FILESYSTEM and blob.blob_path:
+            BlobStore._ensure_file(session, blob.checksum, blob.blob_path, source_path, content, keep_source)
+        return blob
+
+    @staticmethod
+    def _get(session: Session, checksum: str) -> FileBlob:
+        """Load the blob for a checksum, refreshed after an UPDATE."""
+        blob = session.exec(
+            select(FileBlob).where(FileBlob.checksum == checksum).options(defer(FileBlob.content))
+        ).one()
+        session.refresh(blob, ["ref_count"])
+        return blob
+
+    @staticmethod
+    def get_blob(session: Session, blob_id: int) -> Optional[FileBlob]:
+        """Load a blob row without its database content (read that with read())."""
+        return session.get(FileBlob, blob_id, options=[defer(FileBlob.content)])
+
+    @staticmethod
+    def _ensure_file(
+        session: Session,
+        checksum: str,
+        destination: str,
+        source_path: Optional[str],
+        content: Optional[bytes],
+        keep_source: bool
+    ):
+        """Write a blob file under its checksum's lock unless it exists, remembering it for rollback cleanup."""
+        with BlobStore._lock(checksum):
+            if os.path.exists(destination):
+                return
+            if source_path is None and content is None:
+                raise FileNotFoundError(f"No content to restore blob file {destination}")
+            BlobStore._write_file(destination, source_path, content, keep_source)
+        session.info.setdefault(BlobStore.WRITTEN_KEY, set()).add(destination)
+
+    @staticmethod
+    def _write_file(destination: str, source_path: Optional[str], content: Optional[bytes], keep_source: bool):
+        """Put blob content at its sharded path (a no-op if an identical file is already there)."""
+        if os.path.exists(destination):
+            return
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if source_path is not None and not keep_source:
+            # A rename, so the blob appears complete or not at all
+            UploadSpool.move_to(source_path, destination)
+            return
+
+        # Copy or write beside the destination, then rename into place
+        partial = f"{destination}.part"
+        if source_path is None:
+            with open(partial, "wb") as f:
+                f.write(content)
+        else:
+            shutil.copyfile(source_path, partial)
+        os.replace(partial, destination)
+
+    @staticmethod
+    def release(session: Session, blob_id: int) -> Optional[str]:
+        """Drop one reference to a blob, deleting the row with its last reference.
+
+        Does not commit; remove the returned file with remove_file() only
+        after the commit succeeds.
+
+        Returns:
+            Filesystem path whose last reference went, otherwise None
+        """
+        session.exec(
+            update(FileBlob)
+            .where(FileBlob.blob_id == blob_id)
+            .values(ref_count=FileBlob.ref_count - 1)
+        )
+        blob = BlobStore.get_blob(session, blob_id)
+        if not blob:
+            return None
+        session.refresh(blob, ["ref_count"])
+        if blob.ref_count > 0:
+            return None
+
+        blob_path = blob.blob_path
+        session.exec(delete(FileBlob).where(FileBlob.blob_id == blob_id, FileBlob.ref_count <= 0))
+        session.expunge(blob)
+        return blob_path
+
+    @staticmethod
+    def remove_file(bind, path: Optional[str]):
+        """Delete an unreferenced blob (or legacy upload) file if it still exists.
+
+        Re-checks under the checksum's lock that no filesystem blob row uses
+        the file, so content stored again since it was released is kept.
+
+        Args:
+            bind: Engine or connection to run the check on
+            path: File to delete
+        """
+        if not path:
+            return
+        checksum = os.path.basename(path)
+        with BlobStore._lock(checksum):
+            with Session(bind) as session:
+                referenced = session.exec(
+                    select(FileBlob.blob_id).where(
+                        FileBlob.checksum == checksum,
+                        FileBlob.storage_location == StorageLocation.FILESYSTEM,
+                    )
+                ).first()
+            if referenced is None:
+                UploadSpool.discard(path)
+
+    @staticmethod
+    def read(session: Session, metadata: FileMetadata, length: Optional[int] = None) -> Optional[bytes]:
+        """Read a file's content from its blob, or from pre-dedupe storage.
+
+        Args:
+            session: Open database session
+            metadata: The file to read
+            length: Only read the first length bytes (database blobs via SUBSTRING)
+
+        Returns:
+            The content, or None if it cannot be found
+        """
+        if metadata.blob_id:
+            blob = BlobStore.get_blob(session, metadata.blob_id)
+            if blob and blob.storage_location == StorageLocation.DATABASE:
+                return BlobStore._read_column(session, FileBlob.content, FileBlob.blob_id == blob.blob_id, length)
+            path = blob.blob_path if blob else None
+        elif metadata.storage_location == StorageLocation.DATABASE:
+            return BlobStore._read_column(session, FileContent.content, FileContent.file_id == metadata.file_id, length)
+        else:
+            path = metadata.file_path
+
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read(-1 if length is None else length)
+        return None
+
+    @staticmethod
+    def _read_column(session: Session, column, where, length: Optional[int]) -> Optional[bytes]:
+        """Read a binary column, or just its first length bytes."""
+        if length is not None:
+            column = func.substring(column, 1, length)
+        return session.exec(select(column).where(where)).first()
+
+    @staticmethod
+    def read_blob(session: Session, blob: FileBlob) -> Optional[bytes]:
+        """Read a blob's whole content from whichever tier holds it."""
+        if blob.storage_location == StorageLocation.DATABASE:
+            return BlobStore._read_column(session, FileBlob.content, FileBlob.blob_id == blob.blob_id, None)
+        if blob.blob_path and os.path.exists(blob.blob_path):
+            with open(blob.blob_path, "rb") as f:
+                return f.read()
+        return None
+
+    @staticmethod
+    def write_blob_file(session: Session, blob: FileBlob):
+        """Write a database blob's content out to blob.blob_path."""
+        content = BlobStore._read_column(session, FileBlob.content, FileBlob.blob_id == blob.blob_id, None)
+        if content is None:
+            raise FileNotFoundError(f"No stored content for blob {blob.blob_id}")
+        BlobStore._ensure_file(session, blob.checksum, blob.blob_path, None, content, keep_source=False)
+
+    @staticmethod
+    def file_path(session: Session, metadata: FileMetadata) -> Optional[str]:
+        """Get the filesystem path holding a file's content, if it is stored on disk."""
+        if metadata.blob_id:
+            blob = BlobStore.get_blob(session, metadata.blob_id)
+            return blob.blob_path if blob else None
+        if metadata.storage_location == StorageLocation.FILESYSTEM:
+            return metadata.file_path
+        return None
+
+    @staticmethod
+    def adopt(session: Session, metadata: FileMetadata) -> Optional[str]:
+        """Move a file stored before deduplication onto a shared blob.
+
+        The checksum is recomputed from the stored bytes. Does not commit;
+        remove the returned legacy file with remove_file() after the commit.
+
+        Returns:
+            Legacy filesystem path that is no longer referenced, otherwise None
+        """
+        if metadata.blob_id:
+            return None
+
+        legacy_path = None
+        if metadata.storage_location == StorageLocation.DATABASE:
+            file_content = session.exec(
+                select(FileContent).where(FileContent.file_id == metadata.file_id)
+            ).first()
+            if not file_content:
+                raise FileNotFoundError(f"No stored content for file {metadata.file_id}")
+            content = file_content.content
+            checksum = hashlib.sha256(content).hexdigest()
+            blob = BlobStore.store(session, checksum, len(content), metadata.storage_location, content=content)
+            session.delete(file_content)
+        else:
+            legacy_path = metadata.file_path
+            if not legacy_path or not os.path.exists(legacy_path):
+                raise FileNotFoundError(f"Missing file for {metadata.file_id}: {legacy_path}")
+            checksum = BlobStore.hash_file(legacy_path)
+            blob = BlobStore.store(
+                session, checksum, os.path.getsize(legacy_path), metadata.storage_location,
+                source_path=legacy_path, keep_source=True
+            )
+
+        metadata.checksum = checksum
+        metadata.blob_id = blob.blob_id
+        metadata.storage_location = blob.storage_location
+        metadata.file_path = blob.blob_path
+        session.add(metadata)
+        return legacy_path
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _keep_written_files(session):
+    """Files written in a committed transaction now belong to their blobs."""
+    session.info.pop(BlobStore.WRITTEN_KEY, None)
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def _discard_written_files(session, transaction):
+    """Remove blob files written by a transaction that ended without committing."""
+    if transaction.parent is not None or BlobStore.WRITTEN_KEY not in session.info:
+        return
+    for path in session.info.pop(BlobStore.WRITTEN_KEY):
+        try:
+            BlobStore.remove_file(session.get_bind(), path)
+        except Exception as e:
+            print(f"Error removing blob file {path} after rollback: {e}")
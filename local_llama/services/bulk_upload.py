@@ -0,0 +1,108 @@
+"""Multi-file upload pipeline: parallel spooling and batched metadata inserts."""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlmodel import Session
+from ..models.file_storage import FileMetadata
+from .blob_store import BlobStore
+from .upload_spool import UploadSpool
+
+
+class BulkUpload:
+    """Helpers for uploading many files in one drop.
+
+    Files are spooled and hashed by up to WORKERS threads at once, then
+    stored in batches of up to BATCH_SIZE: each batch dedupes against the
+    blob store and inserts all of its FileMetadata rows in one commit.
+    """
+
+    WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", "4"))
+    BATCH_SIZE = int(os.getenv("BULK_UPLOAD_BATCH_SIZE", "25"))
+
+    # Naming rule -> label shown in the upload zone
+    NAMING_RULES = {
+        "original": "Keep original names",
+        "date_prefix": "Prefix with upload date",
+        "directory_prefix": "Prefix with folder name",
+    }
+
+    @staticmethod
+    def apply_naming_rule(
+        filename: str,
+        rule: str,
+        directory_name: str = "",
+        when: Optional[datetime] = None
+    ) -> str:
+        """Name a file by rule instead of asking for each one.
+
+        Examples (rule -> result for "audit.pdf"):
+            original          -> audit.pdf
+            date_prefix       -> 2025-03-14_audit.pdf
+            directory_prefix  -> sysaudit_audit.pdf
+        """
+        if rule == "date_prefix":
+            return f"{(when or datetime.now()).strftime('%Y-%m-%d')}_{filename}"
+        if rule == "directory_prefix" and directory_name:
+            return f"{directory_name}_{filename}"
+        return filename
+
+    @staticmethod
+    def source_of(upload: Any) -> Any:
+        """Get something UploadSpool.spool_file() can read in a thread (a sync file or bytes)."""
+        if isinstance(upload, dict):
+            return upload.get("content", b"")
+        if isinstance(upload, (bytes, bytearray, memoryview)):
+            return upload
+        return getattr(upload, "file", upload)
+
+    @staticmethod
+    def store_batch(engine, items: List[Dict]) -> List[Tuple[Optional[int], Optional[str]]]:
+        """Store spooled files and insert their metadata with a single commit.
+
+        Args:
+            engine: Database engine
+            items: Dicts with path, size, checksum, filename, file_type,
+                storage_location, directory_id and uploaded_by
+
+        Returns:
+            (file_id, error) per item, in order; a failed item does not fail the batch
+        """
+        results: List[Tuple[Optional[FileMetadata], Optional[str]]] = []
+        try:
+            with Session(engine) as session:
+                for item in items:
+                    try:
+                        # Savepoint per file so one bad file only drops its own blob reference
+                        with session.begin_nested():
+                            blob = BlobStore.store(
+                                session,
+                                item["checksum"],
+                                item["size"],
+                                item["storage_location"],
+                                source_path=item["path"]
+                            )
+                        results.append((FileMetadata(
+                            filename=f"{datetime.now().timestamp()}_{item['filename']}",
+                            original_filename=item["filename"],
+                            file_type=item["file_type"],
+                            mime_type="application/octet-stream",
+                            file_size=item["size"],
+                            storage_location=blob.storage_location,
+                            file_path=blob.blob_path,
+                            checksum=item["checksum"],
+                            blob_id=blob.blob_id,
+                            uploaded_by=item["uploaded_by"],
+                            directory_id=item["directory_id"],
+                        ), None))
+                    except Exception as e:
+                        results.append((None, str(e)))
+
+                # One flush for the whole batch, so the inserts go out together
+                session.add_all([metadata for metadata, _ in results if metadata])
+                session.commit()
+
+                return [(metadata.file_id if metadata else None, error) for metadata, error in results]
+        finally:
+            # Spool files of duplicate (or failed) content were not moved into the store
+            for item in items:
+                UploadSpool.discard(item["path"])
@@ -0,0 +1,209 @@
+"""Dashboard aggregation service."""
+from datetime import datetime, timedelta, date
+from typing import Optional, Dict, List, Any
+from sqlalchemy import case
+from sqlmodel import Session, select, func, and_
+from ..models.user_activity import UserActivity
+from ..models.daily_activity_rollup import DailyActivityRollup
+from ..models.employee import Employee
+from ..models.asset import Asset
+from ..models.project import Project
+
+
+class DashboardMetrics:
+    """Computes the dashboard metrics with a fixed number of aggregate queries.
+
+    Activity counts come from DailyActivityRollup (see ActivityRollup), so
+    their cost follows the number of distinct days/types/employees/projects
+    rather than the size of the UserActivity history. Every method issues
+    exactly one statement.
+    """
+
+    # Activity type -> short key used by the charts and breakdowns
+    TYPE_KEYS = {
+        "vm_created": "vm",
+        "image_captured": "image",
+        "log_added": "log",
+        "dat_updated": "dat",
+    }
+
+    @staticmethod
+    def _sum_where(*conditions):
+        """Conditional count: SUM(CASE WHEN <conditions> THEN activity_count ELSE 0 END)."""
+        return func.coalesce(
+            func.sum(case((and_(*conditions), DailyActivityRollup.activity_count), else_=0)), 0
+        )
+
+    @staticmethod
+    def activity_summary(session: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Get the headline counts, month-over-month comparisons and type totals.
+
+        Returns:
+            Dict keyed like the DashboardState counters (total_activities,
+            activities_today, ..., vm_creations, dat_updates)
+        """
+        today = (now or datetime.now()).date()
+        week_ago = today - timedelta(days=7)
+        month_ago = today - timedelta(days=30)
+
+        # Same windows shifted back one month for the comparisons
+        last_month_start = month_ago - timedelta(days=30)
+        last_month_today = today - timedelta(days=30)
+        last_month_week_start = week_ago - timedelta(days=30)
+
+        day = DailyActivityRollup.activity_day
+        activity_type = DailyActivityRollup.activity_type
+        sum_where = DashboardMetrics._sum_where
+
+        row = session.exec(
+            select(
+                func.coalesce(func.sum(DailyActivityRollup.activity_count), 0).label("total_activities"),
+                sum_where(day >= today).label("activities_today"),
+                sum_where(day >= week_ago).label("activities_this_week"),
+                sum_where(day >= month_ago).label("activities_this_month"),
+                sum_where(day < month_ago).label("total_activities_last_month"),
+                sum_where(day == last_month_today).label("activities_today_last_month"),
+                sum_where(day >= last_month_week_start, day < last_month_today).label("activities_this_week_last_month"),
+                sum_where(day >= last_month_start, day < month_ago).label("activities_this_month_last_month"),
+                sum_where(activity_type == "vm_created").label("vm_creations"),
+                sum_where(activity_type == "image_captured").label("image_captures"),
+                sum_where(activity_type == "log_added").label("log_collections"),
+                sum_where(activity_type == "dat_updated").label("dat_updates"),
+            )
+        ).one()
+
+        return {key: int(value or 0) for key, value in row._mapping.items()}
+
+    @staticmethod
+    def employee_activity_counts(session: Session) -> List[Dict[str, Any]]:
+        """Get per-employee activity totals broken down by type.
+
+        Uses one GROUP BY employee_id, activity_type with the employee names
+        joined in, instead of a query per employee.
+
+        Returns:
+            List of dicts (employee_id, name, total and one count per TYPE_KEYS
+            value), sorted by total descending
+        """
+        rows = session.exec(
+            select(
+                DailyActivityRollup.employee_id,
+                Employee.first_name,
+                Employee.last_name,
+                DailyActivityRollup.activity_type,
+                func.sum(DailyActivityRollup.activity_count),
+            )
+            .join(Employee, DailyActivityRollup.employee_id == Employee.id)
+            .group_by(
+                DailyActivityRollup.employee_id,
+                Employee.first_name,
+                Employee.last_name,
+                DailyActivityRollup.activity_type,
+            )
+        ).all()
+
+        employees: Dict[int, Dict[str, Any]] = {}
+        for emp_id, first_name, last_name, activity_type, count in rows:
+            entry = employees.get(emp_id)
+            if entry is None:
+                entry = {
+                    "employee_id": emp_id,
+                    "name": f"{first_name} {last_name}",
+                    "total": 0,
+                    **{key: 0 for key in DashboardMetrics.TYPE_KEYS.values()},
+                }
+                employees[emp_id] = entry
+            entry["total"] += count
+            type_key = DashboardMetrics.TYPE_KEYS.get(activity_type)
+            if type_key:
+                entry[type_key] += count
+
+        return sorted(employees.values(), key=lambda e: e["total"], reverse=True)
+
+    @staticmethod
+    def project_activity_counts(session: Session, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the projects with the most activities, names joined in."""
+        activity_count = func.sum(DailyActivityRollup.activity_count)
+        rows = session.exec(
+            select(Project.project_name, activity_count)
+            .join(Project, DailyActivityRollup.project_id == Project.project_id)
+            .group_by(DailyActivityRollup.project_id, Project.project_name)
+            .order_by(activity_count.desc())
+            .limit(limit)
+        ).all()
+        return [{"name": name, "count": count} for name, count in rows]
+
+    @staticmethod
+    def recent_activities(session: Session, limit: int = 10) -> List[Dict[str, str]]:
+        """Get the latest activities with the employee name joined in."""
+        rows = session.exec(
+            select(UserActivity, Employee.first_name, Employee.last_name)
+            .outerjoin(Employee, UserActivity.employee_id == Employee.id)
+            .order_by(UserActivity.activity_timestamp.desc())
+            .limit(limit)
+        ).all()
+
+        return [
+            {
+                "timestamp": activity.activity_timestamp.strftime("%Y-%m-%d %H:%M"),
+                "employee": f"{first_name} {last_name}" if first_name else "Unknown",
+                "type": activity.activity_type.replace("_", " ").title(),
+                "description": activity.activity_description
+            }
+            for activity, first_name, last_name in rows
+        ]
+
+    @staticmethod
+    def activity_timeline(session: Session, now: Optional[datetime] = None, days: int = 7) -> List[Dict[str, Any]]:
+        """Get per-day activity counts by type for the last `days` days.
+
+        Returns:
+            One dict per day in chronological order with date and a count per
+            TYPE_KEYS value
+        """
+        today = (now or datetime.now()).date()
+        first_day = today - timedelta(days=days - 1)
+
+        rows = session.exec(
+            select(
+                DailyActivityRollup.activity_day,
+                DailyActivityRollup.activity_type,
+                func.sum(DailyActivityRollup.activity_count),
+            )
+            .where(and_(
+                DailyActivityRollup.activity_day >= first_day,
+                DailyActivityRollup.activity_day <= today
+            ))
+            .group_by(DailyActivityRollup.activity_day, DailyActivityRollup.activity_type)
+        ).all()
+
+        counts: Dict[date, Dict[str, int]] = {}
+        for day, activity_type, count in rows:
+            type_key = DashboardMetrics.TYPE_KEYS.get(activity_type)
+            if type_key:
+                counts.setdefault(day, {})[type_key] = count
+
+        timeline = []
+        for i in range(days - 1, -1, -1):  # Reverse order for chronological display
+            day = today - timedelta(days=i)
+            day_counts = counts.get(day, {})
+            timeline.append({
+                "date": day.strftime("%b %d"),
+                **{key: day_counts.get(key, 0) for key in DashboardMetrics.TYPE_KEYS.values()},
+            })
+        return timeline
+
+    @staticmethod
+    def asset_statistics(session: Session) -> Dict[str, int]:
+        """Get asset, project and in-use operating system totals in one statement."""
+        row = session.exec(
+            select(
+                select(func.count(Asset.asset_id)).scalar_subquery().label("total_assets"),
+                select(func.count(Project.project_id)).scalar_subquery().label("total_projects"),
+                select(func.count(func.distinct(Asset.os_id)))
+                .where(Asset.os_id.isnot(None))
+                .scalar_subquery()
+                .label("total_operating_systems"),
+            )
+        ).one()
+        return {key: int(value or 0) for key, value in row._mapping.items()}
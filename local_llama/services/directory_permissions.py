@@ -0,0 +1,127 @@
+"""Cached effective directory permissions for the Files page."""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlmodel import Session, select
+from ..models.file_storage import FileDirectory
+
+
+class PermissionMap:
+    """One user's (can_view, can_upload) for every directory, packed into bit flags."""
+
+    VIEW = 1
+    UPLOAD = 2
+
+    def __init__(self, bits: Dict[int, int]):
+        self.bits = bits
+        self.loaded_at = time.monotonic()
+
+    def get(self, directory_id: int) -> Optional[Tuple[bool, bool]]:
+        """Look up one directory; None if it was created after this map was loaded."""
+        bits = self.bits.get(directory_id)
+        if bits is None:
+            return None
+        return bool(bits & PermissionMap.VIEW), bool(bits & PermissionMap.UPLOAD)
+
+
+class DirectoryPermissions:
+    """Shared in-process cache of each user's effective directory permissions.
+
+    A user's map is computed from one query over every directory the first
+    time it is needed and reused by every session until TTL_SECONDS pass or
+    a directory's owner, public flag or name changes (see _on_update below).
+    """
+
+    TTL_SECONDS = 300
+    MAX_USERS = 500
+
+    # Employee id (None when signed out) -> PermissionMap
+    _entries: Dict[Optional[int], PermissionMap] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def resolve(owner_id: Optional[int], is_public: bool, name: str, user_id: Optional[int]) -> int:
+        """Compute one directory's permission bits for a user.
+
+        Owners can view and upload; public folders (flagged, or named
+        "public") can be viewed by anyone and uploaded to by any signed-in
+        employee; everything else is private to its owner.
+        """
+        if user_id is not None and owner_id == user_id:
+            return PermissionMap.VIEW | PermissionMap.UPLOAD
+        if is_public or "public" in (name or "").lower():
+            return PermissionMap.VIEW | (PermissionMap.UPLOAD if user_id is not None else 0)
+        return 0
+
+    @staticmethod
+    def for_user(session: Session, user_id: Optional[int]) -> PermissionMap:
+        """Get a user's permission map, computing it if missing or expired.
+
+        Args:
+            session: Open database session, only used on a cache miss
+            user_id: Employee id of the signed-in user (None when signed out)
+
+        Returns:
+            The cached PermissionMap
+        """
+        entry = DirectoryPermissions._entries.get(user_id)
+        if entry and time.monotonic() - entry.loaded_at < DirectoryPermissions.TTL_SECONDS:
+            return entry
+
+        rows = session.exec(
+            select(FileDirectory.directory_id, FileDirectory.owner_id, FileDirectory.is_public, FileDirectory.name)
+        ).all()
+        entry = PermissionMap({
+            directory_id: DirectoryPermissions.resolve(owner_id, is_public, name, user_id)
+            for directory_id, owner_id, is_public, name in rows
+        })
+
+        with DirectoryPermissions._lock:
+            entries = DirectoryPermissions._entries
+            entries.pop(user_id, None)
+            while len(entries) >= DirectoryPermissions.MAX_USERS:
+                # Evict the least recently loaded user
+                entries.pop(next(iter(entries)))
+            entries[user_id] = entry
+        return entry
+
+    @staticmethod
+    def access(session: Session, user_id: Optional[int], directory_id: int) -> Tuple[bool, bool]:
+        """Get a user's (can_view, can_upload) for one directory.
+
+        Directories created since the map was loaded are resolved with one
+        lookup and added to it; directories that do not exist get no access.
+        """
+        permissions = DirectoryPermissions.for_user(session, user_id)
+        access = permissions.get(directory_id)
+        if access is not None:
+            return access
+
+        directory = session.get(FileDirectory, directory_id)
+        if not directory:
+            return False, False
+        permissions.bits[directory_id] = DirectoryPermissions.resolve(
+            directory.owner_id, directory.is_public, directory.name, user_id
+        )
+        return permissions.get(directory_id)
+
+    @staticmethod
+    def invalidate():
+        """Drop every cached map so the next check recomputes it."""
+        with DirectoryPermissions._lock:
+            DirectoryPermissions._entries.clear()
+
+
+@event.listens_for(FileDirectory, "after_update")
+def _on_update(mapper, connection, target):
+    """Invalidate cached permissions when a directory's owner, public flag or name changes."""
+    attrs = inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in ("owner_id", "is_public", "name")):
+        DirectoryPermissions.invalidate()
+
+
+@event.listens_for(FileDirectory, "after_delete")
+def _on_delete(mapper, connection, target):
+    """Invalidate cached permissions when a directory is deleted."""
+    DirectoryPermissions.invalidate()
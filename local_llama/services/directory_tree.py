@@ -0,0 +1,248 @@
+"""Directory tree building for the Files page."""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlmodel import Session, select, func
+from ..models.file_storage import FileDirectory, FileMetadata
+
+
+class DirectoryTree:
+    """Loads and builds the Files page's directory views.
+
+    Directories are fetched one level at a time (each with its file count),
+    so the tree only ever holds the levels a user can see plus the next one.
+    """
+
+    # Ids per IN (...) clause; SQL Server allows at most 2100 parameters per statement
+    IN_BATCH_SIZE = 1000
+
+    @staticmethod
+    def file_counts(session: Session, directory_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """Count files per directory with one GROUP BY query.
+
+        Args:
+            session: Open database session
+            directory_ids: Only count these directories (default: all)
+
+        Returns:
+            {directory_id: file count}; directories without files are absent
+        """
+        query = (
+            select(FileMetadata.directory_id, func.count(FileMetadata.file_id))
+            .where(FileMetadata.directory_id.is_not(None))
+            .group_by(FileMetadata.directory_id)
+        )
+        if directory_ids is not None:
+            directory_ids = list(directory_ids)
+            if not directory_ids:
+                return {}
+            query = query.where(FileMetadata.directory_id.in_(directory_ids))
+        return dict(session.exec(query).all())
+
+    @staticmethod
+    def children(session: Session, parent_ids: Iterable[Optional[int]]) -> List[Tuple[FileDirectory, int]]:
+        """Fetch the directories under the given parents, each with its file count.
+
+        Args:
+            session: Open database session
+            parent_ids: Parent directory ids; None fetches the roots
+
+        Returns:
+            [(directory, file count)] ordered by full_path within each query
+        """
+        file_count = (
+            select(func.count(FileMetadata.file_id))
+            .where(FileMetadata.directory_id == FileDirectory.directory_id)
+            .scalar_subquery()
+        )
+        parent_ids = list(parent_ids)
+        ids = [p for p in parent_ids if p is not None]
+        conditions = [
+            FileDirectory.parent_id.in_(ids[i:i + DirectoryTree.IN_BATCH_SIZE])
+            for i in range(0, len(ids), DirectoryTree.IN_BATCH_SIZE)
+        ]
+        if None in parent_ids:
+            conditions.append(FileDirectory.parent_id.is_(None))
+
+        rows = []
+        for condition in conditions:
+            rows.extend(session.exec(
+                select(FileDirectory, file_count).where(condition).order_by(FileDirectory.full_path)
+            ).all())
+        return rows
+
+    @staticmethod
+    def total_files(session: Session) -> int:
+        """Count the files filed under any directory."""
+        return session.exec(
+            select(func.count(FileMetadata.file_id)).where(FileMetadata.directory_id.is_not(None))
+        ).one()
+
+    @staticmethod
+    def path_prefixes(full_path: str) -> List[str]:
+        """Get the full_path of every ancestor of a path, root first ("/a/b/c" -> ["/a", "/a/b"])."""
+        parts = full_path.strip("/").split("/")
+        return ["/" + "/".join(parts[:depth]) for depth in range(1, len(parts))]
+
+    @staticmethod
+    def ancestors(session: Session, directory: FileDirectory) -> List[FileDirectory]:
+        """Fetch a directory's ancestors, root first, with one indexed full_path query.
+
+        The rows matched by path are then linked up through parent_id, so a
+        path shared by an unrelated directory is ignored. A gap in the path
+        (a parent whose full_path does not prefix its child's) is filled in
+        with one lookup per missing level.
+
+        Args:
+            session: Open database session
+            directory: Directory to start from (not included in the result)
+
+        Returns:
+            Ancestor directories ordered from the root down to the parent
+        """
+        prefixes = DirectoryTree.path_prefixes(directory.full_path)
+        by_id = {}
+        if prefixes and directory.parent_id is not None:
+            by_id = {
+                d.directory_id: d
+                for d in session.exec(select(FileDirectory).where(FileDirectory.full_path.in_(prefixes))).all()
+            }
+
+        chain = []
+        seen = {directory.directory_id}
+        current = directory
+        while current.parent_id is not None and current.parent_id not in seen:
+            parent = by_id.get(current.parent_id) or session.get(FileDirectory, current.parent_id)
+            if parent is None:
+                break
+            chain.append(parent)
+            seen.add(parent.directory_id)
+            current = parent
+        return list(reversed(chain))
+
+    @staticmethod
+    def descendants(session: Session, directory: FileDirectory) -> List[FileDirectory]:
+        """Fetch every directory below a directory with one indexed full_path prefix query.
+
+        Returns:
+            Descendant directories ordered by full_path
+        """
+        return session.exec(
+            select(FileDirectory)
+            .where(FileDirectory.full_path.startswith(directory.full_path.rstrip("/") + "/", autoescape=True))
+            .order_by(FileDirectory.full_path)
+        ).all()
+
+    @staticmethod
+    def index_by_parent(directories: Iterable[FileDirectory]) -> Dict[Optional[int], List[FileDirectory]]:
+        """Group directories by parent_id (None for roots), keeping their order."""
+        children = defaultdict(list)
+        for directory in directories:
+            children[directory.parent_id].append(directory)
+        return children
+
+    @staticmethod
+    def entry(d: FileDirectory, file_count: int = 0, has_children: bool = False, locked: bool = False) -> Dict[str, Any]:
+        """Build one flat list entry (locked: the signed-in user cannot view it)."""
+        return {
+            "directory_id": d.directory_id,
+            "name": d.name,
+            "full_path": d.full_path,
+            "description": d.description,
+            "icon": d.icon or "folder",
+            "color": d.color,
+            "is_system_directory": d.is_system_directory,
+            "is_public": d.is_public,
+            "can_create_subdirs": d.can_create_subdirs,
+            "can_upload_files": d.can_upload_files,
+            "file_count": file_count,
+            "has_children": has_children,
+            "locked": locked,
+        }
+
+    @staticmethod
+    def node(
+        d: FileDirectory, file_count: int = 0, children: Optional[List[Dict[str, Any]]] = None, locked: bool = False
+    ) -> Dict[str, Any]:
+        """Build one nested tree node (locked: the signed-in user cannot view it)."""
+        children = children or []
+        return {
+            "directory_id": d.directory_id,
+            "name": d.name,
+            "full_path": d.full_path,
+            "description": d.description or "",
+            "icon": d.icon or "folder",
+            "color": d.color or "blue",
+            "is_system_directory": d.is_system_directory,
+            "is_public": d.is_public,
+            "can_create_subdirs": d.can_create_subdirs,
+            "can_upload_files": d.can_upload_files,
+            "children": children,
+            "has_children": len(children) > 0,
+            "file_count": file_count,
+            "locked": locked,
+        }
+
+    @staticmethod
+    def react_node(node: Dict[str, Any], expanded: Set[int]) -> Dict[str, Any]:
+        """Convert a tree node and its subtree to react-file-tree nodes."""
+        react_node = {
+            "type": "directory",
+            "uri": node["full_path"],
+            "expanded": node["directory_id"] in expanded,
+            "name": node["name"],
+            "directory_id": node["directory_id"],
+            "file_count": node["file_count"],
+            "locked": node.get("locked", False),
+        }
+        if node["children"]:
+            react_node["children"] = sorted(
+                (DirectoryTree.react_node(child, expanded) for child in node["children"]), key=DirectoryTree.react_sort_key
+            )
+        return react_node
+
+    @staticmethod
+    def react_sort_key(react_node: Dict[str, Any]) -> str:
+        """Sort key for react-file-tree siblings."""
+        return react_node["uri"].lower()
+
+    @staticmethod
+    def react_tree(tree: List[Dict[str, Any]], expanded: Iterable[int]) -> Dict[str, Any]:
+        """Convert tree nodes to the react-file-tree structure.
+
+        Several roots are placed under a virtual "/" root node.
+        """
+        expanded = set(expanded)
+        if not tree:
+            return {}
+        if len(tree) == 1:
+            return DirectoryTree.react_node(tree[0], expanded)
+        return {
+            "type": "directory",
+            "uri": "/",
+            "name": "Root",
+            "expanded": True,
+            "children": sorted(
+                (DirectoryTree.react_node(node, expanded) for node in tree), key=DirectoryTree.react_sort_key
+            ),
+        }
+
+    @staticmethod
+    def ancestry(parents: Dict[int, Optional[int]], directory_id: int) -> List[int]:
+        """Get the ids from a directory's root down to the directory itself."""
+        path = []
+        current = directory_id
+        while current is not None and current not in path:
+            path.append(current)
+            current = parents.get(current)
+        return list(reversed(path))
+
+    @staticmethod
+    def find(nodes: List[Dict[str, Any]], path: List[int]) -> Optional[Dict[str, Any]]:
+        """Find the node at the end of a root-to-node id path, visiting one sibling list per level."""
+        node = None
+        for directory_id in path:
+            node = next((n for n in nodes if n.get("directory_id") == directory_id), None)
+            if node is None:
+                return None
+            nodes = node.get("children", [])
+        return node
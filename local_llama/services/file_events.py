@@ -0,0 +1,148 @@
+"""In-process notifications of file list changes, keyed by directory.
+
+Environment variables:
+    FILE_EVENTS_MAX_QUEUED     changes held per watching session before it
+                               is told to reload instead (default 1000)
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+class FileSubscription:
+    """One session's subscription: the directory it watches and its change queue."""
+
+    def __init__(self, token: str, directory_id: Optional[int], loop: asyncio.AbstractEventLoop):
+        self.token = token
+        self.directory_id = directory_id
+        self.loop = loop
+        self.paused = False  # Set while the session shows no file list (e.g. access denied)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=FileEvents.MAX_QUEUED)
+
+
+class FileEvents:
+    """Publishes file list changes to the sessions watching a directory.
+
+    Uploads and deletes publish the changed file rows; each watching Files
+    page receives them on its subscription queue, so an idle page costs no
+    queries and changes still show up immediately. Only sessions served by
+    this process are reached.
+
+    Changes are tuples:
+        ("upsert", file row)   a file was added or changed (same dict as FileStorageState.files)
+        ("delete", file_id)    a file was removed
+        ("reload", None)       too much changed at once; reload the list
+        ("stop", None)         the subscription was cancelled
+    """
+
+    MAX_QUEUED = int(os.getenv("FILE_EVENTS_MAX_QUEUED", "1000"))
+    CONNECTED_CHECK_SECONDS = 60  # How often an idle watcher checks that its tab is still open
+
+    # Client token -> subscription
+    _subscriptions: Dict[str, FileSubscription] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def subscribe(token: str, directory_id: Optional[int]) -> FileSubscription:
+        """Start watching a directory for a session, replacing any earlier subscription.
+
+        Must be called from the event loop that will read the queue.
+        """
+        subscription = FileSubscription(token, directory_id, asyncio.get_running_loop())
+        with FileEvents._lock:
+            previous = FileEvents._subscriptions.get(token)
+            FileEvents._subscriptions[token] = subscription
+        if previous:
+            FileEvents._deliver(previous, ("stop", None))
+        return subscription
+
+    @staticmethod
+    def follow(token: str, directory_id: Optional[int]):
+        """Point a session's subscription at another directory (no-op if it has none)."""
+        with FileEvents._lock:
+            subscription = FileEvents._subscriptions.get(token)
+            if subscription:
+                subscription.directory_id = directory_id
+                subscription.paused = False
+
+    @staticmethod
+    def pause(token: str):
+        """Stop sending changes to a session until it follows a directory again."""
+        with FileEvents._lock:
+            subscription = FileEvents._subscriptions.get(token)
+            if subscription:
+                subscription.paused = True
+
+    @staticmethod
+    def unsubscribe(token: str, subscription: Optional[FileSubscription] = None):
+        """Stop a session's subscription and wake its reader.
+
+        Args:
+            token: Client token of the session
+            subscription: Only stop this subscription (ignored if it was already replaced)
+        """
+        with FileEvents._lock:
+            current = FileEvents._subscriptions.get(token)
+            if current is None or (subscription is not None and current is not subscription):
+                return
+            del FileEvents._subscriptions[token]
+        FileEvents._deliver(current, ("stop", None))
+
+    @staticmethod
+    def publish(directory_id: Optional[int], change: Tuple[str, Any], origin: Optional[str] = None):
+        """Send a change to every session watching a directory.
+
+        Safe to call from any thread.
+
+        Args:
+            directory_id: Directory the changed file is in (None for the root)
+            change: See the class docstring
+            origin: Token of the session that made the change; it already has it
+        """
+        with FileEvents._lock:
+            targets = [
+                s for token, s in FileEvents._subscriptions.items()
+                if s.directory_id == directory_id and token != origin and not s.paused
+            ]
+        for subscription in targets:
+            FileEvents._deliver(subscription, change)
+
+    @staticmethod
+    def publish_all(change: Tuple[str, Any], origin: Optional[str] = None):
+        """Send a change to every watching session, whatever directory it is in."""
+        with FileEvents._lock:
+            targets = [
+                s for token, s in FileEvents._subscriptions.items() if token != origin and not s.paused
+            ]
+        for subscription in targets:
+            FileEvents._deliver(subscription, change)
+
+    @staticmethod
+    def _deliver(subscription: FileSubscription, change: Tuple[str, Any]):
+        """Queue a change on the subscription's own event loop."""
+        def offer():
+            try:
+                subscription.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # The reader fell behind; replace the backlog with one reload,
+                # or with the stop itself so an unsubscribed reader still exits
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(change if change[0] == "stop" else ("reload", None))
+
+        try:
+            subscription.loop.call_soon_threadsafe(offer)
+        except RuntimeError:
+            # The loop has closed; nothing is reading this queue any more
+            pass
+
+    @staticmethod
+    def connected(token: str) -> bool:
+        """Whether a session's browser tab is still connected (True if it cannot be told)."""
+        try:
+            from reflex.utils import prerequisites
+            namespace = prerequisites.get_and_validate_app().app.event_namespace
+        except Exception:
+            return True
+        return namespace is None or token in namespace.token_to_sid
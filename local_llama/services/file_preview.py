@@ -0,0 +1,119 @@
+"""Bounded-size file previews cached on disk by checksum."""
+import io
+import os
+import tempfile
+from typing import Optional, Tuple
+from sqlmodel import Session
+from ..models.file_storage import FileMetadata, FileType
+from .blob_store import BlobStore
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # No thumbnails without Pillow
+
+
+class FilePreview:
+    """Builds small previews for the Files page and caches them by checksum.
+
+    Text and markdown previews are the first TEXT_PREVIEW_BYTES of the file,
+    PNG/JPEG previews are thumbnails no larger than THUMBNAIL_SIZE, and SVGs
+    up to SVG_MAX_BYTES are previewed as themselves (browsers render them
+    natively in an <img>). Content never changes for a checksum, so a cached
+    preview is reused until the cache is cleared.
+    """
+
+    CACHE_DIR = os.path.join("./uploads", ".previews")
+    TEXT_PREVIEW_BYTES = 4 * 1024  # 4KB
+    THUMBNAIL_SIZE = (256, 256)
+    SVG_MAX_BYTES = 256 * 1024  # 256KB
+
+    # Preview kind -> (cache file extension, media type)
+    KINDS = {
+        "text": (".txt", "text/plain; charset=utf-8"),
+        "image": (".png", "image/png"),
+        "svg": (".svg", "image/svg+xml"),
+    }
+
+    @staticmethod
+    def kind(file_type: FileType) -> Optional[str]:
+        """Get the preview kind for a file type, or None if it has no preview."""
+        if file_type in (FileType.MARKDOWN, FileType.TEXT):
+            return "text"
+        if file_type in (FileType.PNG, FileType.JPEG):
+            return "image" if Image is not None else None
+        if file_type == FileType.SVG:
+            return "svg"
+        return None
+
+    @staticmethod
+    def cache_path(checksum: str, kind: str) -> str:
+        """Get the cache file for a checksum's preview, sharded by hash prefix."""
+        extension, _ = FilePreview.KINDS[kind]
+        return os.path.join(FilePreview.CACHE_DIR, checksum[:2], f"{checksum}{extension}")
+
+    @staticmethod
+    def get(session: Session, metadata: FileMetadata) -> Optional[Tuple[str, str]]:
+        """Get a file's cached preview, building it on first request.
+
+        Returns:
+            (preview file path, media type), or None if the file has no preview
+        """
+        kind = FilePreview.kind(metadata.file_type)
+        if not kind or not metadata.checksum:
+            return None
+
+        path = FilePreview.cache_path(metadata.checksum, kind)
+        media_type = FilePreview.KINDS[kind][1]
+        if os.path.exists(path):
+            return path, media_type
+
+        try:
+            preview = FilePreview._build(session, metadata, kind)
+        except Exception as e:
+            print(f"Error building preview for file {metadata.file_id}: {e}")
+            return None
+        if preview is None:
+            return None
+
+        # Write to a temp file and rename so readers never see a partial preview
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".part", delete=False) as temp:
+            temp.write(preview)
+        os.replace(temp.name, path)
+        return path, media_type
+
+    @staticmethod
+    def _build(session: Session, metadata: FileMetadata, kind: str) -> Optional[bytes]:
+        """Render a preview's bytes, reading no more of the file than the preview needs."""
+        if kind == "text":
+            content = BlobStore.read(session, metadata, FilePreview.TEXT_PREVIEW_BYTES)
+            if content is None:
+                return None
+            # Drop a multi-byte character cut off at the limit
+            return content.decode("utf-8", errors="ignore").encode("utf-8")
+
+        if kind == "svg":
+            if metadata.file_size > FilePreview.SVG_MAX_BYTES:
+                return None
+            return BlobStore.read(session, metadata)
+
+        # Images on disk are opened in place; database images are small enough to load
+        source = BlobStore.file_path(session, metadata)
+        if source is None:
+            content = BlobStore.read(session, metadata)
+            if content is None:
+                return None
+            source = io.BytesIO(content)
+        elif not os.path.exists(source):
+            return None
+
+        with Image.open(source) as image:
+            # Let JPEG decode at a reduced scale instead of full resolution
+            image.draft("RGB", FilePreview.THUMBNAIL_SIZE)
+            image.thumbnail(FilePreview.THUMBNAIL_SIZE)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            output = io.BytesIO()
+            image.save(output, format="PNG", optimize=True)
+            return output.getvalue()
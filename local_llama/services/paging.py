@@ -0,0 +1,69 @@
+"""Shared pagination helpers for the table states."""
+import math
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+from sqlmodel import Session, select, func
+
+
+class Paging:
+    """Counts and page bounds computed in SQL rather than by loading rows.
+
+    Counts can optionally be cached for a few seconds per key (e.g. table
+    plus filter set) so paging through a large table does not re-count it
+    on every click; writers call invalidate() to drop stale totals.
+    """
+
+    COUNT_TTL_SECONDS = 10
+
+    _counts: Dict[Hashable, Tuple[float, int]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def count(session: Session, query, cache_key: Optional[Hashable] = None) -> int:
+        """Count the rows a query would return with a single COUNT(*).
+
+        Args:
+            session: Open database session
+            query: Select statement to count (any ORDER BY is dropped)
+            cache_key: Optional key to cache the result under for COUNT_TTL_SECONDS;
+                tuples are matched by their first element in invalidate()
+
+        Returns:
+            Number of rows
+        """
+        if cache_key is not None:
+            cached = Paging._counts.get(cache_key)
+            if cached and time.monotonic() - cached[0] < Paging.COUNT_TTL_SECONDS:
+                return cached[1]
+
+        total = session.exec(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).one()
+
+        if cache_key is not None:
+            with Paging._lock:
+                Paging._counts[cache_key] = (time.monotonic(), total)
+        return total
+
+    @staticmethod
+    def invalidate(table: Optional[str] = None):
+        """Drop cached counts for a table (the key or its first element), or all of them."""
+        with Paging._lock:
+            if table is None:
+                Paging._counts.clear()
+                return
+            for key in list(Paging._counts):
+                if key == table or (isinstance(key, tuple) and key and key[0] == table):
+                    del Paging._counts[key]
+
+    @staticmethod
+    def page_bounds(total_count: int, page: int, page_size: int) -> Tuple[int, int, int]:
+        """Clamp a page number to the available pages.
+
+        Returns:
+            (total_pages, page, offset) with page within 1..total_pages
+        """
+        total_pages = max(1, math.ceil(total_count / page_size))
+        page = min(max(1, page), total_pages)
+        return total_pages, page, (page - 1) * page_size
@@ -0,0 +1,123 @@
+"""Process-wide cache for small reference (lookup) tables."""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import reflex as rx
+from sqlmodel import Session, select
+from ..models.project import Project
+from ..models.building import Building
+from ..models.floor import Floor
+from ..models.sys_type import SysType
+from ..models.operating_system import OperatingSystem
+from ..models.hardware_manufacturer import HardwareManufacturer
+from ..models.log_type import LogType
+from ..models.imaging_method import ImagingMethod
+from ..models.vm_type import VMType
+from ..models.vm_status import VMStatus
+from ..models.virt_source import VirtualizationSource
+
+
+class ReferenceTable:
+    """Snapshot of one lookup table, ordered by name."""
+
+    def __init__(self, rows: List[Tuple[int, str]]):
+        self.rows = rows
+        self.loaded_at = time.monotonic()
+        self._id_to_name = {row_id: name for row_id, name in rows}
+        self._name_to_id = {name: row_id for row_id, name in rows}
+
+    def names(self) -> List[str]:
+        """Get the names in display order (a copy, safe to modify)."""
+        return [name for _, name in self.rows]
+
+    def id_to_name(self) -> Dict[int, str]:
+        """Get the id -> name map (a copy, safe to modify)."""
+        return dict(self._id_to_name)
+
+    def name_to_id(self) -> Dict[str, int]:
+        """Get the name -> id map (a copy, safe to modify)."""
+        return dict(self._name_to_id)
+
+    def get_name(self, row_id: Optional[int], default: Optional[str] = None) -> Optional[str]:
+        """Look up a single name by id."""
+        return self._id_to_name.get(row_id, default)
+
+    def get_id(self, name: Optional[str]) -> Optional[int]:
+        """Look up a single id by name."""
+        return self._name_to_id.get(name)
+
+
+class ReferenceDataCache:
+    """Shared in-process cache of rarely-changing lookup tables.
+
+    Entries expire after TTL_SECONDS and can be dropped explicitly with
+    invalidate() whenever one of the cached tables is written to.
+    """
+
+    TTL_SECONDS = 300
+
+    # Cache key -> (model, id column, name column)
+    TABLES = {
+        "project": (Project, "project_id", "project_name"),
+        "building": (Building, "building_id", "building_name"),
+        "floor": (Floor, "floor_id", "floor_name"),
+        "systype": (SysType, "systype_id", "systype_name"),
+        "operating_system": (OperatingSystem, "os_id", "os_name"),
+        "hardware_manufacturer": (HardwareManufacturer, "hwmanu_id", "hwmanu_name"),
+        "logtype": (LogType, "logtype_id", "logtype"),
+        "imaging_method": (ImagingMethod, "imgmethod_id", "img_method"),
+        "vm_type": (VMType, "vmtype_id", "vm_type"),
+        "vm_status": (VMStatus, "vmstatus_id", "vm_status"),
+        "virt_source": (VirtualizationSource, "virtsource_id", "virt_source"),
+    }
+
+    _entries: Dict[str, ReferenceTable] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(table: str, session: Optional[Session] = None) -> ReferenceTable:
+        """Get a lookup table, loading it from the database if missing or expired.
+
+        Args:
+            table: Cache key (see TABLES)
+            session: Optional open session to load with; a new one is opened if omitted
+
+        Returns:
+            The cached ReferenceTable
+        """
+        entry = ReferenceDataCache._entries.get(table)
+        if entry and time.monotonic() - entry.loaded_at < ReferenceDataCache.TTL_SECONDS:
+            return entry
+
+        if session is None:
+            with rx.session() as new_session:
+                return ReferenceDataCache._load(table, new_session)
+        return ReferenceDataCache._load(table, session)
+
+    @staticmethod
+    def _load(table: str, session: Session) -> ReferenceTable:
+        """Load a lookup table from the database and store it in the cache."""
+        model, id_field, name_field = ReferenceDataCache.TABLES[table]
+        id_col = getattr(model, id_field)
+        name_col = getattr(model, name_field)
+
+        rows = session.exec(select(id_col, name_col).order_by(name_col)).all()
+        # Skip empty names, which the dropdowns never display
+        entry = ReferenceTable([(row_id, name) for row_id, name in rows if name])
+
+        with ReferenceDataCache._lock:
+            ReferenceDataCache._entries[table] = entry
+        return entry
+
+    @staticmethod
+    def invalidate(*tables: str):
+        """Drop cached lookup tables so the next read reloads them.
+
+        Args:
+            tables: Cache keys to drop; drops every table when none are given
+        """
+        with ReferenceDataCache._lock:
+            if not tables:
+                ReferenceDataCache._entries.clear()
+            for table in tables:
+                ReferenceDataCache._entries.pop(table, None)
@@ -0,0 +1,407 @@
+"""In-memory typeahead search over software and asset names."""
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+from ..models.software_catalog import SoftwareCatalog
+from ..models.sw_manufacturer import SWManufacturer
+from ..models.asset import Asset
+
+
+class SearchIndex:
+    """Token and trigram index over a few short text fields per document.
+
+    Text is split into lowercase alphanumeric tokens ("NI LabVIEW 7.1" ->
+    ni, labview, 7, 1). Every query token must match a token of the
+    document, scored by how it matches:
+
+        exact     "labview" = labview         1.0
+        prefix    "labv"    -> labview        0.8
+        infix     "view"    in labview        0.6  (3+ characters)
+        fuzzy     "labvew"  ~ labview         up to 0.5, only when the token
+                                              has no exact/prefix/infix match
+
+    Scores are scaled by the weight of the field the token was found in and
+    summed over the query tokens. Prefix matches use a sorted vocabulary;
+    infix and fuzzy matches use a trigram -> token map, so a lookup only
+    visits tokens that share text with the query.
+    """
+
+    EXACT = 1.0
+    PREFIX = 0.8
+    INFIX = 0.6
+    FUZZY = 0.5
+    FUZZY_MIN_SIMILARITY = 0.5  # Dice coefficient over padded trigrams
+
+    def __init__(self, weights: Dict[str, float]):
+        """
+        Args:
+            weights: Field name -> score multiplier; the first field is the label used to break ties
+        """
+        self.weights = weights
+        self._label_field = next(iter(weights))
+        self._labels: Dict[Hashable, str] = {}
+        self._doc_tokens: Dict[Hashable, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: List[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def tokenize(text: Optional[str]) -> List[str]:
+        """Split text into lowercase alphanumeric tokens."""
+        return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+    @staticmethod
+    def trigrams(token: str) -> Set[str]:
+        """Get a token's trigrams, padded so the first and last letters count ("ab" -> " ab", "ab ")."""
+        padded = f" {token} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, key: Hashable, fields: Dict[str, Optional[str]]):
+        """Index a document, replacing any earlier version of it."""
+        with self._lock:
+            self._remove(key)
+            tokens = {}
+            for field, text in fields.items():
+                weight = self.weights.get(field, 0)
+                for token in self.tokenize(text):
+                    tokens[token] = max(tokens.get(token, 0), weight)
+            self._labels[key] = (fields.get(self._label_field) or "").lower()
+            self._doc_tokens[key] = tokens
+            for token, weight in tokens.items():
+                if token not in self._postings:
+                    bisect.insort(self._vocabulary, token)
+                    for trigram in self.trigrams(token):
+                        self._trigrams[trigram].add(token)
+                self._postings[token][key] = weight
+
+    def remove(self, key: Hashable):
+        """Drop a document from the index (no-op if it is not indexed)."""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        """Drop a document; the caller holds the lock."""
+        self._labels.pop(key, None)
+        for token in self._doc_tokens.pop(key, {}):
+            posting = self._postings[token]
+            posting.pop(key, None)
+            if posting:
+                continue
+            # Last document with this token: forget the token
+            del self._postings[token]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            for trigram in self.trigrams(token):
+                self._trigrams[trigram].discard(token)
+                if not self._trigrams[trigram]:
+                    del self._trigrams[trigram]
+
+    def _match_token(self, query_token: str) -> Dict[str, float]:
+        """Score the vocabulary tokens a query token matches; the caller holds the lock."""
+        matches = {}
+        vocabulary = self._vocabulary
+        position = bisect.bisect_left(vocabulary, query_token)
+        while position < len(vocabulary) and vocabulary[position].startswith(query_token):
+            token = vocabulary[position]
+            matches[token] = self.EXACT if token == query_token else self.PREFIX
+            position += 1
+        if len(query_token) < 3:
+            return matches
+
+        # Tokens containing every trigram inside the query token
+        inner = [query_token[i:i + 3] for i in range(len(query_token) - 2)]
+        candidates = set.intersection(*(self._trigrams.get(t, set()) for t in inner))
+        for token in candidates:
+            if token not in matches and query_token in token:
+                matches[token] = self.INFIX
+        if matches:
+            return matches
+
+        # No literal match (a typo): rank tokens by shared padded trigrams
+        query_trigrams = self.trigrams(query_token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                shared[token] += 1
+        for token, count in shared.items():
+            similarity = 2 * count / (len(query_trigrams) + len(token))
+            if similarity >= self.FUZZY_MIN_SIMILARITY:
+                matches[token] = self.FUZZY * similarity
+        return matches
+
+    def ranked(self, query: str, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """Find the documents matching every token of a query, best first.
+
+        Args:
+            query: Search text
+            limit: Return at most this many results
+
+        Returns:
+            [(key, score)] ordered by score, then label; empty for a blank query
+        """
+        query_tokens = list(dict.fromkeys(self.tokenize(query)))
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            matches = [self._match_token(query_token) for query_token in query_tokens]
+            if not all(matches):
+                return []
+
+            # Collect candidates from the most selective query token, then
+            # score the other tokens against each candidate's own tokens
+            matches.sort(key=lambda m: sum(len(self._postings[token]) for token in m))
+            scores = {}
+            for token, score in matches[0].items():
+                for key, weight in self._postings[token].items():
+                    scores[key] = max(scores.get(key, 0), score * weight)
+            for token_matches in matches[1:]:
+                next_scores = {}
+                for key, total in scores.items():
+                    best = max(
+                        (token_matches[token] * weight for token, weight in self._doc_tokens[key].items()
+                         if token in token_matches),
+                        default=0,
+                    )
+                    if best:
+                        next_scores[key] = total + best
+                scores = next_scores
+                if not scores:
+                    return []
+
+            labels = self._labels
+            order = lambda item: (-item[1], labels.get(item[0], ""), str(item[0]))
+            if limit is not None:
+                return heapq.nsmallest(limit, scores.items(), key=order)
+            return sorted(scores.items(), key=order)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """Get the keys of the documents matching a query, best first."""
+        return [key for key, _ in self.ranked(query, limit)]
+
+
+class CatalogSearch:
+    """Shared search indexes for the Configuration Management page.
+
+    Built from one query each when first needed and rebuilt once they are
+    TTL_SECONDS old, so edits made by other workers (or by bulk statements)
+    show up within that time. Edits made through this process's ORM are
+    applied sooner: the listeners below collect them as each session
+    flushes and apply them once its transaction commits, so rolled-back
+    edits never reach the index.
+
+    Indexes:
+        software   software_catalog_id over name, vendor and category (with the
+                   "Unknown"/"Uncategorized" placeholders the table shows)
+        assets     asset_id over asset_name
+    """
+
+    TTL_SECONDS = 300
+    SOFTWARE_WEIGHTS = {"name": 1.0, "vendor": 0.6, "category": 0.4}
+    ASSET_WEIGHTS = {"name": 1.0}
+
+    # Session.info key listing the index changes of the session's open transaction
+    PENDING_KEY = "catalog_search_pending"
+
+    _software: Optional[SearchIndex] = None
+    _software_loaded_at = 0.0
+    _software_vendors: Dict[int, Optional[int]] = {}  # software_catalog_id -> sw_vendor
+    _assets: Optional[SearchIndex] = None
+    _assets_loaded_at = 0.0
+    _asset_names: Dict[int, str] = {}  # asset_id -> asset_name
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _software_fields(sw_name: str, vendor: Optional[str], category: Optional[str]) -> Dict[str, str]:
+        """Indexed fields of a catalog entry, as the table displays them."""
+        return {"name": sw_name, "vendor": vendor or "Unknown", "category": category or "Uncategorized"}
+
+    @staticmethod
+    def _expired(loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at >= CatalogSearch.TTL_SECONDS
+
+    @staticmethod
+    def software_index(session: Session) -> SearchIndex:
+        """Get the software index, building it with one query if missing or expired."""
+        with CatalogSearch._lock:
+            if CatalogSearch._software is None or CatalogSearch._expired(CatalogSearch._software_loaded_at):
+                index = SearchIndex(CatalogSearch.SOFTWARE_WEIGHTS)
+                vendors = {}
+                rows = session.exec(
+                    select(
+                        SoftwareCatalog.software_catalog_id, SoftwareCatalog.sw_name, SoftwareCatalog.sw_vendor,
+                        SWManufacturer.swmanu_name, SoftwareCatalog.sw_category,
+                    ).outerjoin(SWManufacturer, SoftwareCatalog.sw_vendor == SWManufacturer.swmanu_id)
+                ).all()
+                for software_id, name, vendor_id, vendor, category in rows:
+                    index.add(software_id, CatalogSearch._software_fields(name, vendor, category))
+                    vendors[software_id] = vendor_id
+                CatalogSearch._software_vendors = vendors
+                CatalogSearch._software = index
+                CatalogSearch._software_loaded_at = time.monotonic()
+            return CatalogSearch._software
+
+    @staticmethod
+    def asset_index(session: Session) -> SearchIndex:
+        """Get the asset index, building it with one query if missing or expired."""
+        with CatalogSearch._lock:
+            if CatalogSearch._assets is None or CatalogSearch._expired(CatalogSearch._assets_loaded_at):
+                index = SearchIndex(CatalogSearch.ASSET_WEIGHTS)
+                names = dict(session.exec(select(Asset.asset_id, Asset.asset_name)).all())
+                for asset_id, name in names.items():
+                    index.add(asset_id, {"name": name})
+                CatalogSearch._asset_names = names
+                CatalogSearch._assets = index
+                CatalogSearch._assets_loaded_at = time.monotonic()
+            return CatalogSearch._assets
+
+    @staticmethod
+    def software_ids(session: Session, query: str) -> List[int]:
+        """Get the catalog ids matching a search, best first."""
+        return CatalogSearch.software_index(session).search(query)
+
+    @staticmethod
+    def asset_names(session: Session, query: str) -> List[str]:
+        """Get the names of the assets matching a search, best first."""
+        asset_ids = CatalogSearch.asset_index(session).search(query)
+        names = CatalogSearch._asset_names
+        return list(dict.fromkeys(names[asset_id] for asset_id in asset_ids if asset_id in names))
+
+    @staticmethod
+    def apply(changes: List[tuple]):
+        """Apply committed changes to whichever indexes are loaded.
+
+        Changes are tuples:
+            ("software", software_catalog_id, fields or None to remove, sw_vendor)
+            ("asset", asset_id, asset_name or None to remove)
+        """
+        with CatalogSearch._lock:
+            software, assets = CatalogSearch._software, CatalogSearch._assets
+            for change in changes:
+                if change[0] == "software" and software is not None:
+                    _, software_id, fields, vendor_id = change
+                    if fields is None:
+                        software.remove(software_id)
+                        CatalogSearch._software_vendors.pop(software_id, None)
+                    else:
+                        software.add(software_id, fields)
+                        CatalogSearch._software_vendors[software_id] = vendor_id
+                elif change[0] == "asset" and assets is not None:
+                    _, asset_id, name = change
+                    if name is None:
+                        assets.remove(asset_id)
+                        CatalogSearch._asset_names.pop(asset_id, None)
+                    else:
+                        assets.add(asset_id, {"name": name})
+                        CatalogSearch._asset_names[asset_id] = name
+
+    @staticmethod
+    def invalidate():
+        """Drop both indexes so they are rebuilt on next use."""
+        with CatalogSearch._lock:
+            CatalogSearch._software = None
+            CatalogSearch._assets = None
+
+
+def _changed(target, fields: Iterable[str]) -> bool:
+    """Whether any of an instance's fields changed in this flush."""
+    attrs = inspect(target).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+def _defer(target, change: tuple):
+    """Queue an index change until the flushing session commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CatalogSearch.PENDING_KEY, []).append(change)
+
+
+def _software_change(connection, target) -> tuple:
+    """Build the index change for a saved catalog entry, looking up its vendor name."""
+    vendor = None
+    if target.sw_vendor is not None:
+        vendor = connection.execute(
+            select(SWManufacturer.swmanu_name).where(SWManufacturer.swmanu_id == target.sw_vendor)
+        ).scalar()
+    fields = CatalogSearch._software_fields(target.sw_name, vendor, target.sw_category)
+    return ("software", target.software_catalog_id, fields, target.sw_vendor)
+
+
+@event.listens_for(SoftwareCatalog, "after_insert")
+def _on_software_added(mapper, connection, target):
+    """Index a new catalog entry."""
+    if CatalogSearch._software is not None:
+        _defer(target, _software_change(connection, target))
+
+
+@event.listens_for(SoftwareCatalog, "after_update")
+def _on_software_updated(mapper, connection, target):
+    """Re-index a catalog entry whose name, vendor or category changed."""
+    if CatalogSearch._software is not None and _changed(target, ("sw_name", "sw_vendor", "sw_category")):
+        _defer(target, _software_change(connection, target))
+
+
+@event.listens_for(SoftwareCatalog, "after_delete")
+def _on_software_deleted(mapper, connection, target):
+    """Drop a deleted catalog entry from the index."""
+    _defer(target, ("software", target.software_catalog_id, None, None))
+
+
+@event.listens_for(SWManufacturer, "after_update")
+def _on_vendor_renamed(mapper, connection, target):
+    """Re-index the catalog entries of a renamed vendor."""
+    if CatalogSearch._software is None or not _changed(target, ("swmanu_name",)):
+        return
+    if target.swmanu_id not in CatalogSearch._software_vendors.values():
+        return
+    rows = connection.execute(
+        select(SoftwareCatalog.software_catalog_id, SoftwareCatalog.sw_name, SoftwareCatalog.sw_category)
+        .where(SoftwareCatalog.sw_vendor == target.swmanu_id)
+    ).all()
+    for software_id, name, category in rows:
+        fields = CatalogSearch._software_fields(name, target.swmanu_name, category)
+        _defer(target, ("software", software_id, fields, target.swmanu_id))
+
+
+@event.listens_for(Asset, "after_insert")
+def _on_asset_added(mapper, connection, target):
+    """Index a new asset."""
+    _defer(target, ("asset", target.asset_id, target.asset_name))
+
+
+@event.listens_for(Asset, "after_update")
+def _on_asset_updated(mapper, connection, target):
+    """Re-index a renamed asset."""
+    if _changed(target, ("asset_name",)):
+        _defer(target, ("asset", target.asset_id, target.asset_name))
+
+
+@event.listens_for(Asset, "after_delete")
+def _on_asset_deleted(mapper, connection, target):
+    """Drop a deleted asset from the index."""
+    _defer(target, ("asset", target.asset_id, None))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_committed(session):
+    """Apply the changes of a committed transaction."""
+    changes = session.info.pop(CatalogSearch.PENDING_KEY, None)
+    if changes:
+        CatalogSearch.apply(changes)
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    """Forget the changes of a transaction that ended without committing."""
+    if transaction.parent is None:
+        session.info.pop(CatalogSearch.PENDING_KEY, None)
@@ -0,0 +1,202 @@
+"""Software catalog loading service for the Configuration Management page."""
+from typing import List, Dict, Any, Iterable, Optional
+from sqlmodel import Session, select, func, or_
+from sqlalchemy import exists, literal, literal_column, null
+from ..models.software_catalog import SoftwareCatalog
+from ..models.sw_manufacturer import SWManufacturer
+from ..models.asset_software import AssetSoftware
+from ..models.asset import Asset
+from .search_index import SearchIndex
+
+
+class SoftwareCatalogLoader:
+    """Service for filtering, sorting and paging the software table in SQL.
+
+    A scope picks the rows: the whole catalog, the software installed on a
+    project's assets, or the software installed on one asset. Every row
+    carries the vendor name and an install count, so filters and sorting on
+    any table column become WHERE and ORDER BY clauses.
+    """
+
+    # Table column -> SQL expression used for ORDER BY
+    SORT_COLUMNS = {
+        "name": SoftwareCatalog.sw_name,
+        "vendor": SWManufacturer.swmanu_name,
+        "category": SoftwareCatalog.sw_category,
+        "latest_version": SoftwareCatalog.latest_version,
+        "architecture": SoftwareCatalog.sw_architecture_compatibility,
+        "compliance_status": SoftwareCatalog.compliance_status,
+        "installations": literal_column("install_count"),
+    }
+
+    # Largest search result filtered by id; broader searches fall back to LIKE
+    # so a short typeahead query does not send the whole catalog as IN (...)
+    MAX_SEARCH_IDS = 500
+
+    # Compliance filter options matched against compliance_status
+    COMPLIANCE_STATUSES = (
+        "Change Request Submitted",
+        "CMB Approved",
+        "Change Board Denied",
+        "POAM Available",
+        "POTENTIAL HAZARD",
+    )
+
+    @staticmethod
+    def build_query(project_id: Optional[int] = None, asset_id: Optional[int] = None, columns: tuple = ()):
+        """Build the software table query for a scope.
+
+        Rows are (catalog entry, vendor name, installed version, install count).
+        Install counts come from correlated subqueries rather than a GROUP BY
+        over every catalog column, so the same query can be filtered, sorted,
+        counted and paged.
+
+        Args:
+            project_id: Only software installed on this project's assets
+            asset_id: Only software installed on this asset (takes precedence)
+            columns: Columns to select instead of the table row (e.g. for option lists)
+        """
+        if asset_id is not None:
+            row = (AssetSoftware.installed_version, literal(1).label("install_count"))
+        elif project_id is not None:
+            row = (null().label("installed_version"), (
+                select(func.count(func.distinct(AssetSoftware.asset_id)))
+                .join(Asset, AssetSoftware.asset_id == Asset.asset_id)
+                .where(AssetSoftware.software_catalog_id == SoftwareCatalog.software_catalog_id)
+                .where(Asset.project_id == project_id)
+                .scalar_subquery()
+                .label("install_count")
+            ))
+        else:
+            row = (null().label("installed_version"), (
+                select(func.count(AssetSoftware.asset_id))
+                .where(AssetSoftware.software_catalog_id == SoftwareCatalog.software_catalog_id)
+                .scalar_subquery()
+                .label("install_count")
+            ))
+
+        query = (
+            select(*(columns or (SoftwareCatalog, SWManufacturer.swmanu_name) + row))
+            .select_from(SoftwareCatalog)
+            .outerjoin(SWManufacturer, SoftwareCatalog.sw_vendor == SWManufacturer.swmanu_id)
+        )
+        if asset_id is not None:
+            query = query.join(
+                AssetSoftware, SoftwareCatalog.software_catalog_id == AssetSoftware.software_catalog_id
+            ).where(AssetSoftware.asset_id == asset_id)
+        elif project_id is not None:
+            query = query.where(exists(
+                select(AssetSoftware.asset_software_id)
+                .join(Asset, AssetSoftware.asset_id == Asset.asset_id)
+                .where(AssetSoftware.software_catalog_id == SoftwareCatalog.software_catalog_id)
+                .where(Asset.project_id == project_id)
+            ))
+        return query
+
+    @staticmethod
+    def apply_filters(
+        query,
+        software_ids: Optional[Iterable[int]] = None,
+        search: str = "",
+        category: Optional[str] = None,
+        compliance: Optional[str] = None,
+        vendor: Optional[str] = None
+    ):
+        """Restrict a software query to the search box and dropdown filters.
+
+        Args:
+            software_ids: Catalog ids matching the search box (see CatalogSearch);
+                at most MAX_SEARCH_IDS, or None when not searching by id
+            search: Search text to match in SQL instead, for searches that match
+                too many ids: every word must appear (case-insensitive) in the
+                name, vendor or category, including the "Unknown"/"Uncategorized"
+                placeholders shown for empty values
+        """
+        if software_ids is not None:
+            query = query.where(SoftwareCatalog.software_catalog_id.in_(list(software_ids)))
+
+        for word in SearchIndex.tokenize(search):
+            conditions = [
+                func.lower(SoftwareCatalog.sw_name).contains(word, autoescape=True),
+                func.lower(SWManufacturer.swmanu_name).contains(word, autoescape=True),
+                func.lower(SoftwareCatalog.sw_category).contains(word, autoescape=True),
+            ]
+            if word in "unknown":
+                conditions.append(SWManufacturer.swmanu_name.is_(None))
+            if word in "uncategorized":
+                conditions.append(SoftwareCatalog.sw_category.is_(None))
+            query = query.where(or_(*conditions))
+
+        if category:
+            query = query.where(SoftwareCatalog.sw_category == category)
+        if vendor:
+            query = query.where(SWManufacturer.swmanu_name == vendor)
+
+        if compliance == "DoD Compliant":
+            query = query.where(SoftwareCatalog.dod_compliant == True)
+        elif compliance == "Non-Compliant":
+            query = query.where(SoftwareCatalog.dod_compliant == False)
+        elif compliance == "Army Gold Master":
+            query = query.where(SoftwareCatalog.army_gold_master == True)
+        elif compliance in SoftwareCatalogLoader.COMPLIANCE_STATUSES:
+            query = query.where(SoftwareCatalog.compliance_status == compliance)
+        return query
+
+    @staticmethod
+    def apply_sorting(query, sort_column: str, ascending: bool = True):
+        """Order a software query by a table column.
+
+        software_catalog_id is always added as a tie-breaker so OFFSET/FETCH pages are stable.
+        """
+        order_col = SoftwareCatalogLoader.SORT_COLUMNS.get(sort_column, SoftwareCatalog.sw_name)
+        return query.order_by(
+            order_col if ascending else order_col.desc(),
+            SoftwareCatalog.software_catalog_id,
+        )
+
+    @staticmethod
+    def format_row(
+        sw: SoftwareCatalog,
+        vendor: Optional[str],
+        installed_version: Optional[str],
+        install_count: Optional[int]
+    ) -> Dict[str, Any]:
+        """Format one software row for the table."""
+        return {
+            "name": sw.sw_name,
+            "vendor": vendor or "Unknown",
+            "category": sw.sw_category or "Uncategorized",
+            "latest_version": installed_version or sw.latest_version or "Unknown",
+            "architecture": sw.sw_architecture_compatibility or "Any",
+            "dod_compliant": sw.dod_compliant,
+            "compliance_status": sw.compliance_status,
+            "army_gold_master": sw.army_gold_master,
+            "installations": install_count or 0,
+        }
+
+    @staticmethod
+    def load_rows(session: Session, query) -> List[Dict[str, Any]]:
+        """Load and format every row of a software query."""
+        return [SoftwareCatalogLoader.format_row(*row) for row in session.exec(query).all()]
+
+    @staticmethod
+    def load_page(session: Session, query, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """Load one page of a sorted software query (rendered as OFFSET/FETCH on MSSQL)."""
+        offset = (max(1, page) - 1) * page_size
+        return SoftwareCatalogLoader.load_rows(session, query.offset(offset).limit(page_size))
+
+    @staticmethod
+    def options(session: Session, column: str, project_id: Optional[int] = None, asset_id: Optional[int] = None) -> List[str]:
+        """Get the distinct categories or vendors in a scope, for the filter dropdowns.
+
+        Args:
+            column: "category" or "vendor"
+        """
+        name_col = SoftwareCatalog.sw_category if column == "category" else SWManufacturer.swmanu_name
+        query = (
+            SoftwareCatalogLoader.build_query(project_id, asset_id, columns=(name_col,))
+            .where(name_col.is_not(None))
+            .distinct()
+            .order_by(name_col)
+        )
+        return [name for name in session.exec(query).all() if name]
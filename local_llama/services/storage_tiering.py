@@ -0,0 +1,266 @@
+"""Storage tier policy: where file blobs live, and moving them as usage changes.
+
+New uploads are placed by initial_location(). The background job (run())
+then promotes small, frequently downloaded blobs into the database and
+demotes large or cold database blobs to the filesystem, using download
+counts and the read latency measured per tier by the download route. The
+policy is configured through environment variables:
+
+    STORAGE_TIER_INITIAL_DB_MAX_BYTES  largest new text upload kept in the database (default 1MB)
+    STORAGE_TIER_DB_MAX_BYTES          largest blob ever kept in the database (default 10MB)
+    STORAGE_TIER_HOT_MAX_BYTES         largest blob promoted into the database (default 1MB)
+    STORAGE_TIER_HOT_MIN_DOWNLOADS     recent downloads that make a blob hot (default 5)
+    STORAGE_TIER_COLD_MIN_BYTES        smallest database blob demoted when cold (default 256KB)
+    STORAGE_TIER_COLD_AFTER_DAYS       days without a download before a blob is cold (default 30)
+    STORAGE_TIER_MIN_LATENCY_SAMPLES   reads per tier before latency is trusted (default 20)
+    STORAGE_TIER_UNLINK_GRACE_SECONDS  seconds a promoted blob's file is kept for running downloads (default 300)
+    STORAGE_TIER_INTERVAL_SECONDS      seconds between background runs (default 3600)
+"""
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import Session, select, func
+from ..database.engine import get_engine
+from ..models.file_storage import FileBlob, FileMetadata, FileType, StorageLocation
+from .blob_store import BlobStore
+
+
+class StorageTiering:
+    """Storage tier policy engine for file blobs.
+
+    Frequency is FileMetadata.recent_downloads, which every run halves, so
+    it tracks recent use rather than lifetime totals. Each migration is
+    recorded on every FileMetadata row sharing the blob. A promoted blob's
+    file is only removed by the first run after the unlink grace period
+    (going by storage_migrated_at), so downloads that resolved the old path
+    can finish streaming it and a restart cannot strand the file.
+    """
+
+    LATENCY_SMOOTHING = 0.2  # Weight of the newest sample in the moving average
+
+    _latency: Dict[StorageLocation, Tuple[float, int]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def policy() -> Dict[str, int]:
+        """Get the current tiering policy from the environment."""
+        return {
+            "initial_db_max_bytes": int(os.getenv("STORAGE_TIER_INITIAL_DB_MAX_BYTES", str(1024 * 1024))),
+            "db_max_bytes": int(os.getenv("STORAGE_TIER_DB_MAX_BYTES", str(10 * 1024 * 1024))),
+            "hot_max_bytes": int(os.getenv("STORAGE_TIER_HOT_MAX_BYTES", str(1024 * 1024))),
+            "hot_min_downloads": int(os.getenv("STORAGE_TIER_HOT_MIN_DOWNLOADS", "5")),
+            "cold_min_bytes": int(os.getenv("STORAGE_TIER_COLD_MIN_BYTES", str(256 * 1024))),
+            "cold_after_days": int(os.getenv("STORAGE_TIER_COLD_AFTER_DAYS", "30")),
+            "min_latency_samples": int(os.getenv("STORAGE_TIER_MIN_LATENCY_SAMPLES", "20")),
+            "unlink_grace_seconds": int(os.getenv("STORAGE_TIER_UNLINK_GRACE_SECONDS", "300")),
+            "interval_seconds": int(os.getenv("STORAGE_TIER_INTERVAL_SECONDS", "3600")),
+        }
+
+    @staticmethod
+    def initial_location(file_size: int, file_type: FileType) -> StorageLocation:
+        """Choose the tier for a new upload: small text in the database, everything else on disk."""
+        policy = StorageTiering.policy()
+        if file_size <= policy["initial_db_max_bytes"] and file_type in [FileType.MARKDOWN, FileType.TEXT]:
+            return StorageLocation.DATABASE
+        return StorageLocation.FILESYSTEM
+
+    @staticmethod
+    def record_read(storage_location: StorageLocation, seconds: float):
+        """Add a measured time-to-first-chunk for a tier to its moving average."""
+        with StorageTiering._lock:
+            average, samples = StorageTiering._latency.get(storage_location, (seconds, 0))
+            average += StorageTiering.LATENCY_SMOOTHING * (seconds - average)
+            StorageTiering._latency[storage_location] = (average, samples + 1)
+
+    @staticmethod
+    def read_latency() -> Dict[str, Tuple[float, int]]:
+        """Get the measured read latency per tier as {tier: (average seconds, samples)}."""
+        with StorageTiering._lock:
+            return {location.value: value for location, value in StorageTiering._latency.items()}
+
+    @staticmethod
+    def _database_is_faster(policy: Dict[str, int]) -> bool:
+        """Whether promoting to the database helps, going by measured latency.
+
+        Nothing is promoted until both tiers have enough samples to compare.
+        """
+        database = StorageTiering._latency.get(StorageLocation.DATABASE)
+        filesystem = StorageTiering._latency.get(StorageLocation.FILESYSTEM)
+        minimum = policy["min_latency_samples"]
+        if not database or not filesystem or database[1] < minimum or filesystem[1] < minimum:
+            return False
+        return database[0] <= filesystem[0]
+
+    @staticmethod
+    def record_download(session: Session, file_id: int):
+        """Count a download of a file for the tier policy (does not commit)."""
+        session.exec(
+            update(FileMetadata)
+            .where(FileMetadata.file_id == file_id)
+            .values(
+                download_count=FileMetadata.download_count + 1,
+                recent_downloads=FileMetadata.recent_downloads + 1,
+                last_accessed=datetime.now(),
+            )
+        )
+
+    @staticmethod
+    def plan(session: Session, now: Optional[datetime] = None) -> List[Tuple[int, StorageLocation, str]]:
+        """Work out which blobs should change tier.
+
+        Returns:
+            List of (blob_id, target tier, reason)
+        """
+        now = now or datetime.now()
+        policy = StorageTiering.policy()
+        cold_before = now - timedelta(days=policy["cold_after_days"])
+        promote = StorageTiering._database_is_faster(policy)
+
+        # One row per blob with its usage summed over every file sharing it
+        usage = session.exec(
+            select(
+                FileBlob.blob_id,
+                FileBlob.storage_location,
+                FileBlob.file_size,
+                func.sum(FileMetadata.recent_downloads),
+                func.max(func.coalesce(FileMetadata.last_accessed, FileMetadata.uploaded_at)),
+            )
+            .join(FileMetadata, FileMetadata.blob_id == FileBlob.blob_id)
+            .group_by(FileBlob.blob_id, FileBlob.storage_location, FileBlob.file_size)
+        ).all()
+
+        moves = []
+        for blob_id, location, file_size, recent_downloads, last_used in usage:
+            if location == StorageLocation.DATABASE:
+                if file_size > policy["db_max_bytes"]:
+                    moves.append((blob_id, StorageLocation.FILESYSTEM, "over the database size limit"))
+                elif file_size >= policy["cold_min_bytes"] and last_used < cold_before:
+                    moves.append((blob_id, StorageLocation.FILESYSTEM,
+                                  f"cold: no downloads in {policy['cold_after_days']} days"))
+            elif (
+                promote
+                and file_size <= policy["hot_max_bytes"]
+                and (recent_downloads or 0) >= policy["hot_min_downloads"]
+            ):
+                moves.append((blob_id, StorageLocation.DATABASE, f"hot: {recent_downloads} recent downloads"))
+        return moves
+
+    @staticmethod
+    def migrate(session: Session, blob_id: int, target: StorageLocation, reason: str):
+        """Move one blob to another tier and record it on its files (does not commit).
+
+        A promoted blob's file is left in place for remove_promoted_files().
+        """
+        blob = BlobStore.get_blob(session, blob_id)
+        if not blob or blob.storage_location == target:
+            return
+
+        if target == StorageLocation.DATABASE:
+            blob.content = BlobStore.read_blob(session, blob)
+            blob.blob_path = None
+        else:
+            blob.blob_path = BlobStore.blob_path(blob.checksum)
+            BlobStore.write_blob_file(session, blob)
+            blob.content = None
+        blob.storage_location = target
+        session.add(blob)
+
+        session.exec(
+            update(FileMetadata)
+            .where(FileMetadata.blob_id == blob_id)
+            .values(
+                storage_location=target,
+                file_path=blob.blob_path,
+                storage_migrated_at=datetime.now(),
+                storage_migration_reason=reason[:255],
+            )
+        )
+
+    @staticmethod
+    def run(session: Session, now: Optional[datetime] = None, dry_run: bool = False) -> List[Tuple[int, StorageLocation, str]]:
+        """Apply the policy: migrate each planned blob, then decay recent download counts.
+
+        Every blob is committed separately, so one failure does not undo the rest.
+        Files of blobs promoted more than the grace period ago are removed.
+
+        Returns:
+            The migrations applied (or planned, with dry_run)
+        """
+        moves = StorageTiering.plan(session, now)
+        if dry_run:
+            return moves
+
+        applied = []
+        for blob_id, target, reason in moves:
+            try:
+                StorageTiering.migrate(session, blob_id, target, reason)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Error moving blob {blob_id} to {target.value}: {e}")
+                continue
+            applied.append((blob_id, target, reason))
+        StorageTiering.remove_promoted_files(session)
+
+        # Halve recent counts so frequency reflects the last few runs
+        session.exec(
+            update(FileMetadata)
+            .where(FileMetadata.recent_downloads > 0)
+            .values(recent_downloads=FileMetadata.recent_downloads // 2)
+        )
+        session.commit()
+        return applied
+
+    @staticmethod
+    def remove_promoted_files(session: Session) -> int:
+        """Delete the leftover files of database blobs promoted more than the grace period ago.
+
+        Going by storage_migrated_at rather than an in-memory queue, so files
+        left behind by a restart or another process are removed too.
+        BlobStore.remove_file keeps any file stored again since.
+
+        Returns:
+            Number of files removed
+        """
+        grace = StorageTiering.policy()["unlink_grace_seconds"]
+        promoted_before = datetime.now() - timedelta(seconds=grace)
+        checksums = session.exec(
+            select(FileBlob.checksum)
+            .join(FileMetadata, FileMetadata.blob_id == FileBlob.blob_id)
+            .where(FileBlob.storage_location == StorageLocation.DATABASE)
+            .group_by(FileBlob.checksum)
+            .having(func.max(FileMetadata.storage_migrated_at) <= promoted_before)
+        ).all()
+
+        removed = 0
+        for checksum in checksums:
+            path = BlobStore.blob_path(checksum)
+            if not os.path.exists(path):
+                continue
+            BlobStore.remove_file(session.get_bind(), path)
+            if not os.path.exists(path):
+                removed += 1
+        return removed
+
+    @staticmethod
+    async def background_job():
+        """Run the policy every STORAGE_TIER_INTERVAL_SECONDS (registered as an app lifespan task)."""
+        while True:
+            await asyncio.sleep(StorageTiering.policy()["interval_seconds"])
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                continue
+
+            def run_once():
+                with Session(get_engine(database_url)) as session:
+                    return StorageTiering.run(session)
+
+            try:
+                applied = await asyncio.to_thread(run_once)
+                if applied:
+                    print(f"[storage_tiering] Moved {len(applied)} blobs between storage tiers")
+            except Exception as e:
+                print(f"[storage_tiering] Error: {e}")
@@ -0,0 +1,67 @@
+"""Unresolved failure detection for the collection tables."""
+from typing import Iterable, Optional, Set
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select, and_, exists
+from ..models.log_collection import LogCollection
+from ..models.dat_update import DatUpdate
+from ..models.image_collection import ImageCollection
+
+
+class UnresolvedFailures:
+    """Finds "Failed" records not followed by a "Success" for the same asset.
+
+    One NOT EXISTS correlated subquery replaces the per-failure "was there
+    a success after this?" lookups, so the cost is a single statement no
+    matter how much failure history a table holds.
+    """
+
+    # Table key -> (model, id column, date column, result column)
+    TABLES = {
+        "log": (LogCollection, "logcollection_id", "logcollection_date", "logcollection_result"),
+        "dat": (DatUpdate, "datupdate_id", "date_of_update", "update_result"),
+        "image": (ImageCollection, "imgcollection_id", "imgcollection_date", "imaging_result"),
+    }
+
+    @staticmethod
+    def build_query(table: str, record_ids: Optional[Iterable[int]] = None):
+        """Build the query selecting unresolved failure ids.
+
+        Args:
+            table: Table key (see TABLES)
+            record_ids: Optional ids to restrict the check to (e.g. the current page)
+        """
+        model, id_field, date_field, result_field = UnresolvedFailures.TABLES[table]
+        later = aliased(model)
+
+        success_after = exists().where(and_(
+            later.asset_id == model.asset_id,
+            getattr(later, result_field) == "Success",
+            getattr(later, date_field) > getattr(model, date_field),
+        ))
+
+        query = (
+            select(getattr(model, id_field))
+            .where(getattr(model, result_field) == "Failed")
+            .where(~success_after)
+        )
+        if record_ids is not None:
+            query = query.where(getattr(model, id_field).in_(list(record_ids)))
+        return query
+
+    @staticmethod
+    def get_ids(session: Session, table: str, record_ids: Optional[Iterable[int]] = None) -> Set[int]:
+        """Get the ids of failed records with no later success for their asset.
+
+        Args:
+            session: Open database session
+            table: Table key (see TABLES)
+            record_ids: Optional ids to restrict the check to (e.g. the current page)
+
+        Returns:
+            Set of unresolved failure ids
+        """
+        if record_ids is not None:
+            record_ids = list(record_ids)
+            if not record_ids:
+                return set()
+        return set(session.exec(UnresolvedFailures.build_query(table, record_ids)).all())
@@ -0,0 +1,158 @@
+"""Chunked upload spooling to temporary files."""
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+
+class UploadSpool:
+    """Streams uploads to temporary files in fixed-size chunks.
+
+    The SHA-256 checksum is computed while each chunk is written, so memory
+    per upload is bounded by CHUNK_SIZE instead of the file size and the
+    content is never held in Reflex state.
+    """
+
+    CHUNK_SIZE = 1024 * 1024  # 1MB
+    TEMP_DIR = os.path.join("./uploads", ".incoming")
+
+    @staticmethod
+    def _temp_file():
+        """Open a new temporary file in TEMP_DIR (same filesystem as the uploads)."""
+        os.makedirs(UploadSpool.TEMP_DIR, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=UploadSpool.TEMP_DIR, suffix=".part", delete=False)
+
+    @staticmethod
+    def expected_size(upload: Any) -> Optional[int]:
+        """Get an upload's size before reading it, when known (UploadFile.size, bytes length)."""
+        if isinstance(upload, dict):
+            upload = upload.get("content", b"")
+        if isinstance(upload, (bytes, bytearray, memoryview)):
+            return len(upload)
+        return getattr(upload, "size", None)
+
+    @staticmethod
+    async def stream(upload: Any, chunk_size: Optional[int] = None) -> AsyncIterator[Tuple[str, int, Optional[str]]]:
+        """Write an upload to a temporary file chunk by chunk, reporting progress.
+
+        Yields (temp file path, bytes written so far, None) after every chunk,
+        then (temp file path, size in bytes, SHA-256 checksum) once complete.
+        The temp file is removed if reading or writing fails.
+
+        Args:
+            upload: Reflex UploadFile (or anything with an async/sync read(size)),
+                raw bytes, or a {'content': bytes} dict
+            chunk_size: Bytes per read; defaults to CHUNK_SIZE
+        """
+        chunk_size = chunk_size or UploadSpool.CHUNK_SIZE
+        if isinstance(upload, dict):
+            upload = upload.get("content", b"")
+
+        digest = hashlib.sha256()
+        size = 0
+        temp = UploadSpool._temp_file()
+        try:
+            with temp:
+                if isinstance(upload, (bytes, bytearray, memoryview)):
+                    view = memoryview(upload)
+                    for start in range(0, len(view), chunk_size):
+                        chunk = view[start:start + chunk_size]
+                        digest.update(chunk)
+                        temp.write(chunk)
+                        size += len(chunk)
+                        yield temp.name, size, None
+                else:
+                    while True:
+                        chunk = upload.read(chunk_size)
+                        if hasattr(chunk, "__await__"):
+                            chunk = await chunk
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        temp.write(chunk)
+                        size += len(chunk)
+                        yield temp.name, size, None
+        except BaseException:
+            # Includes the consumer abandoning the stream (GeneratorExit)
+            UploadSpool.discard(temp.name)
+            raise
+
+        yield temp.name, size, digest.hexdigest()
+
+    @staticmethod
+    async def spool(upload: Any, chunk_size: Optional[int] = None) -> Tuple[str, int, str]:
+        """Write an upload to a temporary file chunk by chunk.
+
+        Returns:
+            (temp file path, size in bytes, SHA-256 checksum)
+        """
+        async for path, size, checksum in UploadSpool.stream(upload, chunk_size):
+            pass
+        return path, size, checksum
+
+    @staticmethod
+    def spool_file(
+        source: Any,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Tuple[str, int, str]:
+        """Synchronous spool() for worker threads.
+
+        hashlib releases the GIL while hashing large chunks, so several
+        uploads can be hashed and written in parallel threads.
+
+        Args:
+            source: A sync file object (e.g. UploadFile.file) or raw bytes
+            chunk_size: Bytes per read; defaults to CHUNK_SIZE
+            progress: Called with the bytes written so far after every chunk
+
+        Returns:
+            (temp file path, size in bytes, SHA-256 checksum)
+        """
+        chunk_size = chunk_size or UploadSpool.CHUNK_SIZE
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            chunks = (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+        else:
+            chunks = iter(lambda: source.read(chunk_size), b"")
+
+        digest = hashlib.sha256()
+        size = 0
+        temp = UploadSpool._temp_file()
+        try:
+            with temp:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+                    if progress:
+                        progress(size)
+        except BaseException:
+            UploadSpool.discard(temp.name)
+            raise
+        return temp.name, size, digest.hexdigest()
+
+    @staticmethod
+    def read_bytes(path: str) -> bytes:
+        """Read a spooled file into memory (only for uploads small enough for the database)."""
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def move_to(path: str, destination: str):
+        """Move a spooled file to its final location (a rename on the same filesystem)."""
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        shutil.move(path, destination)
+
+    @staticmethod
+    def discard(path: Optional[str]):
+        """Delete a spooled file if it still exists."""
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing temporary upload {path}: {e}")
@@ -0,0 +1,54 @@
+"""Resolve a signed-in email to the app's user records."""
+from typing import Optional, Tuple
+from sqlmodel import Session, select
+from ..models.app_user import AppUser
+from ..models.employee import Employee
+
+
+class UserIdentity:
+    """Looks up who a Clerk email belongs to.
+
+    AuthState caches the result for the browser session, so other states
+    read the ids from it rather than querying AppUser or Employee per event.
+    """
+
+    # Department 2 is Cybersecurity; managers outside it are listed by email
+    CYBERSECURITY_DEPARTMENT_ID = 2
+    CYBERSECURITY_MANAGERS = ("robert.shipp.2.civ@army.mil",)
+
+    @staticmethod
+    def is_cybersecurity_team(email: str, department_id: Optional[int]) -> bool:
+        """Whether a user belongs to the cybersecurity team."""
+        return department_id == UserIdentity.CYBERSECURITY_DEPARTMENT_ID or email in UserIdentity.CYBERSECURITY_MANAGERS
+
+    @staticmethod
+    def lookup(session: Session, email: str) -> Optional[Tuple[Optional[int], Optional[int], Optional[int], str]]:
+        """Find the AppUser and Employee records for an email.
+
+        Employees are matched by their own email, or through an AppUser
+        account with that email.
+
+        Returns:
+            (AppUser id, Employee id, department id, display name), or None if
+            neither record exists
+        """
+        row = session.exec(
+            select(Employee, AppUser)
+            .outerjoin(AppUser, AppUser.employee_id == Employee.id)
+            .where(Employee.email == email)
+        ).first()
+        if row:
+            employee, app_user = row
+        else:
+            app_user = session.exec(select(AppUser).where(AppUser.email == email)).first()
+            if not app_user:
+                return None
+            employee = session.get(Employee, app_user.employee_id) if app_user.employee_id else None
+
+        person = employee or app_user
+        return (
+            app_user.id if app_user else None,
+            employee.id if employee else None,
+            person.department_id,
+            f"{person.first_name} {person.last_name}",
+        )
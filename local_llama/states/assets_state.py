@@ -1,7 +1,7 @@
 """State management for Assets page."""
 import reflex as rx
 from sqlmodel import select, func, or_, and_
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import os
 from ..models.asset import Asset
@@ -13,7 +13,12 @@ from ..models.sys_type import SysType
 from ..models.operating_system import OperatingSystem
 from ..models.hardware_manufacturer import HardwareManufacturer
 from ..models.employee import Employee
+from ..database.engine import get_engine
+from ..services.asset_loader import AssetLoader
+from ..services.reference_cache import ReferenceDataCache
+from ..services.activity_tracker import ActivityTracker
 from ..utils.export_utils import export_to_csv, export_to_json, export_to_excel, export_to_print
+from .auth_state import get_identity
 
 
 class AssetsState(rx.State):
@@ -34,6 +39,11 @@ class AssetsState(rx.State):
     total_pages: int = 1
     total_count: int = 0
     
+    # Server-side mode: filtering, search, sorting and paging run in SQL and
+    # only the current page is held in state
+    server_side_paging: bool = True
+    _analytics_filter_key: str = ""
+    
     # Sorting
     sort_column: str = "asset_id"
     sort_direction: str = "asc"
@@ -130,6 +140,9 @@ class AssetsState(rx.State):
     @rx.var
     def paginated_assets(self) -> List[Dict[str, Any]]:
         """Get paginated subset of filtered assets."""
+        if self.server_side_paging:
+            # filtered_assets already holds just the current page
+            return self.filtered_assets
         start = (self.page - 1) * self.page_size
         end = start + self.page_size
         return self.filtered_assets[start:end]
@@ -147,234 +160,224 @@ class AssetsState(rx.State):
         """Get the number of items on the current page."""
         return len(self.paginated_assets)
     
+    @staticmethod
+    def _selected_filter_id(mapping: Dict[str, str], selection: str) -> Optional[int]:
+        """Resolve a filter dropdown selection to a database ID (None for "all")."""
+        value = mapping.get(selection)
+        if value and value != "all":
+            return int(value)
+        return None
+    
     async def load_assets_data(self):
-        """Load all assets data with relationships."""
+        """Load the filter and edit dropdowns, then the assets (on mount and after edits)."""
         self.is_loading = True
         yield
         
         try:
             with rx.session() as session:
-                # Load filter options - display strings with mappings
-                # Projects
-                self.projects = ["All Projects"]
-                self.edit_projects = []
-                self.project_map = {"All Projects": "all"}
-                projects = session.exec(select(Project).order_by(Project.project_name)).all()
-                for p in projects:
-                    self.projects.append(p.project_name)
-                    self.edit_projects.append(p.project_name)
-                    self.project_map[p.project_name] = str(p.project_id)
-                
-                # Buildings - for filter dropdown, only show buildings that are in use
-                self.buildings = ["All Buildings"]
-                self.edit_buildings = []
-                self.building_map = {"All Buildings": "all"}
-                
-                # Get distinct building IDs that are actually used by assets
-                used_building_ids = session.exec(
-                    select(Asset.building_id).distinct()
-                    .where(Asset.building_id.isnot(None))
-                ).all()
-                
-                # Get all buildings
-                all_buildings = session.exec(select(Building).order_by(Building.building_name)).all()
-                for b in all_buildings:
-                    # Add to edit dropdown (all buildings available)
-                    self.edit_buildings.append(b.building_name)
-                    self.building_map[b.building_name] = str(b.building_id)
-                    
-                    # Only add to filter dropdown if it's in use
-                    if b.building_id in used_building_ids:
-                        self.buildings.append(b.building_name)
-                
-                # System Types - for filter dropdown, only show system types that are in use
-                self.systypes = ["All System Types"]
-                self.edit_systypes = []
-                self.systype_map = {"All System Types": "all"}
-                
-                # Get distinct system type IDs that are actually used by assets
-                used_systype_ids = session.exec(
-                    select(Asset.systype_id).distinct()
-                    .where(Asset.systype_id.isnot(None))
-                ).all()
-                
-                # Get all system types
-                all_systypes = session.exec(select(SysType).order_by(SysType.systype_name)).all()
-                for s in all_systypes:
-                    # Add to edit dropdown (all system types available)
-                    self.edit_systypes.append(s.systype_name)
-                    self.systype_map[s.systype_name] = str(s.systype_id)
-                    
-                    # Only add to filter dropdown if it's in use
-                    if s.systype_id in used_systype_ids:
-                        self.systypes.append(s.systype_name)
-                
-                # Operating Systems - for filter dropdown, only show OS that are in use
-                self.operating_systems = ["All Operating Systems"]
-                self.edit_operating_systems = []
-                self.os_map = {"All Operating Systems": "all"}
-                
-                # Get distinct OS IDs that are actually used by assets
-                used_os_ids = session.exec(
-                    select(Asset.os_id).distinct()
-                    .where(Asset.os_id.isnot(None))
-                ).all()
-                
-                # Get all OS for edit dropdown
-                all_oses = session.exec(select(OperatingSystem).order_by(OperatingSystem.os_name)).all()
-                for os in all_oses:
-                    # Add to edit dropdown (all OS available)
-                    self.edit_operating_systems.append(os.os_name)
-                    self.os_map[os.os_name] = str(os.os_id)
-                    
-                    # Only add to filter dropdown if it's in use
-                    if os.os_id in used_os_ids:
-                        self.operating_systems.append(os.os_name)
-                
-                # Floors
-                self.floors = []
-                self.floor_map = {}
-                floors = session.exec(select(Floor).order_by(Floor.floor_name)).all()
-                for f in floors:
-                    self.floors.append(f.floor_name)
-                    self.floor_map[f.floor_name] = str(f.floor_id)
-                
-                # Build query with filters
-                query = select(Asset)
-                
-                # Apply filters using mappings
-                project_id = self.project_map.get(self.filter_project)
-                if project_id and project_id != "all":
-                    query = query.where(Asset.project_id == int(project_id))
-                
-                building_id = self.building_map.get(self.filter_building)
-                if building_id and building_id != "all":
-                    query = query.where(Asset.building_id == int(building_id))
-                
-                systype_id = self.systype_map.get(self.filter_systype)
-                if systype_id and systype_id != "all":
-                    query = query.where(Asset.systype_id == int(systype_id))
-                
-                os_id = self.os_map.get(self.filter_os)
-                if os_id and os_id != "all":
-                    query = query.where(Asset.os_id == int(os_id))
-                
-                # Get total count
-                count_query = select(func.count()).select_from(query.subquery())
-                self.total_count = session.exec(count_query).one()
-                self.total_pages = max(1, (self.total_count + self.page_size - 1) // self.page_size)
-                
-                # Apply sorting
-                if hasattr(Asset, self.sort_column):
-                    order_col = getattr(Asset, self.sort_column)
-                    if self.sort_direction == "desc":
-                        query = query.order_by(order_col.desc())
-                    else:
-                        query = query.order_by(order_col)
-                
-                # Execute query without pagination (we'll paginate in the frontend)
-                assets = session.exec(query).all()
-                
-                # Process assets with relationships
-                self.assets = []
-                for asset in assets:
-                    # Get related data
-                    project = session.exec(
-                        select(Project).where(Project.project_id == asset.project_id)
-                    ).first()
-                    
-                    building = session.exec(
-                        select(Building).where(Building.building_id == asset.building_id)
-                    ).first()
-                    
-                    floor = session.exec(
-                        select(Floor).where(Floor.floor_id == asset.floor_id)
-                    ).first()
-                    
-                    room = None
-                    if asset.room_id:
-                        room = session.exec(
-                            select(Room).where(Room.room_id == asset.room_id)
-                        ).first()
-                    
-                    systype = session.exec(
-                        select(SysType).where(SysType.systype_id == asset.systype_id)
-                    ).first()
-                    
-                    os = None
-                    if asset.os_id:
-                        os = session.exec(
-                            select(OperatingSystem).where(OperatingSystem.os_id == asset.os_id)
-                        ).first()
-                    
-                    hw_manu = None
-                    if asset.hwmanu_id:
-                        hw_manu = session.exec(
-                            select(HardwareManufacturer).where(HardwareManufacturer.hwmanu_id == asset.hwmanu_id)
-                        ).first()
-                    
-                    # Process building name to extract just the number
-                    building_display = building.building_name if building else "Unknown"
-                    if building_display.startswith("Building "):
-                        building_display = building_display.replace("Building ", "")
-                    
-                    # Process floor name to extract just the level
-                    floor_display = floor.floor_name if floor else "Unknown"
-                    if floor_display.startswith("Floor "):
-                        floor_display = floor_display.replace("Floor ", "")
-                    
-                    self.assets.append({
-                        "asset_id": str(asset.asset_id),
-                        "asset_name": asset.asset_name or "Unknown",
-                        "project": project.project_name if project else "Unknown",
-                        "project_id": asset.project_id,
-                        "building": building_display,
-                        "building_id": asset.building_id,
-                        "floor": floor_display,
-                        "floor_id": asset.floor_id,
-                        "room": room.room_name if room else "N/A",
-                        "room_id": asset.room_id,
-                        "systype": systype.systype_name if systype else "Unknown",
-                        "systype_id": asset.systype_id,
-                        "os": os.os_name if os else "N/A",
-                        "os_id": asset.os_id,
-                        "hw_manufacturer": hw_manu.hwmanu_name if hw_manu else "N/A",
-                        "serial_no": asset.serial_no if asset.serial_no else "N/A",
-                        "barcode": asset.letterkenny_barcode if asset.letterkenny_barcode else "N/A",
-                        "cpu_id": asset.cpu_id,
-                        "gpu_id": asset.gpu_id
-                    })
-                
-                # Apply search filter
-                if self.search_query:
-                    search_lower = self.search_query.lower()
-                    self.filtered_assets = [
-                        asset for asset in self.assets
-                        if search_lower in str(asset.get("asset_name", "")).lower()
-                        or search_lower in str(asset.get("serial_no", "")).lower()
-                        or search_lower in str(asset.get("barcode", "")).lower()
-                        or search_lower in str(asset.get("project", "")).lower()
-                    ]
-                else:
-                    self.filtered_assets = self.assets
-                
-                # Update total count and pages based on filtered results
-                self.total_count = len(self.filtered_assets)
-                self.total_pages = max(1, (self.total_count + self.page_size - 1) // self.page_size)
-                
-                # Debug print
-                print(f"Total assets loaded: {len(self.assets)}")
-                print(f"Filtered assets: {len(self.filtered_assets)}")
-                
-                # Calculate analytics
-                self.calculate_analytics()
-                
+                self._load_filter_options(session)
+                self._load_assets(session)
+        except Exception as e:
+            print(f"Error loading assets: {e}")
+        finally:
+            self.is_loading = False
+            yield
+    
+    async def load_assets_page(self):
+        """Reload just the assets for the current filters, search, sort and page."""
+        self.is_loading = True
+        yield
+        
+        try:
+            with rx.session() as session:
+                self._load_assets(session)
         except Exception as e:
             print(f"Error loading assets: {e}")
         finally:
             self.is_loading = False
             yield
     
+    def _load_filter_options(self, session):
+        """Load the dropdown options and display-name mappings."""
+        # Load filter options - display strings with mappings
+        # Lookup tables come from the shared reference cache
+        # Projects
+        projects = ReferenceDataCache.get("project", session)
+        self.projects = ["All Projects"] + projects.names()
+        self.edit_projects = projects.names()
+        self.project_map = {"All Projects": "all"}
+        for name, project_id in projects.name_to_id().items():
+            self.project_map[name] = str(project_id)
+        
+        # Buildings - for filter dropdown, only show buildings that are in use
+        self.buildings = ["All Buildings"]
+        self.edit_buildings = []
+        self.building_map = {"All Buildings": "all"}
+        
+        # Get distinct building IDs that are actually used by assets
+        used_building_ids = set(session.exec(
+            select(Asset.building_id).distinct()
+            .where(Asset.building_id.isnot(None))
+        ).all())
+        
+        # Get all buildings
+        for building_id, building_name in ReferenceDataCache.get("building", session).rows:
+            # Add to edit dropdown (all buildings available)
+            self.edit_buildings.append(building_name)
+            self.building_map[building_name] = str(building_id)
+            
+            # Only add to filter dropdown if it's in use
+            if building_id in used_building_ids:
+                self.buildings.append(building_name)
+        
+        # System Types - for filter dropdown, only show system types that are in use
+        self.systypes = ["All System Types"]
+        self.edit_systypes = []
+        self.systype_map = {"All System Types": "all"}
+        
+        # Get distinct system type IDs that are actually used by assets
+        used_systype_ids = set(session.exec(
+            select(Asset.systype_id).distinct()
+            .where(Asset.systype_id.isnot(None))
+        ).all())
+        
+        # Get all system types
+        for systype_id, systype_name in ReferenceDataCache.get("systype", session).rows:
+            # Add to edit dropdown (all system types available)
+            self.edit_systypes.append(systype_name)
+            self.systype_map[systype_name] = str(systype_id)
+            
+            # Only add to filter dropdown if it's in use
+            if systype_id in used_systype_ids:
+                self.systypes.append(systype_name)
+        
+        # Operating Systems - for filter dropdown, only show OS that are in use
+        self.operating_systems = ["All Operating Systems"]
+        self.edit_operating_systems = []
+        self.os_map = {"All Operating Systems": "all"}
+        
+        # Get distinct OS IDs that are actually used by assets
+        used_os_ids = set(session.exec(
+            select(Asset.os_id).distinct()
+            .where(Asset.os_id.isnot(None))
+        ).all())
+        
+        # Get all OS for edit dropdown
+        for os_id, os_name in ReferenceDataCache.get("operating_system", session).rows:
+            # Add to edit dropdown (all OS available)
+            self.edit_operating_systems.append(os_name)
+            self.os_map[os_name] = str(os_id)
+            
+            # Only add to filter dropdown if it's in use
+            if os_id in used_os_ids:
+                self.operating_systems.append(os_name)
+        
+        # Floors
+        floors = ReferenceDataCache.get("floor", session)
+        self.floors = floors.names()
+        self.floor_map = {name: str(floor_id) for name, floor_id in floors.name_to_id().items()}
+    
+    def _load_assets(self, session):
+        """Load the assets for the current filters, search, sort and page."""
+        filters = self._current_filters()
+        
+        if self.server_side_paging:
+            # Only the current page is fetched and held in state
+            self._load_server_page(session, filters)
+        else:
+            # Build the joined grid query with filters
+            query = AssetLoader.apply_filters(AssetLoader.build_query(), **filters)
+            
+            # Apply sorting
+            query = AssetLoader.apply_sorting(query, self.sort_column, self.sort_direction)
+            
+            # Execute query without pagination (we'll paginate in the frontend)
+            # Lookup names come back in the same statement as the assets
+            self.assets = AssetLoader.load_rows(session, query)
+            
+            # Apply search filter
+            if self.search_query:
+                search_lower = self.search_query.lower()
+                self.filtered_assets = [
+                    asset for asset in self.assets
+                    if search_lower in str(asset.get("asset_name", "")).lower()
+                    or search_lower in str(asset.get("serial_no", "")).lower()
+                    or search_lower in str(asset.get("barcode", "")).lower()
+                    or search_lower in str(asset.get("project", "")).lower()
+                ]
+            else:
+                self.filtered_assets = self.assets
+            
+            # Update total count and pages based on filtered results
+            self.total_count = len(self.filtered_assets)
+            self.total_pages = max(1, (self.total_count + self.page_size - 1) // self.page_size)
+            
+            # Debug print
+            print(f"Total assets loaded: {len(self.assets)}")
+            print(f"Filtered assets: {len(self.filtered_assets)}")
+            
+            # Calculate analytics
+            self.calculate_analytics()
+    
+    def _current_filters(self) -> Dict[str, Optional[int]]:
+        """Resolve the filter dropdowns to database IDs for AssetLoader."""
+        return {
+            "project_id": self._selected_filter_id(self.project_map, self.filter_project),
+            "building_id": self._selected_filter_id(self.building_map, self.filter_building),
+            "systype_id": self._selected_filter_id(self.systype_map, self.filter_systype),
+            "os_id": self._selected_filter_id(self.os_map, self.filter_os),
+        }
+    
+    def _filtered_query(self, filters: Dict[str, Optional[int]]):
+        """Build the grid query with the dropdown filters and search box applied."""
+        query = AssetLoader.apply_filters(AssetLoader.build_query(), **filters)
+        return AssetLoader.apply_search(query, self.search_query)
+    
+    def _load_server_page(self, session, filters: Dict[str, Optional[int]]):
+        """Load the current page with filtering, search, sorting and paging done in SQL."""
+        query = self._filtered_query(filters)
+        
+        self.total_count = AssetLoader.count(session, query)
+        self.total_pages = max(1, (self.total_count + self.page_size - 1) // self.page_size)
+        self.page = max(1, min(self.page, self.total_pages))
+        
+        query = AssetLoader.apply_sorting(query, self.sort_column, self.sort_direction)
+        self.assets = AssetLoader.load_page(session, query, self.page, self.page_size)
+        self.filtered_assets = self.assets
+        
+        # The analytics cards only depend on the dropdown filters, so paging,
+        # sorting and searching reuse the previous breakdown
+        analytics_key = str(sorted(filters.items()))
+        if analytics_key != self._analytics_filter_key:
+            self._load_server_analytics(session, filters)
+            self._analytics_filter_key = analytics_key
+    
+    def _load_server_analytics(self, session, filters: Dict[str, Optional[int]]):
+        """Calculate the analytics breakdowns with GROUP BY queries."""
+        self.assets_by_project = {}
+        for name, count in AssetLoader.count_by(session, "project", **filters).items():
+            project = name or "Unknown"
+            self.assets_by_project[project] = self.assets_by_project.get(project, 0) + count
+        
+        self.assets_by_building = {}
+        for name, count in AssetLoader.count_by(session, "building", **filters).items():
+            building = name or "Unknown"
+            if building.startswith("Building "):
+                building = building.replace("Building ", "")
+            self.assets_by_building[building] = self.assets_by_building.get(building, 0) + count
+        
+        self.assets_by_systype = {}
+        for name, count in AssetLoader.count_by(session, "systype", **filters).items():
+            systype = name or "Unknown"
+            self.assets_by_systype[systype] = self.assets_by_systype.get(systype, 0) + count
+        
+        # By OS (exclude N/A from count)
+        self.assets_by_os = {
+            name: count
+            for name, count in AssetLoader.count_by(session, "os", **filters).items()
+            if name
+        }
+    
     def calculate_analytics(self):
         """Calculate analytics for assets."""
         self.assets_by_project = {}
@@ -404,31 +407,31 @@ class AssetsState(rx.State):
         """Set search query and filter assets."""
         self.search_query = query
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def set_filter_project(self, project_id: str):
         """Set project filter."""
         self.filter_project = project_id
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def set_filter_building(self, building_id: str):
         """Set building filter."""
         self.filter_building = building_id
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def set_filter_systype(self, systype_id: str):
         """Set system type filter."""
         self.filter_systype = systype_id
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def set_filter_os(self, os_id: str):
         """Set OS filter."""
         self.filter_os = os_id
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def sort_by_column(self, column: str):
         """Sort by column with toggle direction."""
@@ -437,7 +440,7 @@ class AssetsState(rx.State):
         else:
             self.sort_column = column
             self.sort_direction = "asc"
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def toggle_row_selection(self, asset_id: str):
         """Toggle row selection."""
@@ -449,10 +452,7 @@ class AssetsState(rx.State):
     def toggle_select_all(self):
         """Toggle select all rows on current page."""
         # Get current page assets
-        start = (self.page - 1) * self.page_size
-        end = start + self.page_size
-        current_page_assets = self.filtered_assets[start:end]
-        current_page_ids = [str(asset["asset_id"]) for asset in current_page_assets]
+        current_page_ids = [str(asset["asset_id"]) for asset in self.paginated_assets]
         
         # Check if all items on current page are selected
         all_selected = all(asset_id in self.selected_rows for asset_id in current_page_ids)
@@ -472,24 +472,24 @@ class AssetsState(rx.State):
         """Go to next page."""
         if self.page < self.total_pages:
             self.page += 1
-            return self.load_assets_data()
+            return self.load_assets_page()
     
     def prev_page(self):
         """Go to previous page."""
         if self.page > 1:
             self.page -= 1
-            return self.load_assets_data()
+            return self.load_assets_page()
     
     def set_page(self, page: int):
         """Set specific page."""
         self.page = max(1, min(page, self.total_pages))
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def set_page_size(self, size: str):
         """Set page size."""
         self.page_size = int(size)
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def toggle_column_visibility(self, column: str):
         """Toggle column visibility."""
@@ -520,7 +520,17 @@ class AssetsState(rx.State):
     def export_all_data(self, format: str):
         """Export all filtered assets data (entire dataset)."""
         # Export all filtered data regardless of pagination
-        export_data = self.filtered_assets
+        if self.server_side_paging:
+            # Only the current page is in state, so fetch the full result set
+            with rx.session() as session:
+                query = AssetLoader.apply_sorting(
+                    self._filtered_query(self._current_filters()),
+                    self.sort_column,
+                    self.sort_direction
+                )
+                export_data = AssetLoader.load_rows(session, query)
+        else:
+            export_data = self.filtered_assets
         
         if format == "csv":
             return export_to_csv(export_data, "assets_all")
@@ -539,7 +549,7 @@ class AssetsState(rx.State):
         self.filter_systype = "All System Types"
         self.filter_os = "All Operating Systems"
         self.page = 1
-        return self.load_assets_data()
+        return self.load_assets_page()
     
     def open_edit_modal(self, asset_id: str):
         """Open edit modal for a specific asset."""
@@ -565,7 +575,7 @@ class AssetsState(rx.State):
     
     def save_asset_changes(self):
         """Save changes to the asset."""
-        from sqlmodel import Session, create_engine, select
+        from sqlmodel import Session, select
         from ..models.asset import Asset
         
         try:
@@ -575,7 +585,7 @@ class AssetsState(rx.State):
                 print("Database URL not found")
                 return
             
-            engine = create_engine(database_url)
+            engine = get_engine(database_url)
             
             with Session(engine) as session:
                 # Find the asset
@@ -615,8 +625,9 @@ class AssetsState(rx.State):
                     
                     print(f"Successfully updated asset {asset.asset_name}")
                     
-                    # Close modal and reload data
+                    # Close modal and reload data (analytics may have changed)
                     self.close_edit_modal()
+                    self._analytics_filter_key = ""
                     return self.load_assets_data()
                 else:
                     print(f"Asset not found: {self.edit_asset_id}")
@@ -667,7 +678,7 @@ class AssetsState(rx.State):
     
     def save_inline_changes(self):
         """Save inline changes to the asset."""
-        from sqlmodel import Session, create_engine, select
+        from sqlmodel import Session, select
         from ..models.asset import Asset
         
         try:
@@ -677,7 +688,7 @@ class AssetsState(rx.State):
                 print("Database URL not found")
                 return
             
-            engine = create_engine(database_url)
+            engine = get_engine(database_url)
             
             with Session(engine) as session:
                 # Find the asset
@@ -720,6 +731,7 @@ class AssetsState(rx.State):
                     # Clear editing state and reload data
                     self.editing_asset_id = ""
                     self.edit_asset_id = ""
+                    self._analytics_filter_key = ""
                     return self.load_assets_data()
                 else:
                     print(f"Asset not found: {self.edit_asset_id}")
@@ -845,25 +857,17 @@ class AssetsState(rx.State):
                     # In a real system, you might want to soft-delete or require admin approval
                     print(f"Delete request submitted for asset: {asset.asset_name} (ID: {asset.asset_id})")
                     
-                    # Log the delete request as an activity
-                    from ..models.user_activity import UserActivity
-                    from ..models.appuser import AppUser
-                    
-                    # Get the current user (this is simplified - in real app you'd have auth)
-                    # For now, we'll just use the first user
-                    user = session.exec(select(AppUser).limit(1)).first()
-                    
-                    if user:
-                        activity = UserActivity(
-                            user_id=user.id,
-                            employee_id=user.employee_id,
+                    # Log the delete request as an activity, attributed to the signed-in user
+                    auth_state = await get_identity(self)
+                    if auth_state.current_user_id:
+                        ActivityTracker.track_activity(
                             activity_type="delete_request",
-                            activity_description=f"Requested deletion of asset: {asset.asset_name}",
+                            description=f"Requested deletion of asset: {asset.asset_name}",
                             related_asset_id=asset.asset_id,
-                            related_project_id=asset.project_id
+                            related_project_id=asset.project_id,
+                            user_id=auth_state.current_user_id,
+                            employee_id=auth_state.current_employee_id
                         )
-                        session.add(activity)
-                        session.commit()
                     
                     # Close modal and reload data
                     self.close_delete_modal()
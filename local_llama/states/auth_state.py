@@ -1,61 +1,98 @@
 """Authentication state management."""
 import reflex as rx
+import reflex_clerk_api as clerk
 from typing import Optional
 import os
-from sqlmodel import Session, create_engine, select
-from ..models.employee import Employee
+from sqlmodel import Session
+from ..database.engine import get_engine
+from ..services.user_identity import UserIdentity
 
 
 class AuthState(rx.State):
-    """State for managing authentication and user information."""
-    
+    """State for managing authentication and user information.
+
+    The signed-in user's identity is resolved once per browser session and
+    kept here; other states get it with get_identity(self).
+    """
+
+    current_user_id: Optional[int] = None  # AppUser id
     current_employee_id: Optional[int] = None
     current_employee_name: Optional[str] = None
     current_employee_email: Optional[str] = None
+    current_department_id: Optional[int] = None
     is_cybersecurity_team: bool = False
     clerk_user_email: Optional[str] = None
-    
+
+    # Email the identity above was resolved for ("" when unresolved)
+    _identity_email: str = ""
+
     def set_clerk_user_email(self, email: str):
         """Set the Clerk user email from the frontend."""
-        self.clerk_user_email = email
         self.load_current_user_by_email(email)
-    
+
     def load_current_user_by_email(self, email: str):
         """Load current user information by email."""
         if not email:
             print("No email provided")
             return
-        
+        self._load_identity(email)
+
+    async def _ensure_identity(self):
+        """Resolve the signed-in Clerk user's identity if it is not already cached."""
+        clerk_user = await self.get_state(clerk.ClerkUser)
+        email = clerk_user.email_address
+        if email == self._identity_email:
+            return
+        if email:
+            self._load_identity(email)
+        else:
+            # Signed out
+            self._clear_identity()
+
+    def _load_identity(self, email: str):
+        """Look up an email's user records and cache them for this session."""
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             print("Database URL not found")
             return
-        
-        engine = create_engine(database_url)
+
+        engine = get_engine(database_url)
         with Session(engine) as session:
-            # Find employee by email
-            employee = session.exec(
-                select(Employee).where(Employee.email == email)
-            ).first()
-            
-            if employee:
-                self.current_employee_id = employee.id
-                self.current_employee_name = f"{employee.first_name} {employee.last_name}"
-                self.current_employee_email = employee.email
-                
-                # Check if user is in cybersecurity team
-                # Department 2 is Cybersecurity, or they are Robert Shipp (manager)
-                self.is_cybersecurity_team = (
-                    employee.department_id == 2 or 
-                    employee.email == "robert.shipp.2.civ@army.mil"
-                )
-                
-                print(f"Loaded employee: {self.current_employee_name} (ID: {self.current_employee_id})")
-                print(f"Is cybersecurity team: {self.is_cybersecurity_team}")
-            else:
-                print(f"No employee found for email: {email}")
-                # Reset state
-                self.current_employee_id = None
-                self.current_employee_name = None
-                self.current_employee_email = None
-                self.is_cybersecurity_team = False
\ No newline at end of file
+            identity = UserIdentity.lookup(session, email)
+
+        self._clear_identity()
+        self.clerk_user_email = email
+        self._identity_email = email
+        if not identity:
+            print(f"No employee found for email: {email}")
+            return
+
+        self.current_user_id, self.current_employee_id, self.current_department_id, self.current_employee_name = identity
+        self.current_employee_email = email
+        self.is_cybersecurity_team = UserIdentity.is_cybersecurity_team(email, self.current_department_id)
+
+        print(f"Loaded employee: {self.current_employee_name} (ID: {self.current_employee_id})")
+        print(f"Is cybersecurity team: {self.is_cybersecurity_team}")
+
+    def _clear_identity(self):
+        """Forget the cached identity."""
+        self.current_user_id = None
+        self.current_employee_id = None
+        self.current_employee_name = None
+        self.current_employee_email = None
+        self.current_department_id = None
+        self.is_cybersecurity_team = False
+        self.clerk_user_email = None
+        self._identity_email = ""
+
+
+async def get_identity(state: rx.State) -> AuthState:
+    """Get the session's AuthState, resolving the signed-in user on first use.
+
+    Example:
+        auth_state = await get_identity(self)
+        uploaded_by = auth_state.current_employee_id
+    """
+    auth_state = await state.get_state(AuthState)
+    await auth_state._ensure_identity()
+    return auth_state
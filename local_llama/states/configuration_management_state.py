@@ -2,12 +2,17 @@
 import reflex as rx
 import os
 from typing import List, Dict, Optional
-from sqlmodel import Session, select, func, and_, or_, create_engine
+from sqlmodel import Session, select, func, and_, or_
+from ..database.engine import get_engine
 from ..models import (
-    SoftwareCatalog, AssetSoftware, Asset, Project,
-    SWManufacturer, SoftwareVersion, Department
+    SoftwareCatalog, AssetSoftware, Asset,
+    SoftwareVersion, Department
 
 )
+from ..services.reference_cache import ReferenceDataCache
+from ..services.software_catalog_loader import SoftwareCatalogLoader
+from ..services.paging import Paging
+from ..services.search_index import CatalogSearch
 from ..utils.export_utils import export_to_csv, export_to_json, export_to_excel, export_to_print
 
 
@@ -63,7 +68,7 @@ class ConfigurationManagementState(rx.State):
     @rx.var
     def has_software(self) -> bool:
         """Check if there is any software to display."""
-        return len(self.filtered_software) > 0
+        return self.filtered_software_count > 0
 
     @rx.var
     def total_pages(self) -> int:
@@ -74,19 +79,8 @@ class ConfigurationManagementState(rx.State):
 
     @rx.var
     def paginated_software(self) -> List[Dict]:
-        """Get current page of software after sorting."""
-        # Sort the filtered software
-        sorted_software = sorted(
-            self.filtered_software,
-            key=lambda x: x.get(self.sort_column, ""),
-            reverse=not self.sort_ascending
-        )
-
-        # Calculate pagination
-        start_idx = (self.current_page - 1) * self.items_per_page
-        end_idx = start_idx + self.items_per_page
-
-        return sorted_software[start_idx:end_idx]
+        """Get current page of software (already sorted and paged in SQL)."""
+        return self.filtered_software
 
     @rx.var
     def page_info(self) -> str:
@@ -103,12 +97,18 @@ class ConfigurationManagementState(rx.State):
     software_search: str = ""
     filtered_assets: List[str] = []
 
-    # Software data
+    # Software data: filtering, sorting and paging run in SQL, so
+    # filtered_software holds only the current page
     filtered_software: List[Dict] = []
-    _all_software: List[Dict] = []  # Store unfiltered software list
     total_software: int = 0
     filtered_software_count: int = 0
 
+    # Rows the table is drawn from: the whole catalog, a project or an asset
+    # (see SoftwareCatalogLoader.build_query); _scope_empty shows no rows
+    _scope_project_id: Optional[int] = None
+    _scope_asset_id: Optional[int] = None
+    _scope_empty: bool = False
+
     # Pagination
     current_page: int = 1
     items_per_page: int = 20
@@ -125,21 +125,12 @@ class ConfigurationManagementState(rx.State):
     def on_mount(self):
         """Initialize the state when the page loads."""
         self.load_projects()
+        # Also loads the categories and vendors
         self.load_software_catalog()
-        self.load_categories()
-        self.load_vendors()
 
     def load_projects(self):
         """Load all available projects."""
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            print("Database URL not found")
-            return
-
-        engine = create_engine(database_url)
-        with Session(engine) as session:
-            projects = session.exec(select(Project)).all()
-            self.available_projects = [p.project_name for p in projects]
+        self.available_projects = ReferenceDataCache.get("project").names()
 
     def load_assets_for_project(self):
         """Load assets for the selected project."""
@@ -153,30 +144,35 @@ class ConfigurationManagementState(rx.State):
             print("Database URL not found")
             return
 
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Get project ID
-            project = session.exec(
-                select(Project).where(Project.project_name == self.selected_project)
-            ).first()
+            project_id = ReferenceDataCache.get("project", session).get_id(self.selected_project)
 
-            if project:
+            if project_id is not None:
                 # Get all assets for this project
                 assets = session.exec(
-                    select(Asset).where(Asset.project_id == project.project_id)
+                    select(Asset).where(Asset.project_id == project_id)
                 ).all()
                 self.available_assets = [a.asset_name for a in assets]
+                CatalogSearch.asset_index(session)
                 self.filter_assets()
 
     def filter_assets(self):
-        """Filter assets based on search term."""
-        if not self.asset_search:
+        """Filter assets based on search term, best matches first."""
+        if not self.asset_search.strip():
             self.filtered_assets = self.available_assets
-        else:
-            search_lower = self.asset_search.lower()
+            return
+
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            return
+
+        engine = get_engine(database_url)
+        with Session(engine) as session:
+            available = set(self.available_assets)
             self.filtered_assets = [
-                asset for asset in self.available_assets
-                if search_lower in asset.lower()
+                name for name in CatalogSearch.asset_names(session, self.asset_search) if name in available
             ]
 
     def set_selected_project(self, project: str):
@@ -226,75 +222,21 @@ class ConfigurationManagementState(rx.State):
             print("Database URL not found")
             return
 
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Get total count
             self.total_software = session.exec(
                 select(func.count(SoftwareCatalog.software_catalog_id))
             ).one()
+            # Build the search index now so the first keystroke does not wait for it
+            CatalogSearch.software_index(session)
 
-            # Get all software with vendor info
-            query = select(
-                SoftwareCatalog,
-                SWManufacturer.swmanu_name,
-                func.count(AssetSoftware.asset_id).label("install_count")
-            ).outerjoin(
-                SWManufacturer,
-                SoftwareCatalog.sw_vendor == SWManufacturer.swmanu_id
-            ).outerjoin(
-                AssetSoftware,
-                SoftwareCatalog.software_catalog_id == AssetSoftware.software_catalog_id
-            ).group_by(
-                SoftwareCatalog.software_catalog_id,
-                SoftwareCatalog.sw_name,
-                SoftwareCatalog.sw_vendor,
-                SoftwareCatalog.sw_category,
-                SoftwareCatalog.sw_type,
-                SoftwareCatalog.latest_version,
-                SoftwareCatalog.sw_architecture_compatibility,
-                SoftwareCatalog.dod_compliant,
-                SoftwareCatalog.compliance_status,
-                SoftwareCatalog.army_gold_master,
-                SoftwareCatalog.is_approved,
-                SoftwareCatalog.is_licensed,
-                SoftwareCatalog.license_model,
-                SoftwareCatalog.eol_date,
-                SoftwareCatalog.description,
-                SoftwareCatalog.created_date,
-                SoftwareCatalog.updated_date,
-                SWManufacturer.swmanu_name
-            )
-
-            results = session.exec(query).all()
-
-            software_list = [
-                {
-                    "name": sw.sw_name,
-                    "vendor": vendor or "Unknown",
-                    "category": sw.sw_category or "Uncategorized",
-                    "latest_version": sw.latest_version or "Unknown",
-                    "architecture": sw.sw_architecture_compatibility or "Any",
-                    "dod_compliant": sw.dod_compliant,
-                    "compliance_status": sw.compliance_status,
-                    "army_gold_master": sw.army_gold_master,
-                    "installations": install_count
-                }
-                for sw, vendor, install_count in results
-            ]
-
-            self._all_software = software_list
-            self.filtered_software = software_list
-            self.filtered_software_count = len(software_list)
-            # Load categories and vendors after loading software
-            self.load_categories()
-            self.load_vendors()
+        self._set_scope()
 
     def load_software_for_selection(self):
         """Load software for selected project or asset."""
         if self.selected_project == "All Projects":
-            self._all_software = []
-            self.filtered_software = []
-            self.filtered_software_count = 0
+            self._set_scope(empty=True)
             return
 
         database_url = os.getenv("DATABASE_URL")
@@ -302,176 +244,93 @@ class ConfigurationManagementState(rx.State):
             print("Database URL not found")
             return
 
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             if self.selected_asset:
-                # Get software for specific asset
-                asset = session.exec(
-                    select(Asset).where(Asset.asset_name == self.selected_asset)
+                # Software for a specific asset
+                asset_id = session.exec(
+                    select(Asset.asset_id).where(Asset.asset_name == self.selected_asset)
                 ).first()
+                self._set_scope(asset_id=asset_id, empty=asset_id is None)
+            else:
+                # Aggregated software for the entire project
+                project_id = ReferenceDataCache.get("project", session).get_id(self.selected_project)
+                self._set_scope(project_id=project_id, empty=project_id is None)
+
+    def _set_scope(self, project_id: Optional[int] = None, asset_id: Optional[int] = None, empty: bool = False):
+        """Point the table at a new set of rows and load its first page and filter options."""
+        self._scope_project_id = project_id
+        self._scope_asset_id = asset_id
+        self._scope_empty = empty
+        self.current_page = 1
+        self._load_software_page()
+        # Load categories and vendors for the new rows
+        self.load_categories()
+        self.load_vendors()
 
-                if asset:
-                    query = select(
-                        SoftwareCatalog,
-                        SWManufacturer.swmanu_name,
-                        AssetSoftware.installed_version
-                    ).join(
-                        AssetSoftware,
-                        SoftwareCatalog.software_catalog_id == AssetSoftware.software_catalog_id
-                    ).outerjoin(
-                        SWManufacturer,
-                        SoftwareCatalog.sw_vendor == SWManufacturer.swmanu_id
-                    ).where(
-                        AssetSoftware.asset_id == asset.asset_id
-                    )
-
-                    results = session.exec(query).all()
-
-                    software_list = [
-                        {
-                            "name": sw.sw_name,
-                            "vendor": vendor or "Unknown",
-                            "category": sw.sw_category or "Uncategorized",
-                            "latest_version": version or sw.latest_version or "Unknown",
-                            "architecture": sw.sw_architecture_compatibility or "Any",
-                            "dod_compliant": sw.dod_compliant,
-                            "compliance_status": sw.compliance_status,
-                            "army_gold_master": sw.army_gold_master,
-                            "installations": 1
-                        }
-                        for sw, vendor, version in results
-                    ]
+    def _software_query(self, session: Session):
+        """Build the filtered, sorted software query for the current scope."""
+        software_ids, search = None, ""
+        if self.software_search.strip():
+            software_ids = CatalogSearch.software_ids(session, self.software_search)
+            if len(software_ids) > SoftwareCatalogLoader.MAX_SEARCH_IDS:
+                # A broad search (e.g. one letter): match the words in SQL instead of sending every id
+                software_ids, search = None, self.software_search
+        query = SoftwareCatalogLoader.apply_filters(
+            SoftwareCatalogLoader.build_query(self._scope_project_id, self._scope_asset_id),
+            software_ids=software_ids,
+            search=search,
+            category=self.selected_category if self.selected_category != "All Categories" else None,
+            compliance=self.selected_compliance,
+            vendor=self.selected_vendor if self.selected_vendor != "All Vendors" else None,
+        )
+        return SoftwareCatalogLoader.apply_sorting(query, self.sort_column, self.sort_ascending)
 
-                    self._all_software = software_list
-                    self.filtered_software = software_list
-                    self.filtered_software_count = len(software_list)
-                    # Load categories and vendors after loading software
-                    self.load_categories()
-                    self.load_vendors()
-            else:
-                # Get aggregated software for entire project
-                project = session.exec(
-                    select(Project).where(Project.project_name == self.selected_project)
-                ).first()
+    def _load_software_page(self):
+        """Count the matching software and fetch only the current page."""
+        if self._scope_empty:
+            self.filtered_software = []
+            self.filtered_software_count = 0
+            return
 
-                if project:
-                    # Get all unique software for assets in this project
-                    query = select(
-                        SoftwareCatalog,
-                        SWManufacturer.swmanu_name,
-                        func.count(func.distinct(AssetSoftware.asset_id)).label("install_count")
-                    ).join(
-                        AssetSoftware,
-                        SoftwareCatalog.software_catalog_id == AssetSoftware.software_catalog_id
-                    ).join(
-                        Asset,
-                        AssetSoftware.asset_id == Asset.asset_id
-                    ).outerjoin(
-                        SWManufacturer,
-                        SoftwareCatalog.sw_vendor == SWManufacturer.swmanu_id
-                    ).where(
-                        Asset.project_id == project.project_id
-                    ).group_by(
-                        SoftwareCatalog.software_catalog_id,
-                        SoftwareCatalog.sw_name,
-                        SoftwareCatalog.sw_vendor,
-                        SoftwareCatalog.sw_category,
-                        SoftwareCatalog.sw_type,
-                        SoftwareCatalog.latest_version,
-                        SoftwareCatalog.sw_architecture_compatibility,
-                        SoftwareCatalog.dod_compliant,
-                        SoftwareCatalog.compliance_status,
-                        SoftwareCatalog.army_gold_master,
-                        SoftwareCatalog.is_approved,
-                        SoftwareCatalog.is_licensed,
-                        SoftwareCatalog.license_model,
-                        SoftwareCatalog.eol_date,
-                        SoftwareCatalog.description,
-                        SoftwareCatalog.created_date,
-                        SoftwareCatalog.updated_date,
-                        SWManufacturer.swmanu_name
-                    )
-
-                    results = session.exec(query).all()
-
-                    software_list = [
-                        {
-                            "name": sw.sw_name,
-                            "vendor": vendor or "Unknown",
-                            "category": sw.sw_category or "Uncategorized",
-                            "latest_version": sw.latest_version or "Unknown",
-                            "architecture": sw.sw_architecture_compatibility or "Any",
-                            "dod_compliant": sw.dod_compliant,
-                            "compliance_status": sw.compliance_status,
-                            "army_gold_master": sw.army_gold_master,
-                            "installations": install_count
-                        }
-                        for sw, vendor, install_count in results
-                    ]
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            print("Database URL not found")
+            return
 
-                    self._all_software = software_list
-                    self.filtered_software = software_list
-                    self.filtered_software_count = len(software_list)
-                    # Load categories and vendors after loading software
-                    self.load_categories()
-                    self.load_vendors()
+        engine = get_engine(database_url)
+        with Session(engine) as session:
+            query = self._software_query(session)
+            self.filtered_software_count = Paging.count(session, query)
+            _, self.current_page, _ = Paging.page_bounds(
+                self.filtered_software_count, self.current_page, self.items_per_page
+            )
+            self.filtered_software = SoftwareCatalogLoader.load_page(
+                session, query, self.current_page, self.items_per_page
+            )
 
     def filter_software(self):
         """Filter software based on search term, category, and compliance status."""
-        # Start with all software
-        filtered = self._all_software.copy()
-
-        # Apply search filter
-        if self.software_search:
-            search_lower = self.software_search.lower()
-            filtered = [
-                sw for sw in filtered
-                if (search_lower in sw["name"].lower() or
-                    search_lower in sw["vendor"].lower() or
-                    search_lower in sw["category"].lower())
-            ]
-
-        # Apply category filter
-        if self.selected_category != "All Categories":
-            filtered = [
-                sw for sw in filtered
-                if sw["category"] == self.selected_category
-            ]
-
-        # Apply compliance filter
-        if self.selected_compliance == "DoD Compliant":
-            filtered = [sw for sw in filtered if sw.get("dod_compliant", False)]
-        elif self.selected_compliance == "Non-Compliant":
-            filtered = [sw for sw in filtered if not sw.get("dod_compliant", False)]
-        elif self.selected_compliance == "Army Gold Master":
-            filtered = [sw for sw in filtered if sw.get("army_gold_master", False)]
-        elif self.selected_compliance in ["Change Request Submitted", "CMB Approved",
-                                         "Change Board Denied", "POAM Available", "POTENTIAL HAZARD"]:
-            # Filter by the compliance_status field
-            filtered = [sw for sw in filtered if sw.get("compliance_status", "") == self.selected_compliance]
-
-        # Apply vendor filter
-        if self.selected_vendor != "All Vendors":
-            filtered = [
-                sw for sw in filtered
-                if sw["vendor"] == self.selected_vendor
-            ]
-
-        self.filtered_software = filtered
-        self.filtered_software_count = len(filtered)
         # Reset to first page when filtering
         self.current_page = 1
+        self._load_software_page()
 
     def load_categories(self):
         """Load all unique software categories."""
-        # Extract unique categories from the current software list
-        categories = set()
-        for sw in self._all_software:
-            category = sw.get("category", "Uncategorized")
-            if category and category != "Uncategorized":
-                categories.add(category)
+        self.available_categories = self._scope_options("category")
+
+    def _scope_options(self, column: str) -> List[str]:
+        """Get the distinct categories or vendors of the current scope."""
+        if self._scope_empty:
+            return []
 
-        self.available_categories = sorted(list(categories))
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            return []
+
+        engine = get_engine(database_url)
+        with Session(engine) as session:
+            return SoftwareCatalogLoader.options(session, column, self._scope_project_id, self._scope_asset_id)
 
     def set_selected_category(self, category: str):
         """Set the selected category filter."""
@@ -485,14 +344,7 @@ class ConfigurationManagementState(rx.State):
 
     def load_vendors(self):
         """Load all unique software vendors."""
-        # Extract unique vendors from the current software list
-        vendors = set()
-        for sw in self._all_software:
-            vendor = sw.get("vendor", "Unknown")
-            if vendor and vendor != "Unknown":
-                vendors.add(vendor)
-
-        self.available_vendors = sorted(list(vendors))
+        self.available_vendors = self._scope_options("vendor")
 
     def set_selected_vendor(self, vendor: str):
         """Set the selected vendor filter."""
@@ -512,10 +364,8 @@ class ConfigurationManagementState(rx.State):
         # Reset view mode to catalog
         self.view_mode = "catalog"
 
-        # Reload data
+        # Reload data (also reloads categories and vendors)
         self.load_software_catalog()
-        self.load_categories()
-        self.load_vendors()
 
         # Note: sort_column and sort_ascending are preserved
 
@@ -577,7 +427,12 @@ class ConfigurationManagementState(rx.State):
     def export_all_data(self, format: str):
         """Export all filtered software data (entire dataset)."""
         # Export all filtered data regardless of pagination
-        export_data = self.filtered_software
+        export_data = []
+        database_url = os.getenv("DATABASE_URL")
+        if database_url and not self._scope_empty:
+            engine = get_engine(database_url)
+            with Session(engine) as session:
+                export_data = SoftwareCatalogLoader.load_rows(session, self._software_query(session))
 
         if format == "csv":
             return export_to_csv(export_data, "software_catalog_all")
@@ -597,16 +452,19 @@ class ConfigurationManagementState(rx.State):
         """Set current page."""
         if 1 <= page <= self.total_pages:
             self.current_page = page
+            self._load_software_page()
 
     def next_page(self):
         """Go to next page."""
         if self.current_page < self.total_pages:
             self.current_page += 1
+            self._load_software_page()
 
     def prev_page(self):
         """Go to previous page."""
         if self.current_page > 1:
             self.current_page -= 1
+            self._load_software_page()
 
     def sort_by_column(self, column: str):
         """Sort by specified column."""
@@ -619,6 +477,7 @@ class ConfigurationManagementState(rx.State):
             self.sort_ascending = True
         # Reset to first page when sorting changes
         self.current_page = 1
+        self._load_software_page()
 
     def sort_by_name(self):
         """Sort by name column."""
@@ -643,7 +502,7 @@ class ConfigurationManagementState(rx.State):
             print("Database URL not found")
             return
 
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Get the software catalog entry
             software = session.exec(
@@ -10,6 +10,9 @@ from ..models.dat_version import DatVersion
 from ..models.av_version import AVVersion
 from ..models.department import Department
 from ..services.activity_tracker import ActivityTracker
+from ..services.reference_cache import ReferenceDataCache
+from ..services.paging import Paging
+from .auth_state import get_identity
 
 
 class DatUpdateState(rx.State):
@@ -85,9 +88,9 @@ class DatUpdateState(rx.State):
                     self.employee_map = {f"{emp.last_name}, {emp.first_name}": str(emp.id) for emp in employees}
                 
                 # Load projects
-                projects = session.exec(select(Project).order_by(Project.project_name)).all()
-                self.projects = [proj.project_name for proj in projects]
-                self.project_map = {proj.project_name: str(proj.project_id) for proj in projects}
+                projects = ReferenceDataCache.get("project", session)
+                self.projects = projects.names()
+                self.project_map = {name: str(project_id) for project_id, name in projects.rows}
                 
                 # Load DAT versions with AV version info
                 dat_versions = session.exec(
@@ -150,6 +153,9 @@ class DatUpdateState(rx.State):
             
         self.is_submitting = True
         
+        # Attribute the activity to the signed-in user (cached for the session)
+        auth_state = await get_identity(self)
+        
         try:
             with rx.session() as session:
                 # Get IDs from mappings
@@ -182,6 +188,7 @@ class DatUpdateState(rx.State):
                 session.commit()
                 
                 print(f"Successfully submitted DAT update: {new_update.datupdate_id}")
+                Paging.invalidate("dat")
                 
                 # Track activity
                 dat_version_name = self.selected_datversion_id
@@ -190,7 +197,8 @@ class DatUpdateState(rx.State):
                     asset_id=asset_id,
                     project_id=project_id,
                     employee_id=employee_id,
-                    dat_version=dat_version_name
+                    dat_version=dat_version_name,
+                    user_id=auth_state.current_user_id
                 )
                 
                 # Set success message
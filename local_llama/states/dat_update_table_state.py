@@ -7,6 +7,8 @@ from ..models.asset import Asset
 from ..models.project import Project
 from ..models.dat_version import DatVersion
 from ..models.av_version import AVVersion
+from ..services.paging import Paging
+from ..services.unresolved_failures import UnresolvedFailures
 
 
 class DatUpdateTableState(rx.State):
@@ -44,8 +46,7 @@ class DatUpdateTableState(rx.State):
         try:
             with rx.session() as session:
                 # Get total count first for pagination
-                count_query = select(DatUpdate)
-                self.total_count = len(session.exec(count_query).all())
+                self.total_count = Paging.count(session, select(DatUpdate), cache_key="dat")
                 
                 # Get the 10 most recent record IDs globally for the neon dot indicator
                 recent_ids_query = (
@@ -85,48 +86,10 @@ class DatUpdateTableState(rx.State):
                 
                 print(f"Found {len(duplicate_combinations)} duplicate combinations")
                 
-                # Find failed records that haven't been followed by successful ones for the same asset
-                failed_without_success = set()
-                
-                # Get all failed records
-                failed_query = (
-                    select(DatUpdate.asset_id, DatUpdate.date_of_update, DatUpdate.datupdate_id)
-                    .where(DatUpdate.update_result == "Failed")
-                    .order_by(DatUpdate.asset_id, DatUpdate.date_of_update.desc())
+                # Calculate total pages, keep the current page in range and get the offset
+                self.total_pages, self.current_page, offset = Paging.page_bounds(
+                    self.total_count, self.current_page, self.records_per_page
                 )
-                failed_records = session.exec(failed_query).all()
-                
-                for failed_record in failed_records:
-                    asset_id, failed_date, failed_id = failed_record
-                    
-                    # Check if there's a successful record for this asset after the failed date
-                    success_after_query = (
-                        select(DatUpdate.datupdate_id)
-                        .where(
-                            DatUpdate.asset_id == asset_id,
-                            DatUpdate.update_result == "Success",
-                            DatUpdate.date_of_update > failed_date
-                        )
-                        .limit(1)
-                    )
-                    success_after = session.exec(success_after_query).first()
-                    
-                    # If no success found after this failure, mark it as unresolved
-                    if not success_after:
-                        failed_without_success.add(failed_id)
-                
-                print(f"Found {len(failed_without_success)} unresolved failed records")
-                
-                # Calculate total pages
-                import math
-                self.total_pages = max(1, math.ceil(self.total_count / self.records_per_page))
-                
-                # Ensure current page is within valid range
-                if self.current_page > self.total_pages:
-                    self.current_page = max(1, self.total_pages)
-                
-                # Calculate offset for pagination
-                offset = (self.current_page - 1) * self.records_per_page
                 
                 # Build query with sorting
                 query = (
@@ -187,6 +150,12 @@ class DatUpdateTableState(rx.State):
                 results = session.exec(query).all()
                 print(f"Query returned {len(results)} results")
                 
+                # Flag failures on this page that have no later success for the same asset
+                failed_without_success = UnresolvedFailures.get_ids(
+                    session, "dat", [row[0].datupdate_id for row in results]
+                )
+                print(f"Found {len(failed_without_success)} unresolved failed records on this page")
+                
                 # Format data for table display
                 updates_data = []
                 for result in results:
@@ -1,9 +1,14 @@
 import reflex as rx
 import os
-from typing import List, Dict, Optional, Any
+import bisect
+from typing import List, Dict, Optional, Any, Set
 from datetime import datetime
-from sqlmodel import Session, create_engine, select, or_
-from ..models.file_storage import FileDirectory, FileMetadata, DirectoryType
+from sqlmodel import Session, select, or_
+from ..database.engine import get_engine
+from ..models.file_storage import FileDirectory, DirectoryType
+from ..services.directory_tree import DirectoryTree
+from ..services.directory_permissions import DirectoryPermissions, PermissionMap
+from .auth_state import get_identity
 
 
 class DirectoryState(rx.State):
@@ -30,120 +35,142 @@ class DirectoryState(rx.State):
     has_directories: bool = False  # Flag to indicate if directories are loaded
     total_file_count: int = 0  # Total files discovered
     
+    # directory_id -> parent_id for the loaded tree, so single nodes are found without a rebuild
+    _parents: Dict[int, Optional[int]] = {}
+    # Directories whose children have been fetched (None for the roots)
+    _children_loaded: Set[Optional[int]] = set()
+    
     # Add property to store current user id
     current_user_id: Optional[int] = None
     
+    @rx.var
+    def locked_tree_css(self) -> str:
+        """CSS that greys out the react-file-tree items the user cannot open."""
+        # Paths are quoted as CSS strings; "<" is escaped too so a name cannot close the style tag
+        selectors = ", ".join(
+            '.file-tree__item[data-uri="{}"]'.format(
+                d["full_path"].replace("\\", "\\\\").replace('"', '\\"').replace("<", "\\3c ")
+            )
+            for d in self.directories
+            if d.get("locked")
+        )
+        if not selectors:
+            return ""
+        return f"<style>{selectors} {{ opacity: 0.45; cursor: not-allowed; }}</style>"
+    
     def set_current_user_id(self, user_id: Optional[int]):
         """Set the current user ID for filtering."""
         self.current_user_id = user_id
     
-    def sync_user_from_auth(self):
-        """Sync user ID from AuthState."""
-        # For now, hardcode user ID until we can properly access AuthState
-        # TODO: Implement proper user authentication integration
-        self.current_user_id = 1  # Temporary hardcoded user ID
-        print(f"DirectoryState: Set current_user_id to {self.current_user_id} (hardcoded)")
+    async def sync_user_from_auth(self):
+        """Sync user ID from the session identity cached in AuthState."""
+        auth_state = await get_identity(self)
+        self.current_user_id = auth_state.current_employee_id
         
     def load_directory_tree(self):
-        """Load the directory tree structure (temporarily showing all directories)."""
+        """Load the root directories and the level below them.
+
+        Deeper levels are fetched as directories are expanded; directories
+        this session already has expanded are loaded again right away.
+        """
         self.loading_directories = True
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             self.loading_directories = False
             return
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
-            # For now, show all directories
-            all_dirs = session.exec(
-                select(FileDirectory).order_by(FileDirectory.full_path)
-            ).all()
-            print(f"Found {len(all_dirs)} directories in database")  # Debug print
-            
-            # Build tree structure with file counts
-            self.directory_tree = self._build_tree_with_counts(session, all_dirs)
-            print(f"Built directory tree with {len(self.directory_tree)} root nodes")  # Debug print
-            
-            # Create a flat list of all directories with visual hierarchy
-            self.directories = []
-            for d in all_dirs:
-                dir_dict = {
-                    "directory_id": d.directory_id,
-                    "name": d.name,
-                    "full_path": d.full_path,
-                    "description": d.description,
-                    "icon": d.icon or "folder",
-                    "color": d.color,
-                    "is_system_directory": d.is_system_directory,
-                    "is_public": d.is_public,
-                    "can_create_subdirs": d.can_create_subdirs,
-                    "can_upload_files": d.can_upload_files,
-                    "file_count": self._get_file_count(session, d.directory_id),
-                    "has_children": len(session.exec(
-                        select(FileDirectory).where(FileDirectory.parent_id == d.directory_id)
-                    ).all()) > 0,
-                }
-                self.directories.append(dir_dict)
-            
-            print(f"Loaded {len(self.directories)} directories")  # Debug print
-            
-            # Update directory count
-            self.directory_count = f"{len(self.directories)} directories loaded"
-            
-            # Calculate total file count
-            def count_files_recursive(nodes):
-                total = 0
-                if isinstance(nodes, dict):
-                    # If it's a single node (dict), process it
-                    total += nodes.get("file_count", 0)
-                    if "children" in nodes and nodes["children"]:
-                        for child in nodes["children"]:
-                            total += count_files_recursive(child)
-                elif isinstance(nodes, list):
-                    # If it's a list of nodes, process each
-                    for node in nodes:
-                        total += count_files_recursive(node)
-                return total
-            
-            # Only count if we have a valid tree structure
-            if self.react_file_tree:
-                self.total_file_count = count_files_recursive(self.react_file_tree)
-            else:
-                self.total_file_count = 0
-            
-            # Build HTML for directory list
-            self._build_directories_html()
-            
-            # Build react-file-tree structure
-            self._build_react_file_tree(all_dirs)
+            self.total_file_count = DirectoryTree.total_files(session)
+        
+        self._parents = {}
+        self._children_loaded = set()
+        self.directory_tree = []
+        self.directories = []
+        self._load_children([None])
+        self._load_visible()
+        print(f"Loaded {len(self.directories)} directories with {len(self.directory_tree)} root nodes")  # Debug print
+        
+        # Build HTML for directory list
+        self._build_directories_html()
         
         self.loading_directories = False
     
-    def _build_tree_with_counts(self, session: Session, directories: List[FileDirectory], parent_id: Optional[int] = None) -> List[Dict]:
-        """Build hierarchical tree structure with file counts."""
-        tree = []
-        
-        for dir in directories:
-            if dir.parent_id == parent_id:
-                children = self._build_tree_with_counts(session, directories, dir.directory_id)
-                node = {
-                    "directory_id": dir.directory_id,
-                    "name": dir.name,
-                    "full_path": dir.full_path,
-                    "description": dir.description or "",
-                    "icon": dir.icon or "folder",
-                    "color": dir.color or "blue",
-                    "is_system_directory": dir.is_system_directory,
-                    "is_public": dir.is_public,
-                    "can_create_subdirs": dir.can_create_subdirs,
-                    "can_upload_files": dir.can_upload_files,
-                    "children": children,
-                    "has_children": len(children) > 0,
-                    "file_count": self._get_file_count(session, dir.directory_id),
-                }
-                tree.append(node)
+    def _load_children(self, parent_ids: List[Optional[int]]):
+        """Fetch the children of the given directories (None for the roots) into the tree views."""
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            return
         
-        return tree
+        engine = get_engine(database_url)
+        with Session(engine) as session:
+            rows = DirectoryTree.children(session, parent_ids)
+        
+        self._children_loaded.update(parent_ids)
+        children = DirectoryTree.index_by_parent(d for d, _ in rows)
+        file_counts = {d.directory_id: count for d, count in rows}
+        # Directories the user cannot open are greyed out in the tree instead of failing on click;
+        # resolved from the fetched rows so a tree load never scans every directory
+        locked = {
+            d.directory_id for d, _ in rows
+            if not DirectoryPermissions.resolve(d.owner_id, d.is_public, d.name, self.current_user_id) & PermissionMap.VIEW
+        }
+        self._parents.update({d.directory_id: d.parent_id for d, _ in rows})
+        
+        # Nested and react trees: attach each level under its parent node
+        expanded = set(self.expanded_directories)
+        for parent_id in parent_ids:
+            nodes = [
+                DirectoryTree.node(d, file_counts[d.directory_id], locked=d.directory_id in locked)
+                for d in children.get(parent_id, [])
+            ]
+            if parent_id is None:
+                self.directory_tree = nodes
+                continue
+            path = DirectoryTree.ancestry(self._parents, parent_id)
+            parent = DirectoryTree.find(self.directory_tree, path)
+            parent["children"] = nodes
+            parent["has_children"] = bool(nodes)
+            react_parent = DirectoryTree.find(self._react_roots(), path)
+            if react_parent is not None and nodes:
+                react_parent["children"] = sorted(
+                    (DirectoryTree.react_node(node, expanded) for node in nodes), key=DirectoryTree.react_sort_key
+                )
+        if None in parent_ids:
+            self._build_react_file_tree()
+        
+        # Flat list: mark the parents and merge the new entries in path order
+        for entry in self.directories:
+            if entry["directory_id"] in children:
+                entry["has_children"] = True
+        self.directories = sorted(
+            list(self.directories) + [
+                DirectoryTree.entry(d, file_counts[d.directory_id], locked=d.directory_id in locked) for d, _ in rows
+            ],
+            key=lambda entry: entry["full_path"]
+        )
+        self.directory_count = f"{len(self.directories)} directories loaded"
+    
+    def _load_visible(self):
+        """Fetch the next level under every visible directory that does not have it yet.
+
+        Visible directories are the roots and the children of expanded
+        visible directories; keeping one level loaded below them means the
+        expand arrows are right and a click expands without waiting.
+        """
+        expanded = set(self.expanded_directories)
+        while True:
+            pending = []
+            nodes = list(self.directory_tree)
+            while nodes:
+                node = nodes.pop()
+                if node["directory_id"] not in self._children_loaded:
+                    pending.append(node["directory_id"])
+                elif node["directory_id"] in expanded:
+                    nodes.extend(node["children"])
+            if not pending:
+                return
+            self._load_children(pending)
     
     def navigate_to_directory(self, directory_id: int):
         """Navigate to a specific directory."""
@@ -153,7 +180,7 @@ class DirectoryState(rx.State):
             self.loading_directories = False
             return
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Get the directory
             directory = session.get(FileDirectory, directory_id)
@@ -173,6 +200,7 @@ class DirectoryState(rx.State):
                 .where(FileDirectory.parent_id == directory_id)
                 .order_by(FileDirectory.sort_order)
             ).all()
+            file_counts = DirectoryTree.file_counts(session, [d.directory_id for d in child_dirs])
             
             self.directories = [
                 {
@@ -186,7 +214,7 @@ class DirectoryState(rx.State):
                     "is_public": d.is_public,
                     "can_create_subdirs": d.can_create_subdirs,
                     "can_upload_files": d.can_upload_files,
-                    "file_count": self._get_file_count(session, d.directory_id),
+                    "file_count": file_counts.get(d.directory_id, 0),
                 }
                 for d in child_dirs
             ]
@@ -195,30 +223,15 @@ class DirectoryState(rx.State):
     
     def _build_breadcrumbs(self, session: Session, directory: FileDirectory):
         """Build breadcrumb trail for current directory."""
-        breadcrumbs = []
-        current = directory
-        
-        while current:
-            breadcrumbs.append({
-                "directory_id": current.directory_id,
-                "name": current.name,
-                "icon": current.icon,
-            })
-            
-            if current.parent_id:
-                current = session.get(FileDirectory, current.parent_id)
-            else:
-                current = None
-        
-        # Reverse to get root -> current order
-        self.breadcrumbs = list(reversed(breadcrumbs))
-    
-    def _get_file_count(self, session: Session, directory_id: int) -> int:
-        """Get count of files in a directory."""
-        return len(session.exec(
-            select(FileMetadata)
-            .where(FileMetadata.directory_id == directory_id)
-        ).all())
+        # All ancestors come back root first from one full_path query
+        self.breadcrumbs = [
+            {
+                "directory_id": d.directory_id,
+                "name": d.name,
+                "icon": d.icon,
+            }
+            for d in DirectoryTree.ancestors(session, directory) + [directory]
+        ]
     
     def cancel_directory_creation(self):
         """Cancel directory creation and close modal."""
@@ -241,7 +254,7 @@ class DirectoryState(rx.State):
         if not database_url:
             return
             
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             from ..models.file_storage import DirectoryType
             
@@ -303,6 +316,10 @@ class DirectoryState(rx.State):
             print("Directory name is empty, returning")
             return
         
+        if self.current_user_id is None:
+            self.directory_creation_error = "Your account is not linked to an employee record, so you can't create directories."
+            return
+        
         self.creating_directory_in_progress = True
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
@@ -310,7 +327,7 @@ class DirectoryState(rx.State):
             self.creating_directory_in_progress = False
             return
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Check if current directory allows subdirectories
             if self.current_directory_id:
@@ -341,7 +358,7 @@ class DirectoryState(rx.State):
                 parent_id=self.current_directory_id,
                 full_path=full_path,
                 directory_type=DirectoryType.USER,
-                owner_id=self.current_user_id or 1,  # Use current user ID or default to 1 (temporary fix)
+                owner_id=self.current_user_id,
                 description=self.new_directory_description,
                 is_public=False,
                 is_system_directory=False,
@@ -359,12 +376,9 @@ class DirectoryState(rx.State):
                 self.new_directory_description = ""
                 self.creating_directory_in_progress = False
                 
-                print("Directory creation complete, reloading directory tree...")
-                # Reload current directory
-                if self.current_directory_id:
-                    self.navigate_to_directory(self.current_directory_id)
-                else:
-                    self.load_directory_tree()
+                # Add the one new node instead of reloading the whole tree
+                self._insert_directory(new_dir)
+                print("Directory creation complete, added to directory tree")
             except Exception as e:
                 print(f"Error creating directory: {str(e)}")
                 session.rollback()
@@ -376,19 +390,23 @@ class DirectoryState(rx.State):
             self.expanded_directories = [d for d in self.expanded_directories if d != directory_id]
         else:
             self.expanded_directories = self.expanded_directories + [directory_id]
+        self._set_expanded(directory_id)
     
     def expand_all_directories(self):
         """Expand all directories in the tree."""
-        # Collect all directory IDs that have children
-        all_parent_ids = []
-        for dir_info in self.directories:
-            if dir_info.get("has_children", False):
-                all_parent_ids.append(dir_info["directory_id"])
-        self.expanded_directories = all_parent_ids
+        # Expanding fetches another level, which may hold more parents; repeat until none are new
+        while True:
+            all_parent_ids = [d["directory_id"] for d in self.directories if d.get("has_children", False)]
+            if set(all_parent_ids) <= set(self.expanded_directories):
+                break
+            self.expanded_directories = all_parent_ids
+            self._load_visible()
+        self._apply_expanded()
     
     def collapse_all_directories(self):
         """Collapse all directories in the tree."""
         self.expanded_directories = []
+        self._apply_expanded()
     
     def get_directory_path(self, directory_id: int) -> str:
         """Get the full path of a directory."""
@@ -396,7 +414,7 @@ class DirectoryState(rx.State):
         if not database_url:
             return "/"
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             directory = session.get(FileDirectory, directory_id)
             return directory.full_path if directory else "/"
@@ -410,7 +428,7 @@ class DirectoryState(rx.State):
         if not database_url:
             return False
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             directory = session.get(FileDirectory, directory_id)
             return directory.can_create_subdirs if directory else False
@@ -420,21 +438,126 @@ class DirectoryState(rx.State):
         if not self.current_directory_id:
             return
         
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
+        # The breadcrumbs already hold the parent; only look it up if they are stale
+        if self.breadcrumbs and self.breadcrumbs[-1]["directory_id"] == self.current_directory_id:
+            parent_id = self.breadcrumbs[-2]["directory_id"] if len(self.breadcrumbs) > 1 else None
+        else:
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                return
+            
+            engine = get_engine(database_url)
+            with Session(engine) as session:
+                current_dir = session.get(FileDirectory, self.current_directory_id)
+                parent_id = current_dir.parent_id if current_dir else None
+        
+        if parent_id:
+            self.navigate_to_directory(parent_id)
+        else:
+            # Go to root
+            self.current_directory_id = None
+            self.current_path = "/"
+            self.breadcrumbs = []
+            self.load_directory_tree()
+    
+    def _react_roots(self) -> List[Dict[str, Any]]:
+        """Get the react-file-tree's top-level directory nodes (under the virtual root, if any)."""
+        if "directory_id" in self.react_file_tree:
+            return [self.react_file_tree]
+        return self.react_file_tree.get("children", [])
+    
+    def _insert_directory(self, directory: FileDirectory):
+        """Add one new directory to the loaded tree views without reloading them."""
+        if not self.has_directories or (directory.parent_id is not None and directory.parent_id not in self._parents):
+            # Nothing loaded (or the parent is not in it): fall back to a full load
+            self.load_directory_tree()
+            return
+        if directory.parent_id not in self._children_loaded:
+            # The parent's level was never fetched; fetching it now picks up the new directory
+            self._load_children([directory.parent_id])
+            self._build_directories_html()
             return
         
-        engine = create_engine(database_url)
-        with Session(engine) as session:
-            current_dir = session.get(FileDirectory, self.current_directory_id)
-            if current_dir and current_dir.parent_id:
-                self.navigate_to_directory(current_dir.parent_id)
-            else:
-                # Go to root
-                self.current_directory_id = None
-                self.current_path = "/"
-                self.breadcrumbs = []
-                self.load_directory_tree()
+        self._parents[directory.directory_id] = directory.parent_id
+        self._children_loaded.add(directory.directory_id)  # A new directory has no children yet
+        node = DirectoryTree.node(directory)
+        
+        # Nested tree: append under the parent, keeping siblings in path order
+        if directory.parent_id is None:
+            siblings = self.directory_tree
+        else:
+            parent = DirectoryTree.find(self.directory_tree, DirectoryTree.ancestry(self._parents, directory.parent_id))
+            parent["has_children"] = True
+            siblings = parent["children"]
+        position = next((i for i, n in enumerate(siblings) if n["full_path"] > directory.full_path), len(siblings))
+        siblings.insert(position, node)
+        
+        # Flat list: mark the parent and insert in path order
+        position = len(self.directories)
+        for i, entry in enumerate(self.directories):
+            if entry["directory_id"] == directory.parent_id:
+                entry["has_children"] = True
+            if position == len(self.directories) and entry["full_path"] > directory.full_path:
+                position = i
+        self.directories.insert(position, DirectoryTree.entry(directory))
+        self.directory_count = f"{len(self.directories)} directories loaded"
+        
+        # React tree: a new root changes its shape, anything else is one insert
+        if directory.parent_id is None:
+            self._build_react_file_tree()
+        else:
+            parent = DirectoryTree.find(self._react_roots(), DirectoryTree.ancestry(self._parents, directory.parent_id))
+            react_siblings = parent.setdefault("children", [])
+            react_node = DirectoryTree.react_node(node, set(self.expanded_directories))
+            keys = [DirectoryTree.react_sort_key(n) for n in react_siblings]
+            react_siblings.insert(bisect.bisect(keys, DirectoryTree.react_sort_key(react_node)), react_node)
+        
+        self._build_directories_html()
+    
+    def adjust_file_count(self, directory_id: Optional[int], delta: int):
+        """Add delta files to one directory's count in the loaded tree views."""
+        if not directory_id or not delta:
+            return
+        self.total_file_count = max(0, self.total_file_count + delta)
+        if directory_id not in self._parents:
+            return
+        
+        path = DirectoryTree.ancestry(self._parents, directory_id)
+        for node in (DirectoryTree.find(self.directory_tree, path), DirectoryTree.find(self._react_roots(), path)):
+            if node is not None:
+                node["file_count"] = max(0, node["file_count"] + delta)
+        for entry in self.directories:
+            if entry["directory_id"] == directory_id:
+                entry["file_count"] = max(0, entry["file_count"] + delta)
+                break
+        
+        # Only nodes under the first root with every ancestor expanded are in the HTML
+        visible = (
+            self.directory_tree
+            and path[0] == self.directory_tree[0]["directory_id"]
+            and all(ancestor in self.expanded_directories for ancestor in path[:-1])
+        )
+        if visible:
+            self._build_directories_html()
+    
+    def _set_expanded(self, directory_id: int):
+        """Update one node's expanded flag in the react tree and the HTML."""
+        self._load_visible()
+        node = DirectoryTree.find(self._react_roots(), DirectoryTree.ancestry(self._parents, directory_id))
+        if node is not None:
+            node["expanded"] = directory_id in self.expanded_directories
+        self._build_directories_html()
+    
+    def _apply_expanded(self):
+        """Update every node's expanded flag in the react tree and the HTML."""
+        self._load_visible()
+        expanded = set(self.expanded_directories)
+        nodes = list(self._react_roots())
+        while nodes:
+            node = nodes.pop()
+            node["expanded"] = node["directory_id"] in expanded
+            nodes.extend(node.get("children", []))
+        self._build_directories_html()
     
     def _build_directories_html(self):
         """Build HTML representation of directories for display with collapsible functionality."""
@@ -464,6 +587,7 @@ class DirectoryState(rx.State):
                     cursor: pointer;
                     transition: background 0.2s;
                     background: {'rgba(59, 130, 246, 0.2)' if directory_id == self.selected_directory_id else 'transparent'};
+                    opacity: {0.45 if node.get("locked") else 1};
                 " 
                 onmouseover="this.style.background='rgba(59, 130, 246, 0.1)'"
                 onmouseout="this.style.background='{'rgba(59, 130, 246, 0.2)' if directory_id == self.selected_directory_id else 'transparent'}'"
@@ -508,97 +632,13 @@ class DirectoryState(rx.State):
         # Build the complete HTML
         self.directories_html = build_html_node(self.directory_tree[0] if self.directory_tree else {})
     
-    def _build_react_file_tree(self, directories: List[FileDirectory]):
-        """Build tree structure compatible with react-file-tree."""
-        if not directories:
-            self.react_file_tree = {}
-            self.has_directories = False
-            return
-        
-        # Find all root directories (those without parent_id)
-        root_dirs = [d for d in directories if d.parent_id is None]
-        if not root_dirs:
-            self.react_file_tree = {}
-            self.has_directories = False
-            return
-        
-        # Get database session for file counts
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            return
-            
-        engine = create_engine(database_url)
-        
-        # Build tree recursively
-        def build_node(directory: FileDirectory, session: Session) -> Dict[str, Any]:
-            children = []
-            for d in directories:
-                if d.parent_id == directory.directory_id:
-                    children.append(build_node(d, session))
-            
-            # Sort children: directories first, then by name
-            children.sort(key=lambda x: (x["type"] != "directory", x["uri"].lower()))
-            
-            node = {
-                "type": "directory",
-                "uri": directory.full_path,
-                "expanded": directory.directory_id in self.expanded_directories,
-                "name": directory.name,
-                "directory_id": directory.directory_id,
-                "file_count": self._get_file_count(session, directory.directory_id),
-            }
-            
-            if children:
-                node["children"] = children
-            
-            return node
-        
-        # Build tree with session context
-        with Session(engine) as session:
-            # If we have multiple root directories, create a virtual root node
-            if len(root_dirs) > 1:
-                children = [build_node(d, session) for d in root_dirs]
-                children.sort(key=lambda x: x["uri"].lower())
-                self.react_file_tree = {
-                    "type": "directory",
-                    "uri": "/",
-                    "name": "Root",
-                    "expanded": True,
-                    "children": children
-                }
-            else:
-                # Single root directory
-                self.react_file_tree = build_node(root_dirs[0], session)
-        
-        # Debug output
-        import json
-        print(f"React file tree structure: {json.dumps(self.react_file_tree, indent=2)}")
-        print(f"React file tree keys: {list(self.react_file_tree.keys())}")
-        print(f"Has directories flag will be: {bool(self.react_file_tree)}")
+    def _build_react_file_tree(self):
+        """Build tree structure compatible with react-file-tree from directory_tree."""
+        self.react_file_tree = DirectoryTree.react_tree(self.directory_tree, self.expanded_directories)
+        print(f"React file tree has {len(self.react_file_tree.get('children', []))} top-level nodes")
         
         # Set flag to indicate we have directories
         self.has_directories = bool(self.react_file_tree)
-        
-        # Update total file count
-        def count_files_recursive(nodes):
-            total = 0
-            if isinstance(nodes, dict):
-                # If it's a single node (dict), process it
-                total += nodes.get("file_count", 0)
-                if "children" in nodes and nodes["children"]:
-                    for child in nodes["children"]:
-                        total += count_files_recursive(child)
-            elif isinstance(nodes, list):
-                # If it's a list of nodes, process each
-                for node in nodes:
-                    total += count_files_recursive(node)
-            return total
-        
-        # Only count if we have a valid tree structure
-        if self.react_file_tree:
-            self.total_file_count = count_files_recursive(self.react_file_tree)
-        else:
-            self.total_file_count = 0
     
     def initialize_expanded_directories(self):
         """Initialize expanded directories to show some content by default."""
@@ -606,8 +646,8 @@ class DirectoryState(rx.State):
         if self.directories:
             root_dirs = [d for d in self.directories if d["full_path"].count("/") <= 2]
             self.expanded_directories = [d["directory_id"] for d in root_dirs]
-            # Rebuild the tree with expanded state
-            self.load_directory_tree()
+            # Update the loaded tree's expanded state
+            self._apply_expanded()
     
     def handle_react_tree_click(self, node: Dict[str, Any]):
         """Handle click on react-file-tree item."""
@@ -636,8 +676,8 @@ class DirectoryState(rx.State):
             self.current_directory_id = directory_id
             self.current_path = uri
             
-            # Reload tree to update expanded state
-            self.load_directory_tree()
+            # Update the one node's expanded state
+            self._set_expanded(directory_id)
             
             # Load files for this directory
             from ..states.file_storage_state import FileStorageState
@@ -656,7 +696,7 @@ class DirectoryState(rx.State):
                 self.expanded_directories = self.expanded_directories + [directory_id]
             
             # Update the tree to reflect new expansion state
-            self.load_directory_tree()
+            self._set_expanded(directory_id)
             
             # Set as selected and load files
             self.selected_directory_id = directory_id
@@ -683,8 +723,8 @@ class DirectoryState(rx.State):
             else:
                 self.expanded_directories = self.expanded_directories + [directory_id]
             
-            # Rebuild HTML to reflect new state
-            self._build_directories_html()
+            # Fetch the next level if needed and rebuild HTML to reflect new state
+            self._set_expanded(directory_id)
         
         # Always set as selected and update path
         self.selected_directory_id = directory_id
@@ -1,15 +1,22 @@
 import reflex as rx
 import os
-import hashlib
 from typing import List, Optional, Dict
 from reflex import UploadFile
 from datetime import datetime
-from pathlib import Path
-import base64
 import asyncio
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from ..database.engine import get_engine
 from ..models.file_storage import FileMetadata, FileContent, FileType, StorageLocation
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from ..services.upload_spool import UploadSpool
+from ..services.blob_store import BlobStore
+from ..services.file_preview import FilePreview
+from ..services.storage_tiering import StorageTiering
+from ..services.bulk_upload import BulkUpload
+from ..services.directory_permissions import DirectoryPermissions
+from ..services.file_events import FileEvents
+from ..api.file_download import FileDownload
+from .auth_state import get_identity
+from .directory_state import DirectoryState
 import time
 
 
@@ -18,7 +25,6 @@ class FileStorageState(rx.State):
     
     # Configuration
     FILE_STORAGE_PATH: str = "./uploads"  # Base path for file storage
-    MAX_DB_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB limit for database storage
     
     # State variables
     upload_progress: int = 0
@@ -28,8 +34,7 @@ class FileStorageState(rx.State):
     loading_files: bool = False
     file_to_delete: Optional[int] = None
     file_to_download: Optional[int] = None
-    auto_refresh_enabled: bool = True
-    refresh_interval: int = 5000  # 5 seconds
+    auto_refresh_enabled: bool = True  # Apply other sessions' changes to the list as they happen
     is_dragging: bool = False
     upload_success: bool = False
     current_upload_filename: str = ""
@@ -41,24 +46,31 @@ class FileStorageState(rx.State):
     # File naming dialog
     show_rename_dialog: bool = False
     custom_filename: str = ""
-    pending_upload_data: bytes = b""
+    pending_upload_path: str = ""  # Temp file holding the spooled upload (never the bytes)
+    pending_upload_size: int = 0
+    pending_upload_checksum: str = ""
     original_filename: str = ""
     upload_key: int = 0  # Key to force re-render of upload component
     show_upload_modal: bool = False  # Control upload modal visibility
     
+    # Multi-file uploads
+    bulk_naming_rule: str = "original"  # See BulkUpload.NAMING_RULES
+    bulk_uploads: List[Dict] = []  # Per-file name, size, progress and status
+    
     # Access control
-    current_user_id: Optional[int] = 1  # TODO: Get from auth system
+    current_user_id: Optional[int] = None  # Signed-in user's Employee id (owner_id / uploaded_by)
     access_denied: bool = False
     access_denied_message: str = ""
     show_upload_restriction_dialog: bool = False
     upload_restriction_message: str = ""
     
-    def sync_user_from_auth(self):
-        """Sync user ID from AuthState."""
-        # For now, hardcode user ID until we can properly access AuthState
-        # TODO: Implement proper user authentication integration
-        self.current_user_id = 1  # Temporary hardcoded user ID
-        print(f"FileStorageState: Set current_user_id to {self.current_user_id} (hardcoded)")
+    # Whether this session's watch_files task is running
+    _watching: bool = False
+    
+    async def sync_user_from_auth(self):
+        """Sync user ID from the session identity cached in AuthState."""
+        auth_state = await get_identity(self)
+        self.current_user_id = auth_state.current_employee_id
     
     def _get_file_type(self, filename: str) -> FileType:
         """Determine file type from extension."""
@@ -74,50 +86,91 @@ class FileStorageState(rx.State):
         }
         return type_map.get(ext, FileType.OTHER)
     
-    def _calculate_checksum(self, content: bytes) -> str:
-        """Calculate SHA-256 checksum of file content."""
-        return hashlib.sha256(content).hexdigest()
-    
     def _determine_storage_location(self, file_size: int, file_type: FileType) -> StorageLocation:
-        """Determine optimal storage location based on file size and type."""
-        # Small critical files go to database
-        if file_size <= self.MAX_DB_FILE_SIZE and file_type in [FileType.MARKDOWN, FileType.TEXT]:
-            return StorageLocation.DATABASE
-        return StorageLocation.FILESYSTEM
-    
-    def _save_file_to_db_with_timeout(self, engine, metadata, upload_data, storage_location, timeout=5):
-        """Save file to database with timeout."""
+        """Determine the initial storage tier; the tiering job moves blobs as usage changes."""
+        return StorageTiering.initial_location(file_size, file_type)
+    
+    def _discard_pending_upload(self):
+        """Delete the spooled temp file (if any) and clear the pending upload."""
+        UploadSpool.discard(self.pending_upload_path)
+        self.pending_upload_path = ""
+        self.pending_upload_size = 0
+        self.pending_upload_checksum = ""
+        self.original_filename = ""
+        self.custom_filename = ""
+    
+    def _format_bytes(self, size: float) -> str:
+        """Format a byte count for display."""
+        if size < 1024 * 1024:
+            return f"{size / 1024:.1f} KB"
+        return f"{size / (1024 * 1024):.1f} MB"
+    
+    def _progress_status(self, label: str, done: int, total: Optional[int], started: float) -> str:
+        """Build a progress line with throughput and ETA from bytes processed so far."""
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = done / elapsed
+        status = f"{label} {self._format_bytes(done)}"
+        if total:
+            status += f" of {self._format_bytes(total)}"
+        status += f" · {self._format_bytes(rate)}/s"
+        if total and rate > 0 and done < total:
+            status += f" · ETA {(total - done) / rate:.0f}s"
+        return status
+    
+    def _store_upload(self, engine, metadata, upload_path, storage_location):
+        """Save a spooled upload to the blob store and commit its metadata.
+        
+        Content already stored under the same checksum is only referenced,
+        not written again.
+        
+        Returns: (success, error message)
+        """
         try:
             with Session(engine) as session:
-                if storage_location == StorageLocation.DATABASE:
-                    # Store in database
-                    session.add(metadata)
-                    session.flush()  # Get the file_id
-                    
-                    file_content = FileContent(
-                        file_id=metadata.file_id,
-                        content=upload_data
-                    )
-                    session.add(file_content)
-                else:
-                    # Store in filesystem
-                    Path(self.FILE_STORAGE_PATH).mkdir(parents=True, exist_ok=True)
-                    file_path = os.path.join(
-                        self.FILE_STORAGE_PATH,
-                        f"{metadata.filename}"
-                    )
-                    
-                    with open(file_path, "wb") as f:
-                        f.write(upload_data)
-                    
-                    metadata.file_path = file_path
-                    session.add(metadata)
+                blob = BlobStore.store(
+                    session,
+                    metadata.checksum,
+                    metadata.file_size,
+                    storage_location,
+                    source_path=upload_path
+                )
+                
+                metadata.blob_id = blob.blob_id
+                metadata.storage_location = blob.storage_location
+                metadata.file_path = blob.blob_path
+                session.add(metadata)
                 
                 session.commit()
                 return True, None
         except Exception as e:
             return False, str(e)
     
+    def _delete_file_record(self, session, metadata) -> Optional[str]:
+        """Delete a file's metadata and drop its reference to the stored content.
+        
+        Returns: filesystem path to remove once the delete is committed
+        """
+        blob_id = metadata.blob_id
+        unreferenced_path = None
+        
+        if not blob_id:
+            # Stored before deduplication
+            if metadata.storage_location == StorageLocation.DATABASE:
+                file_content = session.exec(
+                    select(FileContent).where(FileContent.file_id == metadata.file_id)
+                ).first()
+                if file_content:
+                    session.delete(file_content)
+            else:
+                unreferenced_path = metadata.file_path
+        
+        session.delete(metadata)
+        session.flush()
+        
+        if blob_id:
+            unreferenced_path = BlobStore.release(session, blob_id)
+        return unreferenced_path
+    
     async def handle_upload(self, files):
         """Handle file upload from Reflex upload component."""
         print(f"[handle_upload] Called with files: {files}")
@@ -126,44 +179,78 @@ class FileStorageState(rx.State):
         if not files:
             return
             
-        # For now, handle single file with rename option
-        file = files[0]
-        
         # Don't process if we're already uploading
         if self.uploading:
             print("[handle_upload] Skipping - already uploading")
             return
+        
+        # Uploads are attributed to the signed-in user (no query once the session identity is cached)
+        await self.sync_user_from_auth()
+        
+        # Several files: upload them all in parallel, named by the naming rule
+        if len(files) > 1:
+            async for _ in self._upload_many(files):
+                yield
+            return
+        
+        # Single file with rename option
+        file = files[0]
             
-        # Clear any previous pending data if dialog is not shown
-        if not self.show_rename_dialog:
-            self.pending_upload_data = b""
-            self.original_filename = ""
-            self.custom_filename = ""
+        # Replace any previous pending upload (its temp file included)
+        self._discard_pending_upload()
             
         try:
-            # Check if file is already bytes
+            # Get filename
             if isinstance(file, bytes):
-                self.pending_upload_data = file
                 self.original_filename = f"upload_{datetime.now().timestamp()}"
             elif isinstance(file, dict):
                 # File might be a dictionary with content and name
-                self.pending_upload_data = file.get('content', b'')
                 self.original_filename = file.get('name', f"upload_{datetime.now().timestamp()}")
             else:
-                # Try to read file data if it has a read method
-                if hasattr(file, 'read'):
-                    self.pending_upload_data = await file.read()
-                else:
-                    # File might already be the data
-                    self.pending_upload_data = file
-                    
-                # Get filename
                 self.original_filename = getattr(file, 'filename', None) or \
                                        getattr(file, 'name', None) or \
                                        f"upload_{datetime.now().timestamp()}"
             
+            # Stream the content to a temp file in chunks, hashing as we go,
+            # with progress driven by the bytes actually received
+            expected_size = UploadSpool.expected_size(file)
+            self.uploading = True
+            self.error_message = ""
+            self.upload_progress = 0
+            self.current_upload_filename = self.original_filename
+            self.current_file_size_display = self._format_bytes(expected_size) if expected_size else ""
+            self.upload_status = "Receiving file..."
+            yield
+            
+            started = time.monotonic()
+            last_update = started
+            try:
+                async for path, received, checksum in UploadSpool.stream(file):
+                    self.pending_upload_path = path
+                    self.pending_upload_size = received
+                    if checksum is not None:
+                        self.pending_upload_checksum = checksum
+                        continue
+                    
+                    # Throttle UI updates to ~10 per second
+                    now = time.monotonic()
+                    if now - last_update >= 0.1:
+                        last_update = now
+                        if expected_size:
+                            self.upload_progress = min(99, int(received * 100 / expected_size))
+                        self.upload_status = self._progress_status("Receiving", received, expected_size, started)
+                        yield
+            finally:
+                self.uploading = False
+                self.upload_progress = 0
+                self.upload_status = ""
+            
+            self.current_file_size_display = self._format_bytes(self.pending_upload_size)
+            print(f"[handle_upload] Spooled {self.pending_upload_size} bytes in {time.monotonic() - started:.3f}s")
+            
             # Only proceed if we actually have data
-            if not self.pending_upload_data:
+            if not self.pending_upload_size:
+                self._discard_pending_upload()
                 self.error_message = "No file data received"
                 return
                 
@@ -181,13 +268,158 @@ class FileStorageState(rx.State):
         except Exception as e:
             print(f"[handle_upload] Error: {str(e)}")
             self.error_message = f"Failed to process file: {str(e)}"
+            self._discard_pending_upload()
+    
+    def set_bulk_naming_rule(self, rule: str):
+        """Set the naming rule applied to multi-file uploads."""
+        if rule in BulkUpload.NAMING_RULES:
+            self.bulk_naming_rule = rule
+    
+    def _upload_file_name(self, upload, index: int) -> str:
+        """Get the client's filename for an upload."""
+        if isinstance(upload, dict):
+            return upload.get('name') or f"upload_{index}"
+        return getattr(upload, 'filename', None) or getattr(upload, 'name', None) or f"upload_{index}"
+    
+    async def _upload_many(self, files):
+        """Upload several files: parallel spooling/hashing, batched metadata inserts.
+        
+        Up to BulkUpload.WORKERS files are spooled and hashed in worker threads
+        at once; finished files are stored in batches of BulkUpload.BATCH_SIZE.
+        """
+        can_view, can_upload = self._check_directory_access(self.current_directory_id)
+        if not can_upload:
+            self.show_upload_restriction_dialog = True
+            self.upload_restriction_message = (
+                "Content uploads into other users' personal directories are restricted. "
+                "You can only upload files to:\n"
+                "• Your own directories\n"
+                "• Other users' public folders"
+            )
+            return
+        
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            self.error_message = "Database connection not configured"
+            return
+        engine = get_engine(database_url)
+        
+        directory_name = self.current_directory_path.rstrip("/").rsplit("/", 1)[-1]
+        names = [
+            BulkUpload.apply_naming_rule(self._upload_file_name(upload, i), self.bulk_naming_rule, directory_name)
+            for i, upload in enumerate(files)
+        ]
+        expected = [UploadSpool.expected_size(upload) or 0 for upload in files]
+        total_bytes = sum(expected)
+        
+        # Written by worker threads, copied into state on each UI tick
+        received = [0] * len(files)
+        self.bulk_uploads = [
+            {"name": name, "size": self._format_bytes(size), "progress": 0, "status": "Queued"}
+            for name, size in zip(names, expected)
+        ]
+        self.uploading = True
+        self.error_message = ""
+        self.upload_progress = 0
+        self.current_upload_filename = f"{len(files)} files"
+        self.current_file_size_display = self._format_bytes(total_bytes)
+        self.upload_status = f"Uploading {len(files)} files..."
+        yield
+        
+        workers = asyncio.Semaphore(BulkUpload.WORKERS)
+        
+        async def spool(index, upload):
+            async with workers:
+                self.bulk_uploads[index]["status"] = "Hashing"
+                
+                def report(size, index=index):
+                    received[index] = size
+                
+                try:
+                    path, size, checksum = await asyncio.to_thread(
+                        UploadSpool.spool_file, BulkUpload.source_of(upload), None, report
+                    )
+                except Exception as e:
+                    self.bulk_uploads[index]["status"] = f"Failed: {e}"
+                    raise
+                file_type = self._get_file_type(names[index])
+                return index, {
+                    "path": path,
+                    "size": size,
+                    "checksum": checksum,
+                    "filename": names[index],
+                    "file_type": file_type,
+                    "storage_location": self._determine_storage_location(size, file_type),
+                    "directory_id": self.current_directory_id,
+                    "uploaded_by": self.current_user_id,
+                }
+        
+        async def store(batch):
+            indexes = [index for index, _ in batch]
+            for index in indexes:
+                self.bulk_uploads[index]["status"] = "Saving"
+            try:
+                stored = await asyncio.to_thread(BulkUpload.store_batch, engine, [item for _, item in batch])
+            except Exception as e:
+                stored = [(None, str(e))] * len(batch)
+            for index, (file_id, error) in zip(indexes, stored):
+                self.bulk_uploads[index]["progress"] = 100
+                self.bulk_uploads[index]["status"] = "Stored" if file_id else f"Failed: {error}"
+        
+        started = time.monotonic()
+        pending = {asyncio.create_task(spool(i, upload)) for i, upload in enumerate(files)}
+        storing = set()
+        batch = []
+        while pending or storing:
+            done, _ = await asyncio.wait(pending | storing, timeout=0.1, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task in storing:
+                    storing.discard(task)
+                    continue
+                pending.discard(task)
+                try:
+                    batch.append(task.result())
+                except Exception as e:
+                    print(f"[_upload_many] Spooling failed: {e}")
+            
+            # Store a batch when it is full, or whatever is ready once spooling is done
+            if batch and (len(batch) >= BulkUpload.BATCH_SIZE or not pending):
+                storing.add(asyncio.create_task(store(batch)))
+                batch = []
+            
+            # Per-file spooling accounts for 90% of each bar; the commit completes it
+            for index, item in enumerate(self.bulk_uploads):
+                if item["progress"] < 100 and expected[index]:
+                    item["progress"] = min(90, int(received[index] * 90 / expected[index]))
+            done_bytes = sum(received)
+            self.upload_progress = min(99, int(done_bytes * 100 / total_bytes)) if total_bytes else 0
+            self.upload_status = self._progress_status("Uploading", done_bytes, total_bytes, started)
+            yield
+        
+        failed = sum(1 for item in self.bulk_uploads if item["status"].startswith("Failed"))
+        print(f"[_upload_many] {len(files)} files in {time.monotonic() - started:.3f}s, {failed} failed")
+        
+        self.uploading = False
+        self.upload_progress = 0
+        self.upload_status = ""
+        self.current_upload_filename = ""
+        self.current_file_size_display = ""
+        if failed:
+            self.error_message = f"{failed} of {len(files)} files failed to upload"
+        else:
+            self.upload_success = True
+        self.upload_key += 1
+        self._load_and_publish_files()
+        yield DirectoryState.adjust_file_count(self.current_directory_id, len(files) - failed)
+        
+        await asyncio.sleep(2)
+        self.upload_success = False
+        self.bulk_uploads = []
     
     def cancel_rename(self):
         """Cancel the rename operation."""
         self.show_rename_dialog = False
-        self.pending_upload_data = b""
-        self.original_filename = ""
-        self.custom_filename = ""
+        self._discard_pending_upload()
     
     def confirm_rename(self):
         """Confirm rename and proceed with upload."""
@@ -206,9 +438,7 @@ class FileStorageState(rx.State):
                 "• Other users' public folders"
             )
             # Clear pending upload data
-            self.pending_upload_data = b""
-            self.original_filename = ""
-            self.custom_filename = ""
+            self._discard_pending_upload()
             return
         
         # Construct final filename
@@ -228,43 +458,27 @@ class FileStorageState(rx.State):
         print(f"Starting upload for file: {final_filename}, uploading={self.uploading}")
         
         # Schedule the upload to run after UI updates
-        return self.start_upload_process(self.pending_upload_data, final_filename)
+        return self.start_upload_process(self.pending_upload_path, final_filename)
     
-    async def start_upload_process(self, upload_data: bytes, filename: str):
+    async def start_upload_process(self, upload_path: str, filename: str):
         """Start the upload process with proper async handling."""
-        # Small delay to ensure UI state updates first
-        await asyncio.sleep(0.1)
+        # Let the UI show the overlay first
         yield
         
         # Now do the actual upload
-        async for _ in self.do_upload(upload_data, filename):
+        async for _ in self.do_upload(upload_path, filename):
             yield
     
-    async def do_upload(self, upload_data: bytes, filename: str):
+    async def do_upload(self, upload_path: str, filename: str):
         """Perform the actual upload with progress updates."""
         print(f"[do_upload] Starting upload for: {filename}")
         try:
-            # Set initial progress immediately
-            self.upload_progress = 1
-            self.upload_status = "Initializing upload..."
-            yield
-            
-            # Small delay to ensure UI shows
-            await asyncio.sleep(0.1)
-            yield
-            
             # Process the upload with progress updates
-            async for _ in self.upload_single_file(upload_data, filename):
+            async for _ in self.upload_single_file(upload_path, filename):
                 yield
                 
             print(f"[do_upload] Upload completed for: {filename}")
             
-            # Ensure we're at 100% before cleanup
-            self.upload_progress = 100
-            self.upload_status = "Upload complete!"
-            yield
-            await asyncio.sleep(0.5)  # Show complete status briefly
-            
             # Clean up upload state
             self.uploading = False
             self.upload_success = True
@@ -272,17 +486,16 @@ class FileStorageState(rx.State):
             self.upload_status = ""
             
             # Clear ALL upload-related data to prevent dialog from reopening
-            self.pending_upload_data = b""
-            self.original_filename = ""
-            self.custom_filename = ""
+            self._discard_pending_upload()
             self.current_upload_filename = ""
             self.current_file_size_display = ""
             
             # Increment upload key to reset the upload component
             self.upload_key += 1
             
-            # Reload files
-            self.load_files()
+            # Reload files, share the new row and bump the directory's count in the tree
+            self._load_and_publish_files()
+            yield DirectoryState.adjust_file_count(self.current_directory_id, 1)
             
             # Small delay before resetting success flag
             await asyncio.sleep(2)
@@ -295,66 +508,40 @@ class FileStorageState(rx.State):
             self.upload_progress = 0
             self.upload_status = ""
             
-            # Clear upload data on error too
-            self.pending_upload_data = b""
-            self.original_filename = ""
-            self.custom_filename = ""
+            # Clear upload data (and the temp file) on error too
+            self._discard_pending_upload()
             self.current_upload_filename = ""
             self.current_file_size_display = ""
             
             # Increment key to reset upload component
             self.upload_key += 1
     
-    async def upload_single_file(self, upload_data: bytes, filename: str):
-        """Upload a single file."""
+    async def upload_single_file(self, upload_path: str, filename: str):
+        """Upload a single spooled file."""
         print(f"[upload_single_file] Starting for: {filename}")
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             self.error_message = "Database connection not configured"
             return
             
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         
         try:
-            file_size = len(upload_data)
+            # Size and checksum were computed while the upload was spooled
+            file_size = self.pending_upload_size
+            checksum = self.pending_upload_checksum
             print(f"[upload_single_file] File size: {file_size} bytes")
             
             # Update current file info
             self.current_upload_filename = filename
-            self.current_file_size_display = f"{file_size / 1024:.1f} KB" if file_size < 1024 * 1024 else f"{file_size / (1024 * 1024):.1f} MB"
-            
-            # Smooth progress updates with visible delays
-            print("[upload_single_file] Phase 1: Reading file...")
-            for progress in range(0, 31, 2):
-                self.upload_progress = progress
-                self.upload_status = f"Reading file... {progress}%"
-                yield
-                await asyncio.sleep(0.05)  # 50ms delay
+            self.current_file_size_display = self._format_bytes(file_size)
             
             # Determine file properties
             file_type = self._get_file_type(filename)
             mime_type = "application/octet-stream"
-            
-            print("[upload_single_file] Phase 2: Processing file...")
-            for progress in range(30, 51, 2):
-                self.upload_progress = progress
-                self.upload_status = f"Processing file... {progress}%"
-                yield
-                await asyncio.sleep(0.05)  # 50ms delay
-            
-            checksum = self._calculate_checksum(upload_data)
             storage_location = self._determine_storage_location(file_size, file_type)
             print(f"[upload_single_file] Storage location: {storage_location}")
             
-            print("[upload_single_file] Phase 3: Preparing save...")
-            for progress in range(50, 71, 2):
-                self.upload_progress = progress
-                self.upload_status = f"Preparing save... {progress}%"
-                yield
-                await asyncio.sleep(0.05)  # 50ms delay
-            
-            print(f"Progress reached 71%, now attempting database save...")
-            
             # Create metadata entry
             metadata = FileMetadata(
                 filename=f"{datetime.now().timestamp()}_{filename}",
@@ -364,110 +551,39 @@ class FileStorageState(rx.State):
                 file_size=file_size,
                 storage_location=storage_location,
                 checksum=checksum,
-                uploaded_by=1,  # TODO: Get from current user
+                uploaded_by=self.current_user_id,
                 directory_id=self.current_directory_id,
             )
             
-            # Run database save in a separate thread to prevent blocking
-            save_success = False
-            save_error = None
-            
-            # Create executor for async database operation
-            executor = ThreadPoolExecutor(max_workers=1)
+            # Every byte has been received and hashed; what remains is the write and commit
+            self.upload_progress = 90
+            self.upload_status = f"Saving {self._format_bytes(file_size)} to {storage_location.value.lower()}..."
+            yield
             
-            # Start the save operation
-            future = executor.submit(
-                self._save_file_to_db_with_timeout,
+            # Run the save in a worker thread and wait for the commit to finish
+            started = time.monotonic()
+            save_success, save_error = await asyncio.to_thread(
+                self._store_upload,
                 engine,
                 metadata,
-                upload_data,
+                upload_path,
                 storage_location
             )
+            if not save_success:
+                raise Exception(save_error)
             
-            # Continue progress while save happens in background
-            for progress in range(71, 86):
-                self.upload_progress = progress
-                self.upload_status = f"Saving to storage... {progress}%"
-                yield
-                await asyncio.sleep(0.1)  # 100ms delay
-                
-                # Check if save completed
-                if future.done():
-                    try:
-                        save_success, save_error = future.result(timeout=0.1)
-                        if save_success:
-                            print(f"File saved successfully: {filename}")
-                        else:
-                            print(f"Database error: {save_error}")
-                    except Exception as e:
-                        print(f"Error getting save result: {str(e)}")
-                    break
-            
-            # If save still not complete, continue anyway
-            if not future.done():
-                print("Save operation taking too long, continuing with progress...")
-                # Cancel the future to prevent resource leak
-                future.cancel()
+            elapsed = time.monotonic() - started
+            print(f"[upload_single_file] File saved successfully: {filename} ({elapsed:.3f}s)")
             
-            executor.shutdown(wait=False)
-            
-            # Complete the progress regardless of save success
-            print("[upload_single_file] Phase 4: Finalizing...")
-            for progress in range(86, 91, 1):
-                self.upload_progress = progress
-                self.upload_status = f"Finalizing... {progress}%"
-                yield
-                await asyncio.sleep(0.05)  # 50ms delay
-            
-            # Final smooth progress
-            print("[upload_single_file] Phase 5: Completing upload...")
-            for progress in range(90, 101):
-                self.upload_progress = progress
-                self.upload_status = f"Upload complete! {progress}%"
-                yield
-                await asyncio.sleep(0.05)  # 50ms delay
-                
-            print(f"[upload_single_file] Upload finished at {self.upload_progress}%")
+            self.upload_progress = 100
+            self.upload_status = "Upload complete!"
+            yield
                 
         except Exception as e:
             print(f"[upload_single_file] Exception: {str(e)}")
             self.error_message = f"Upload failed: {str(e)}"
-            # Still try to complete the progress bar
-            for progress in range(self.upload_progress, 101, 5):
-                self.upload_progress = progress
-                self.upload_status = f"Error occurred... {progress}%"
-                yield
-                await asyncio.sleep(0.05)
             raise
     
-    def get_file_url(self, file_id: int) -> Optional[str]:
-        """Get URL or base64 data for file display."""
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            return None
-        
-        engine = create_engine(database_url)
-        with Session(engine) as session:
-            metadata = session.get(FileMetadata, file_id)
-            if not metadata:
-                return None
-            
-            if metadata.storage_location == StorageLocation.DATABASE:
-                # Get from database
-                file_content = session.exec(
-                    select(FileContent).where(FileContent.file_id == file_id)
-                ).first()
-                
-                if file_content:
-                    # Return as base64 data URL
-                    b64_content = base64.b64encode(file_content.content).decode()
-                    return f"data:{metadata.mime_type};base64,{b64_content}"
-            else:
-                # For filesystem, return the file path (you'd implement serving logic)
-                return f"/api/files/{file_id}"
-        
-        return None
-    
     def _check_directory_access(self, directory_id: Optional[int]) -> tuple[bool, bool]:
         """Check if user has access to view/upload in directory.
         Returns: (can_view, can_upload)
@@ -480,32 +596,10 @@ class FileStorageState(rx.State):
         if not database_url:
             return False, False
             
-        engine = create_engine(database_url)
+        # Answered from the user's cached permission map; only a miss queries
+        engine = get_engine(database_url)
         with Session(engine) as session:
-            from ..models.file_storage import FileDirectory
-            directory = session.get(FileDirectory, directory_id)
-            
-            if not directory:
-                return False, False
-                
-            # User owns the directory
-            if directory.owner_id == self.current_user_id:
-                return True, True
-                
-            # Check if it's a public folder
-            if directory.is_public or "public" in directory.name.lower():
-                return True, True
-                
-            # Check parent directories for public access
-            current = directory
-            while current.parent_id:
-                parent = session.get(FileDirectory, current.parent_id)
-                if parent and parent.owner_id == self.current_user_id:
-                    # Parent is owned by user, but this subdirectory isn't - no access
-                    return False, False
-                current = parent
-                
-        return False, False
+            return DirectoryPermissions.access(session, self.current_user_id, directory_id)
     
     def set_current_directory_from_tree(self, directory_id: int, directory_path: str = None):
         """Set current directory from tree click and reload files."""
@@ -513,27 +607,30 @@ class FileStorageState(rx.State):
         if directory_path:
             self.current_directory_path = directory_path
             
-        # Check access before loading files
-        can_view, can_upload = self._check_directory_access(directory_id)
-        
-        if can_view:
-            self.access_denied = False
-            self.access_denied_message = ""
-            self.load_files()
-        else:
-            self.access_denied = True
-            self.access_denied_message = "Access Restricted: Private Content"
-            self.files = []  # Clear files list
+        # load_files checks access before listing anything
+        self.load_files()
     
     def load_files(self):
-        """Load all files for display in current directory."""
+        """Load all files for display in current directory, if the user may view it."""
         self.loading_files = True
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             self.loading_files = False
             return
         
-        engine = create_engine(database_url)
+        can_view, _ = self._check_directory_access(self.current_directory_id)
+        if not can_view:
+            self.access_denied = True
+            self.access_denied_message = "Access Restricted: Private Content"
+            self.files = []  # Clear files list
+            # Nothing is shown, so no live updates either until another directory is opened
+            FileEvents.pause(self.router.session.client_token)
+            self.loading_files = False
+            return
+        self.access_denied = False
+        self.access_denied_message = ""
+        
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Filter by current directory
             query = select(FileMetadata)
@@ -547,6 +644,9 @@ class FileStorageState(rx.State):
             
             print(f"[load_files] Found {len(files)} files for directory_id: {self.current_directory_id}")
             
+            # Live updates follow the directory being shown
+            FileEvents.follow(self.router.session.client_token, self.current_directory_id)
+            
             self.files = [
                 {
                     "file_id": f.file_id,
@@ -558,12 +658,84 @@ class FileStorageState(rx.State):
                     "storage_location": f.storage_location.value,
                     "is_public": f.is_public,
                     "directory_id": f.directory_id,
+                    "preview_kind": FilePreview.kind(f.file_type) or "",
+                    "preview_url": FileDownload.url(f.file_id, preview=True) if FilePreview.kind(f.file_type) else "",
                 }
                 for f in files
             ]
         
         self.loading_files = False
     
+    def _load_and_publish_files(self):
+        """Reload the list after an upload and send the new rows to other sessions watching this directory."""
+        previous_ids = {f["file_id"] for f in self.files}
+        self.load_files()
+        token = self.router.session.client_token
+        for f in self.files:
+            if f["file_id"] not in previous_ids:
+                FileEvents.publish(self.current_directory_id, ("upsert", dict(f)), origin=token)
+    
+    def _apply_file_changes(self, changes: List[tuple]):
+        """Apply published changes to the file list without querying."""
+        for action, payload in changes:
+            if self.access_denied:
+                # Nothing is listed for a denied directory; load_files runs again when another is opened
+                continue
+            if action == "reload":
+                self.load_files()
+            elif action == "delete":
+                self.files = [f for f in self.files if f["file_id"] != payload]
+            elif action == "upsert" and payload["directory_id"] == self.current_directory_id:
+                # Newest first, like load_files
+                others = [f for f in self.files if f["file_id"] != payload["file_id"]]
+                self.files = [payload] + others
+    
+    def set_auto_refresh_enabled(self, enabled: bool):
+        """Turn live updates of the file list on or off."""
+        self.auto_refresh_enabled = enabled
+        if enabled:
+            return FileStorageState.watch_files
+        FileEvents.unsubscribe(self.router.session.client_token)
+    
+    @rx.event(background=True)
+    async def watch_files(self):
+        """Apply other sessions' changes to this session's file list as they are published.
+
+        Waits on the session's FileEvents subscription, so an idle page makes
+        no queries; every FileEvents.CONNECTED_CHECK_SECONDS it checks that
+        the tab is still connected and stops if not.
+        """
+        async with self:
+            if self._watching or not self.auto_refresh_enabled:
+                return
+            self._watching = True
+            token = self.router.session.client_token
+            subscription = FileEvents.subscribe(token, self.current_directory_id)
+            if self.access_denied:
+                FileEvents.pause(token)
+        
+        try:
+            while True:
+                try:
+                    change = await asyncio.wait_for(subscription.queue.get(), FileEvents.CONNECTED_CHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    if not FileEvents.connected(token):
+                        break
+                    continue
+                
+                # Apply everything already queued in one state update
+                changes = [change]
+                while not subscription.queue.empty():
+                    changes.append(subscription.queue.get_nowait())
+                if ("stop", None) in changes:
+                    break
+                async with self:
+                    self._apply_file_changes(changes)
+        finally:
+            FileEvents.unsubscribe(token, subscription)
+            async with self:
+                self._watching = False
+    
     def delete_file(self, file_id: int):
         """Delete a file from storage."""
         database_url = os.getenv("DATABASE_URL")
@@ -571,87 +743,74 @@ class FileStorageState(rx.State):
             self.error_message = "Database connection not configured"
             return
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             metadata = session.get(FileMetadata, file_id)
             if not metadata:
                 self.error_message = "File not found"
                 return
             
-            # Delete physical file if stored in filesystem
-            if metadata.storage_location == StorageLocation.FILESYSTEM and metadata.file_path:
-                try:
-                    if os.path.exists(metadata.file_path):
-                        os.remove(metadata.file_path)
-                except Exception as e:
-                    print(f"Error deleting physical file: {e}")
-            
-            # Delete database records
-            if metadata.storage_location == StorageLocation.DATABASE:
-                file_content = session.exec(
-                    select(FileContent).where(FileContent.file_id == file_id)
-                ).first()
-                if file_content:
-                    session.delete(file_content)
-            
-            session.delete(metadata)
+            # Drop the content reference; shared content stays for other files
+            directory_id = metadata.directory_id
+            unreferenced_path = self._delete_file_record(session, metadata)
             session.commit()
         
-        # Reload files
-        self.load_files()
+        # Delete the physical file only once nothing references it
+        if unreferenced_path:
+            try:
+                BlobStore.remove_file(engine, unreferenced_path)
+            except Exception as e:
+                print(f"Error deleting physical file: {e}")
+        
+        # Drop the row from the list and the directory's count instead of reloading either
+        self.files = [f for f in self.files if f["file_id"] != file_id]
+        FileEvents.publish(directory_id, ("delete", file_id), origin=self.router.session.client_token)
+        return DirectoryState.adjust_file_count(directory_id, -1)
     
     def handle_delete_file(self, file_id: int):
         """Wrapper for delete file to handle from UI."""
         return self.delete_file(file_id)
     
     async def download_file(self, file_id: int):
-        """Download a file."""
+        """Download a file over the streaming HTTP route."""
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             self.error_message = "Database connection not configured"
             return
         
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             metadata = session.get(FileMetadata, file_id)
             if not metadata:
                 self.error_message = "File not found"
                 return
-            
-            content = None
-            
-            if metadata.storage_location == StorageLocation.DATABASE:
-                # Get from database
-                file_content = session.exec(
-                    select(FileContent).where(FileContent.file_id == file_id)
-                ).first()
-                
-                if file_content:
-                    content = file_content.content
-            else:
-                # Get from filesystem
-                if metadata.file_path and os.path.exists(metadata.file_path):
-                    with open(metadata.file_path, "rb") as f:
-                        content = f.read()
-            
-            if content:
-                # Use Reflex's download functionality
-                return rx.download(
-                    data=content,
-                    filename=metadata.original_filename
-                )
+            directory_id = metadata.directory_id
+            filename = metadata.original_filename
+        
+        # The URL is signed, so only hand it out after the same check as listing
+        can_view, _ = self._check_directory_access(directory_id)
+        if not can_view:
+            self.error_message = "Access Restricted: Private Content"
+            return
+        
+        # The browser fetches the file directly, in chunks, outside the websocket.
+        # rx.download only accepts relative string URLs, and the route is on the backend host.
+        return rx.download(
+            url=rx.Var.create(FileDownload.url(file_id)),
+            filename=filename
+        )
     
-    def handle_download_file(self, file_id: int):
+    async def handle_download_file(self, file_id: int):
         """Wrapper for download file to handle from UI."""
-        return self.download_file(file_id)
+        return await self.download_file(file_id)
     
     def set_file_to_delete(self, file_id: int):
         """Set file to delete and trigger deletion."""
-        self.delete_file(file_id)
+        return self.delete_file(file_id)
     
-    def set_file_to_download(self, file_id: int):
+    async def set_file_to_download(self, file_id: int):
         """Set file to download and trigger download."""
-        yield self.download_file(file_id)
+        return await self.download_file(file_id)
     
     def test_upload_overlay(self):
         """Test function to manually trigger upload overlay."""
@@ -673,9 +832,7 @@ class FileStorageState(rx.State):
     def reset_upload_state(self):
         """Force reset all upload-related state."""
         print("[reset_upload_state] Resetting upload state")
-        self.pending_upload_data = b""
-        self.original_filename = ""
-        self.custom_filename = ""
+        self._discard_pending_upload()
         self.show_rename_dialog = False
         self.uploading = False
         self.upload_progress = 0
@@ -689,44 +846,33 @@ class FileStorageState(rx.State):
             self.error_message = "Database connection not configured"
             return
             
-        engine = create_engine(database_url)
+        engine = get_engine(database_url)
         with Session(engine) as session:
             # Get all files
             all_files = session.exec(select(FileMetadata)).all()
             
             print(f"[clear_all_files] Clearing {len(all_files)} files")
             
-            # Delete physical files
+            # Delete each file's metadata; blobs go with their last reference
+            unreferenced_paths = []
             for file_meta in all_files:
-                if file_meta.storage_location == StorageLocation.FILESYSTEM and file_meta.file_path:
-                    try:
-                        if os.path.exists(file_meta.file_path):
-                            os.remove(file_meta.file_path)
-                            print(f"[clear_all_files] Deleted file: {file_meta.file_path}")
-                    except Exception as e:
-                        print(f"[clear_all_files] Error deleting file {file_meta.file_path}: {e}")
-            
-            # Delete all file content records
-            file_contents = session.exec(select(FileContent)).all()
-            for fc in file_contents:
-                session.delete(fc)
-            
-            # Delete all file metadata records
-            for fm in all_files:
-                session.delete(fm)
+                unreferenced_path = self._delete_file_record(session, file_meta)
+                if unreferenced_path:
+                    unreferenced_paths.append(unreferenced_path)
             
             session.commit()
             print("[clear_all_files] All files cleared from database")
+            
+            # Delete physical files
+            for path in unreferenced_paths:
+                try:
+                    BlobStore.remove_file(engine, path)
+                    print(f"[clear_all_files] Deleted file: {path}")
+                except Exception as e:
+                    print(f"[clear_all_files] Error deleting file {path}: {e}")
         
         # Clear the files list
         self.files = []
-        
-        # Also try to clean up the uploads directory
-        try:
-            import shutil
-            if os.path.exists(self.FILE_STORAGE_PATH):
-                shutil.rmtree(self.FILE_STORAGE_PATH)
-                os.makedirs(self.FILE_STORAGE_PATH)
-                print(f"[clear_all_files] Cleaned uploads directory: {self.FILE_STORAGE_PATH}")
-        except Exception as e:
-            print(f"[clear_all_files] Error cleaning uploads directory: {e}")
\ No newline at end of file
+        FileEvents.publish_all(("reload", None), origin=self.router.session.client_token)
+        return DirectoryState.load_directory_tree
+
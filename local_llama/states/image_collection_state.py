@@ -9,6 +9,9 @@ from ..models.project import Project
 from ..models.imaging_method import ImagingMethod
 from ..models.department import Department
 from ..services.activity_tracker import ActivityTracker
+from ..services.reference_cache import ReferenceDataCache
+from ..services.paging import Paging
+from .auth_state import get_identity
 
 
 class ImageCollectionState(rx.State):
@@ -83,14 +86,14 @@ class ImageCollectionState(rx.State):
                     self.employee_map = {f"{emp.last_name}, {emp.first_name}": str(emp.id) for emp in employees}
                 
                 # Load projects
-                projects = session.exec(select(Project).order_by(Project.project_name)).all()
-                self.projects = [proj.project_name for proj in projects]
-                self.project_map = {proj.project_name: str(proj.project_id) for proj in projects}
+                projects = ReferenceDataCache.get("project", session)
+                self.projects = projects.names()
+                self.project_map = {name: str(project_id) for project_id, name in projects.rows}
                 
                 # Load imaging methods
-                methods = session.exec(select(ImagingMethod).order_by(ImagingMethod.img_method)).all()
-                self.imaging_methods = [method.img_method for method in methods]
-                self.imaging_method_map = {method.img_method: str(method.imgmethod_id) for method in methods}
+                methods = ReferenceDataCache.get("imaging_method", session)
+                self.imaging_methods = methods.names()
+                self.imaging_method_map = {name: str(method_id) for method_id, name in methods.rows}
                 
         except Exception as e:
             print(f"Error loading form data: {str(e)}")
@@ -142,6 +145,9 @@ class ImageCollectionState(rx.State):
             
         self.is_submitting = True
         
+        # Attribute the activity to the signed-in user (cached for the session)
+        auth_state = await get_identity(self)
+        
         try:
             with rx.session() as session:
                 # Convert image size to float if provided
@@ -184,6 +190,7 @@ class ImageCollectionState(rx.State):
                 session.commit()
                 
                 print(f"Successfully submitted image collection: {new_collection.imgcollection_id}")
+                Paging.invalidate("image")
                 
                 # Track activity
                 imaging_method_name = self.selected_imaging_method_id
@@ -192,7 +199,8 @@ class ImageCollectionState(rx.State):
                     asset_id=asset_id,
                     project_id=project_id,
                     employee_id=employee_id,
-                    method=imaging_method_name
+                    method=imaging_method_name,
+                    user_id=auth_state.current_user_id
                 )
                 
                 # Set success message
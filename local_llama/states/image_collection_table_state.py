@@ -6,6 +6,8 @@ from ..models.employee import Employee
 from ..models.asset import Asset
 from ..models.project import Project
 from ..models.imaging_method import ImagingMethod
+from ..services.paging import Paging
+from ..services.unresolved_failures import UnresolvedFailures
 
 
 class ImageCollectionTableState(rx.State):
@@ -42,8 +44,7 @@ class ImageCollectionTableState(rx.State):
         try:
             with rx.session() as session:
                 # Get total count first for pagination
-                count_query = select(ImageCollection)
-                self.total_count = len(session.exec(count_query).all())
+                self.total_count = Paging.count(session, select(ImageCollection), cache_key="image")
                 
                 # Get the 10 most recent record IDs globally for the neon dot indicator
                 recent_ids_query = (
@@ -83,48 +84,10 @@ class ImageCollectionTableState(rx.State):
                 
                 print(f"Found {len(duplicate_combinations)} duplicate combinations")
                 
-                # Find failed records that haven't been followed by successful ones for the same asset
-                failed_without_success = set()
-                
-                # Get all failed records
-                failed_query = (
-                    select(ImageCollection.asset_id, ImageCollection.imgcollection_date, ImageCollection.imgcollection_id)
-                    .where(ImageCollection.imaging_result == "Failed")
-                    .order_by(ImageCollection.asset_id, ImageCollection.imgcollection_date.desc())
+                # Calculate total pages, keep the current page in range and get the offset
+                self.total_pages, self.current_page, offset = Paging.page_bounds(
+                    self.total_count, self.current_page, self.records_per_page
                 )
-                failed_records = session.exec(failed_query).all()
-                
-                for failed_record in failed_records:
-                    asset_id, failed_date, failed_id = failed_record
-                    
-                    # Check if there's a successful record for this asset after the failed date
-                    success_after_query = (
-                        select(ImageCollection.imgcollection_id)
-                        .where(
-                            ImageCollection.asset_id == asset_id,
-                            ImageCollection.imaging_result == "Success",
-                            ImageCollection.imgcollection_date > failed_date
-                        )
-                        .limit(1)
-                    )
-                    success_after = session.exec(success_after_query).first()
-                    
-                    # If no success found after this failure, mark it as unresolved
-                    if not success_after:
-                        failed_without_success.add(failed_id)
-                
-                print(f"Found {len(failed_without_success)} unresolved failed records")
-                
-                # Calculate total pages
-                import math
-                self.total_pages = max(1, math.ceil(self.total_count / self.records_per_page))
-                
-                # Ensure current page is within valid range
-                if self.current_page > self.total_pages:
-                    self.current_page = max(1, self.total_pages)
-                
-                # Calculate offset for pagination
-                offset = (self.current_page - 1) * self.records_per_page
                 
                 # Build query with sorting
                 query = (
@@ -188,6 +151,12 @@ class ImageCollectionTableState(rx.State):
                 results = session.exec(query).all()
                 print(f"Query returned {len(results)} results")
                 
+                # Flag failures on this page that have no later success for the same asset
+                failed_without_success = UnresolvedFailures.get_ids(
+                    session, "image", [row[0].imgcollection_id for row in results]
+                )
+                print(f"Found {len(failed_without_success)} unresolved failed records on this page")
+                
                 # Format data for table display
                 collections_data = []
                 for result in results:
@@ -10,6 +10,9 @@ from ..models.project import Project
 from ..models.app_user import AppUser
 from ..models.department import Department
 from ..services.activity_tracker import ActivityTracker
+from ..services.reference_cache import ReferenceDataCache
+from ..services.paging import Paging
+from .auth_state import get_identity
 
 
 class LogCollectionState(rx.State):
@@ -84,12 +87,9 @@ class LogCollectionState(rx.State):
                 self.employee_map[display_name] = emp.id
             
             # Load projects
-            projects = session.exec(select(Project).order_by(Project.project_name)).all()
-            self.projects = []
-            self.project_map = {}
-            for proj in projects:
-                self.projects.append(proj.project_name)
-                self.project_map[proj.project_name] = proj.project_id
+            projects = ReferenceDataCache.get("project", session)
+            self.projects = projects.names()
+            self.project_map = projects.name_to_id()
             
             # Load all assets initially
             assets = session.exec(select(Asset).order_by(Asset.asset_name)).all()
@@ -102,7 +102,7 @@ class LogCollectionState(rx.State):
             self.filtered_asset_map = self.asset_map.copy()
             
             # Load log types and separate common from extended
-            logtypes = session.exec(select(LogType).order_by(LogType.logtype)).all()
+            logtypes = ReferenceDataCache.get("logtype", session).rows
             
             # Common log types
             common_logs = [
@@ -119,11 +119,11 @@ class LogCollectionState(rx.State):
             self.extended_logtype_map = {}
             self.logtype_map = {}
             
-            for lt in logtypes:
-                self.logtype_map[lt.logtype] = lt.logtype_id
-                if lt.logtype not in common_logs:
-                    self.extended_logtypes.append(lt.logtype)
-                    self.extended_logtype_map[lt.logtype] = lt.logtype_id
+            for logtype_id, logtype in logtypes:
+                self.logtype_map[logtype] = logtype_id
+                if logtype not in common_logs:
+                    self.extended_logtypes.append(logtype)
+                    self.extended_logtype_map[logtype] = logtype_id
     
     def filter_assets_by_project(self):
         """Filter assets based on selected project."""
@@ -270,6 +270,9 @@ class LogCollectionState(rx.State):
         
         self.is_submitting = True
         
+        # Attribute the activity to the signed-in user (cached for the session)
+        auth_state = await get_identity(self)
+        
         try:
             with rx.session() as session:
                 # Parse the datetime string
@@ -310,7 +313,8 @@ class LogCollectionState(rx.State):
                                 asset_id=self.selected_asset_id,
                                 project_id=self.selected_project_id,
                                 employee_id=self.selected_employee_id,
-                                log_type=log_name
+                                log_type=log_name,
+                                user_id=auth_state.current_user_id
                             )
                             
                             records_created += 1
@@ -337,7 +341,8 @@ class LogCollectionState(rx.State):
                             asset_id=self.selected_asset_id,
                             project_id=self.selected_project_id,
                             employee_id=self.selected_employee_id,
-                            log_type=self.selected_common_logtype
+                            log_type=self.selected_common_logtype,
+                            user_id=auth_state.current_user_id
                         )
                         
                         records_created += 1
@@ -370,13 +375,16 @@ class LogCollectionState(rx.State):
                             asset_id=self.selected_asset_id,
                             project_id=self.selected_project_id,
                             employee_id=self.selected_employee_id,
-                            log_type=log_type_name
+                            log_type=log_type_name,
+                            user_id=auth_state.current_user_id
                         )
                     
                     records_created += 1
                 
                 # Final message handling
                 if records_created > 0:
+                    # New rows change the collection table's total
+                    Paging.invalidate("log")
                     self.submission_status = "success"
                     if records_created == 1:
                         self.submission_message = "Log collection recorded successfully!"
@@ -6,6 +6,8 @@ from ..models.employee import Employee
 from ..models.asset import Asset
 from ..models.project import Project
 from ..models.log_type import LogType
+from ..services.paging import Paging
+from ..services.unresolved_failures import UnresolvedFailures
 
 
 class LogCollectionTableState(rx.State):
@@ -43,8 +45,7 @@ class LogCollectionTableState(rx.State):
             with rx.session() as session:
                 # Query log collections with joined related data
                 # Get total count first for pagination
-                count_query = select(LogCollection)
-                self.total_count = len(session.exec(count_query).all())
+                self.total_count = Paging.count(session, select(LogCollection), cache_key="log")
                 
                 # Get the 10 most recent record IDs globally for the neon dot indicator
                 recent_ids_query = (
@@ -84,48 +85,10 @@ class LogCollectionTableState(rx.State):
                 
                 print(f"Found {len(duplicate_combinations)} duplicate combinations")
                 
-                # Find failed records that haven't been followed by successful ones for the same asset
-                failed_without_success = set()
-                
-                # Get all failed records
-                failed_query = (
-                    select(LogCollection.asset_id, LogCollection.logcollection_date, LogCollection.logcollection_id)
-                    .where(LogCollection.logcollection_result == "Failed")
-                    .order_by(LogCollection.asset_id, LogCollection.logcollection_date.desc())
+                # Calculate total pages, keep the current page in range and get the offset
+                self.total_pages, self.current_page, offset = Paging.page_bounds(
+                    self.total_count, self.current_page, self.records_per_page
                 )
-                failed_records = session.exec(failed_query).all()
-                
-                for failed_record in failed_records:
-                    asset_id, failed_date, failed_id = failed_record
-                    
-                    # Check if there's a successful record for this asset after the failed date
-                    success_after_query = (
-                        select(LogCollection.logcollection_id)
-                        .where(
-                            LogCollection.asset_id == asset_id,
-                            LogCollection.logcollection_result == "Success",
-                            LogCollection.logcollection_date > failed_date
-                        )
-                        .limit(1)
-                    )
-                    success_after = session.exec(success_after_query).first()
-                    
-                    # If no success found after this failure, mark it as unresolved
-                    if not success_after:
-                        failed_without_success.add(failed_id)
-                
-                print(f"Found {len(failed_without_success)} unresolved failed records")
-                
-                # Calculate total pages
-                import math
-                self.total_pages = max(1, math.ceil(self.total_count / self.records_per_page))
-                
-                # Ensure current page is within valid range
-                if self.current_page > self.total_pages:
-                    self.current_page = max(1, self.total_pages)
-                
-                # Calculate offset for pagination
-                offset = (self.current_page - 1) * self.records_per_page
                 
                 # Build query with sorting
                 query = (
@@ -184,6 +147,12 @@ class LogCollectionTableState(rx.State):
                 results = session.exec(query).all()
                 print(f"Query returned {len(results)} results")
                 
+                # Flag failures on this page that have no later success for the same asset
+                failed_without_success = UnresolvedFailures.get_ids(
+                    session, "log", [row[0].logcollection_id for row in results]
+                )
+                print(f"Found {len(failed_without_success)} unresolved failed records on this page")
+                
                 # Format data for table display
                 collections_data = []
                 for result in results:
@@ -14,6 +14,8 @@ from ..models.virtual_machine import VirtualMachine
 from ..models.department import Department
 from ..models.imaging_method import ImagingMethod
 from ..services.activity_tracker import ActivityTracker
+from ..services.reference_cache import ReferenceDataCache
+from .auth_state import get_identity
 
 class VMCreationState(rx.State):
     """State for VM Creation form."""
@@ -173,14 +175,10 @@ class VMCreationState(rx.State):
                         self.employees.append(display_name)
                         self.employee_map[display_name] = emp.id
                 
-                # Load projects
-                projects = session.exec(select(Project)).all()
-                self.projects = []
-                self.project_map = {}
-                for p in projects:
-                    if p.project_name:  # Only add non-empty project names
-                        self.projects.append(p.project_name)
-                        self.project_map[p.project_name] = p.project_id
+                # Load projects (shared reference cache skips empty names)
+                projects = ReferenceDataCache.get("project", session)
+                self.projects = projects.names()
+                self.project_map = projects.name_to_id()
                 
                 # Load assets
                 assets = session.exec(select(Asset)).all()
@@ -208,31 +206,19 @@ class VMCreationState(rx.State):
                     self.image_collection_asset_map[img.imgcollection_id] = img.asset_id
                 
                 # Load virtualization sources
-                virt_sources = session.exec(select(VirtualizationSource)).all()
-                self.virt_sources = []
-                self.virt_source_map = {}
-                for vs in virt_sources:
-                    if vs.virt_source:  # Only add non-empty sources
-                        self.virt_sources.append(vs.virt_source)
-                        self.virt_source_map[vs.virt_source] = vs.virtsource_id
+                virt_sources = ReferenceDataCache.get("virt_source", session)
+                self.virt_sources = virt_sources.names()
+                self.virt_source_map = virt_sources.name_to_id()
                 
                 # Load VM types
-                vm_types = session.exec(select(VMType)).all()
-                self.vm_types = []
-                self.vm_type_map = {}
-                for vt in vm_types:
-                    if vt.vm_type:  # Only add non-empty VM types
-                        self.vm_types.append(vt.vm_type)
-                        self.vm_type_map[vt.vm_type] = vt.vmtype_id
+                vm_types = ReferenceDataCache.get("vm_type", session)
+                self.vm_types = vm_types.names()
+                self.vm_type_map = vm_types.name_to_id()
                 
                 # Load VM statuses
-                vm_statuses = session.exec(select(VMStatus)).all()
-                self.vm_statuses = []
-                self.vm_status_map = {}
-                for vs in vm_statuses:
-                    if vs.vm_status:  # Only add non-empty statuses
-                        self.vm_statuses.append(vs.vm_status)
-                        self.vm_status_map[vs.vm_status] = vs.vmstatus_id
+                vm_statuses = ReferenceDataCache.get("vm_status", session)
+                self.vm_statuses = vm_statuses.names()
+                self.vm_status_map = vm_statuses.name_to_id()
         
         except Exception as e:
             print(f"Error loading dropdowns: {e}")
@@ -305,6 +291,9 @@ class VMCreationState(rx.State):
             self.submission_message = "Please fill in all required fields."
             return
         
+        # Attribute the activity to the signed-in user (cached for the session)
+        auth_state = await get_identity(self)
+        
         try:
             with rx.session() as session:
                 # Get IDs from mappings
@@ -357,7 +346,8 @@ class VMCreationState(rx.State):
                     asset_id=asset_id,
                     project_id=project_id,
                     employee_id=employee_id,
-                    vm_type=vm_type_name
+                    vm_type=vm_type_name,
+                    user_id=auth_state.current_user_id
                 )
                 
                 # Success notification
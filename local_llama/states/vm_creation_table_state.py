@@ -11,6 +11,8 @@ from ..models.vm_type import VMType
 from ..models.vm_status import VMStatus
 from ..models.virtual_machine import VirtualMachine
 from ..services.activity_tracker import ActivityTracker
+from ..services.reference_cache import ReferenceDataCache
+from .auth_state import get_identity
 
 class VMCreationTableState(rx.State):
     """State for VM Creation table."""
@@ -167,13 +169,9 @@ class VMCreationTableState(rx.State):
                         seen_combinations[key] = record["virtmachine_id"]
                 
                 # Load VM statuses for edit modal
-                vm_statuses = session.exec(select(VMStatus)).all()
-                self.vm_statuses = []
-                self.vm_status_map = {}
-                for vs in vm_statuses:
-                    if vs.vm_status:
-                        self.vm_statuses.append(vs.vm_status)
-                        self.vm_status_map[vs.vm_status] = vs.vmstatus_id
+                vm_statuses = ReferenceDataCache.get("vm_status", session)
+                self.vm_statuses = vm_statuses.names()
+                self.vm_status_map = vm_statuses.name_to_id()
                 
                 # Apply initial sorting
                 yield self.sort_records(self.sort_column, self.sort_order)
@@ -289,6 +287,9 @@ class VMCreationTableState(rx.State):
     
     async def update_vm(self):
         """Update the VM in the database."""
+        # Attribute the activity to the signed-in user (cached for the session)
+        auth_state = await get_identity(self)
+        
         try:
             with rx.session() as session:
                 # Get the VM
@@ -347,12 +348,13 @@ class VMCreationTableState(rx.State):
                     
                     # Track activity if changes were made
                     if changes:
-                        # Get employee ID from the VM record
-                        employee_id = vm.creator_employee_id
+                        # Credit the signed-in employee, or the VM's creator if they have no employee record
+                        employee_id = auth_state.current_employee_id or vm.creator_employee_id
                         ActivityTracker.track_vm_update(
                             vm_id=self.editing_vm_id,
                             employee_id=employee_id,
-                            changes=changes
+                            changes=changes,
+                            user_id=auth_state.current_user_id
                         )
                     
                     # Close modal